@@ -1,20 +1,31 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, send_from_directory
+import time
+_IMPORT_STARTED = time.perf_counter()
+
+from flask import Flask, Response, abort, render_template, request, jsonify, redirect, url_for, flash, send_from_directory
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
 import json
 import os
+from collections.abc import Mapping
 from datetime import datetime, timedelta
-from tracker import AITaskOptimizer
-from models import db, User, Task, Schedule, ScheduleFeedback
+from models import db, User, Task, Schedule, ScheduleFeedback, UserStats, SiteStats, FeedbackRollup
 from forms import LoginForm, RegistrationForm, ProfileForm, TaskForm
-from llm_service import get_llm_service
+from time_utils import clock_datetime, format_clock, parse_clock, shift_clock
+import assets
+import login_security
+import metrics
+import profiler
+import render_cache
 
 import secrets
+import threading
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = secrets.token_hex(16)  # Generate a random secret key
 
-# Database configuration
-if os.environ.get('VERCEL'):
+# Database configuration (DATABASE_URL overrides the defaults below)
+if os.environ.get('DATABASE_URL'):
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ['DATABASE_URL']
+elif os.environ.get('VERCEL'):
     # Vercel filesystem is read-only, so we use /tmp for SQLite
     # NOTE: Data will be lost on every redeploy/restart!
     app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:////tmp/task_optimizer.db'
@@ -23,9 +34,19 @@ else:
     app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///task_optimizer.db'
 
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Store new schedules in the compact binary format (see schedule_codec.py)
+app.config['SCHEDULE_COMPACT_STORAGE'] = os.environ.get('SCHEDULE_COMPACT_STORAGE', '1') == '1'
+# Tables and the admin user are created by `python init_db.py`. The Vercel SQLite
+# file in /tmp starts empty on every cold start, so there it happens on the first request.
+app.config['AUTO_INIT_DB'] = os.environ.get('AUTO_INIT_DB', '1' if os.environ.get('VERCEL') else '0') == '1'
 
 # Initialize extensions
 db.init_app(app)
+metrics.init_app(app)
+profiler.init_app(app)
+login_security.init_app(app)
+assets.init_app(app)
+render_cache.init_app(app)
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'login'
@@ -41,64 +62,38 @@ def favicon():
                              'favicon.ico', mimetype='image/vnd.microsoft.icon')
 
 
+# LLM, intent and example modules are imported on first use so that cold
+# starts (every serverless invocation) only pay for what the request needs
+def get_llm_service():
+    return metrics.lazy_import('llm_service').get_llm_service()
+
+def get_intent_router():
+    return metrics.lazy_import('intent_router').get_intent_router()
+
+def get_example_store():
+    return metrics.lazy_import('example_store').get_example_store()
+
+def rebuild_examples_in_background(example_store):
+    return metrics.lazy_import('example_store').rebuild_in_background(example_store, app)
+
+
 # Helper function to get today's date
 def get_today():
     return datetime.now().strftime("%Y-%m-%d")
 
 # Helper methods for time calculations
 def add_time(time_str, minutes):
-    """Add minutes to time string and return new time string"""
-    try:
-        # Parse time string (e.g., "7:00 AM")
-        if "AM" in time_str.upper() or "PM" in time_str.upper():
-            time_obj = datetime.strptime(time_str.strip(), "%I:%M %p")
-        else:
-            time_obj = datetime.strptime(time_str.strip(), "%H:%M")
-        
-        # Add minutes
-        new_time = time_obj + timedelta(minutes=minutes)
-        
-        # Return in same format
-        if "AM" in time_str.upper() or "PM" in time_str.upper():
-            return new_time.strftime("%I:%M %p").lstrip('0')
-        else:
-            return new_time.strftime("%H:%M")
-    except:
-        # Fallback to simple addition if parsing fails
-        return time_str
+    """Add minutes to time string and return new time string (unchanged if unparseable)"""
+    return shift_clock(time_str, minutes)
 
 def subtract_time(time_str, minutes):
-    """Subtract minutes from time string and return new time string"""
-    try:
-        # Parse time string (e.g., "7:00 AM")
-        if "AM" in time_str.upper() or "PM" in time_str.upper():
-            time_obj = datetime.strptime(time_str.strip(), "%I:%M %p")
-        else:
-            time_obj = datetime.strptime(time_str.strip(), "%H:%M")
-        
-        # Subtract minutes
-        new_time = time_obj - timedelta(minutes=minutes)
-        
-        # Return in same format
-        if "AM" in time_str.upper() or "PM" in time_str.upper():
-            result = new_time.strftime("%I:%M %p").lstrip('0')
-            # Fix formatting issue with single digit hours
-            if result.startswith(':'):
-                result = '12' + result
-            return result
-        else:
-            return new_time.strftime("%H:%M")
-    except:
-        # Fallback to simple subtraction if parsing fails
-        return time_str
+    """Subtract minutes from time string and return new time string (unchanged if unparseable)"""
+    return shift_clock(time_str, -minutes)
 
 def parse_time_str(time_str):
-    try:
-        if "AM" in time_str.upper() or "PM" in time_str.upper():
-            return datetime.strptime(time_str.strip(), "%I:%M %p")
-        return datetime.strptime(time_str.strip(), "%H:%M")
-    except:
-        return datetime.strptime("7:00 AM", "%I:%M %p")
+    """Clock time as a datetime on 1900-01-01 (7:00 AM if unparseable)"""
+    minutes = parse_clock(time_str)
+    return clock_datetime(7 * 60 if minutes is None else minutes)
 
 # Routes for authentication
 @app.route('/login', methods=['GET', 'POST'])
@@ -108,13 +103,27 @@ def login():
     
     form = LoginForm()
     if form.validate_on_submit():
+        retry_after = login_security.throttle(request.remote_addr or '', form.username.data)
+        if retry_after:
+            metrics.LOGIN_ATTEMPTS.inc(outcome='throttled')
+            flash(f'Too many login attempts. Please try again in {int(retry_after) + 1} seconds.')
+            return render_template('login.html', form=form), 429, {'Retry-After': str(int(retry_after) + 1)}
         try:
             user = User.query.filter_by(username=form.username.data).first()
-            if user and user.check_password(form.password.data):
+            if login_security.check_login(user, form.password.data):
                 login_user(user, remember=form.remember_me.data)
+                login_security.login_succeeded(form.username.data)
+                UserStats.touch(user.id)
+                db.session.commit()
+                metrics.LOGIN_ATTEMPTS.inc(outcome='success')
                 return redirect(url_for('index'))
             else:
+                metrics.LOGIN_ATTEMPTS.inc(outcome='invalid')
                 flash('Invalid username or password')
+        except login_security.LoginBusy:
+            metrics.LOGIN_ATTEMPTS.inc(outcome='busy')
+            flash('The server is busy. Please try again in a moment.')
+            return render_template('login.html', form=form), 503, {'Retry-After': '5'}
         except Exception as e:
             flash('An error occurred during login. Please try again.')
             print(f"Login error: {e}")  # Log the error for debugging
@@ -132,6 +141,8 @@ def register():
             user = User(username=form.username.data, email=form.email.data)
             user.set_password(form.password.data)
             db.session.add(user)
+            db.session.flush()
+            UserStats.record(user.id, user_count=1)
             db.session.commit()
             flash('Congratulations, you are now a registered user!')
             return redirect(url_for('login'))
@@ -151,6 +162,49 @@ def logout():
     logout_user()
     return redirect(url_for('login'))
 
+class ScheduleHistory(Mapping):
+    """
+    Date string -> schedule JSON for one user, loaded on demand
+    
+    Listing dates only reads the date column; a schedule's stored data is
+    fetched and decoded the first time that date is looked up.
+    """
+    
+    def __init__(self, user_id):
+        self.user_id = user_id
+        rows = db.session.query(Schedule.date, Schedule.id, Schedule.created_at, Schedule.generated_at) \
+            .filter_by(user_id=user_id).order_by(Schedule.date).all()
+        self._dates = [str(row.date) for row in rows]
+        self._versions = {str(row.date): (row.id, row.created_at, row.generated_at) for row in rows}
+        self._loaded = {}
+    
+    def version(self, date_str):
+        """Changes whenever the date's schedule is replaced (None if there is none)"""
+        return self._versions.get(date_str)
+    
+    def __getitem__(self, date_str):
+        if date_str not in self._loaded:
+            if date_str not in self._versions:
+                raise KeyError(date_str)
+            schedule = Schedule.query.filter_by(
+                user_id=self.user_id, date=datetime.strptime(date_str, '%Y-%m-%d').date()
+            ).first()
+            self._loaded[date_str] = schedule.schedule_data
+        return self._loaded[date_str]
+    
+    def __contains__(self, date_str):
+        return date_str in self._versions
+    
+    def __iter__(self):
+        return iter(self._dates)
+    
+    def __len__(self):
+        return len(self._dates)
+
+PROFILE_PAGE_FIELDS = ('id', 'username', 'email', 'name', 'role', 'schedule_days', 'peak_energy',
+                       'study_preference', 'family_time', 'workout_preference', 'workout_impact', 'main_goals',
+                       'sleep_schedule', 'weekly_schedule', 'is_admin')
+
 # Routes for the web application
 @app.route('/')
 @login_required
@@ -158,12 +212,12 @@ def index():
     # Get user's tasks
     pending_tasks = Task.query.filter_by(user_id=current_user.id, status='pending').all()
     completed_tasks = Task.query.filter_by(user_id=current_user.id, status='completed').all()
-    schedules = Schedule.query.filter_by(user_id=current_user.id).all()
     
     tasks_data = {
         'pending': pending_tasks,
         'completed': completed_tasks,
-        'schedules': {str(schedule.date): schedule.schedule_data for schedule in schedules}
+        'schedules': ScheduleHistory(current_user.id),
+        'pending_version': render_cache.rows_version(pending_tasks)
     }
     
     return render_template('index.html', profile=current_user, tasks=tasks_data)
@@ -172,25 +226,11 @@ def index():
 @login_required
 def profile():
     # Convert user object to dictionary for JSON serialization
-    user_data = {
-        'id': current_user.id,
-        'username': current_user.username,
-        'email': current_user.email,
-        'name': current_user.name,
-        'role': current_user.role,
-        'schedule_days': current_user.schedule_days,
-        'peak_energy': current_user.peak_energy,
-        'study_preference': current_user.study_preference,
-        'family_time': current_user.family_time,
-        'workout_preference': current_user.workout_preference,
-        'workout_impact': current_user.workout_impact,
-        'main_goals': current_user.main_goals,
-        'sleep_schedule': current_user.sleep_schedule,
-        'weekly_schedule': current_user.weekly_schedule,
-        'is_admin': current_user.is_admin,
-        'created_at': current_user.created_at.isoformat() if current_user.created_at else None
-    }
-    return render_template('profile.html', profile=user_data)
+    user_data = {field: getattr(current_user, field) for field in PROFILE_PAGE_FIELDS}
+    user_data['created_at'] = current_user.created_at.isoformat() if current_user.created_at else None
+    # The rendered page only changes with these values
+    profile_version = json.dumps(user_data, sort_keys=True, default=str)
+    return render_template('profile.html', profile=user_data, profile_version=profile_version)
 
 @app.route('/tasks')
 @login_required
@@ -201,7 +241,9 @@ def tasks():
     tasks_data = {
         'pending': pending_tasks,
         'completed': completed_tasks,
-        'schedules': {}
+        'schedules': {},
+        'pending_version': render_cache.rows_version(pending_tasks),
+        'completed_version': render_cache.rows_version(completed_tasks)
     }
     
     return render_template('tasks.html', tasks=tasks_data)
@@ -210,12 +252,11 @@ def tasks():
 @login_required
 def schedule():
     today = get_today()
-    schedules = Schedule.query.filter_by(user_id=current_user.id).all()
     
     tasks_data = {
         'pending': [],
         'completed': [],
-        'schedules': {str(schedule.date): schedule.schedule_data for schedule in schedules}
+        'schedules': ScheduleHistory(current_user.id)
     }
     
     return render_template('schedule.html', tasks=tasks_data, today=today)
@@ -277,12 +318,15 @@ def api_tasks():
                 status='pending'
             )
             db.session.add(task)
+            UserStats.record(current_user.id, pending_task_count=1)
             db.session.commit()
             return jsonify({"status": "success", "message": "Task added"})
         elif data.get('action') == 'complete':
             task_id = data.get('id')
             task = Task.query.filter_by(id=task_id, user_id=current_user.id).first()
             if task:
+                if task.status != 'completed':
+                    UserStats.record(current_user.id, pending_task_count=-1, completed_task_count=1)
                 task.status = 'completed'
                 task.completed_date = datetime.now()
                 db.session.commit()
@@ -292,6 +336,7 @@ def api_tasks():
             task_id = data.get('id')
             task = Task.query.filter_by(id=task_id, user_id=current_user.id).first()
             if task:
+                UserStats.record(current_user.id, **{f'{task.status}_task_count': -1})
                 db.session.delete(task)
                 db.session.commit()
                 return jsonify({"status": "success", "message": "Task deleted"})
@@ -326,6 +371,119 @@ def api_tasks():
         
         return jsonify(tasks_data)
 
+def _llm_inputs(user, pending_tasks):
+    """Build the profile and task payloads sent to the LLM"""
+    user_profile = {
+        'name': user.name,
+        'role': user.role,
+        'main_goals': user.main_goals,
+        'peak_energy': user.peak_energy,
+        'study_preference': user.study_preference,
+        'workout_preference': user.workout_preference,
+        'workout_impact': user.workout_impact,
+        'family_time': user.family_time,
+        'sleep_schedule': user.sleep_schedule,
+        'weekly_schedule': user.weekly_schedule,
+        # Tunes sampling parameters; not part of the prompt
+        'feedback_stats': FeedbackRollup.for_user(user.id)
+    }
+    
+    tasks_data = [
+        {
+            'description': task.description,
+            'priority': task.priority,
+            'duration': task.duration,
+            'type': task.type,
+            'preferences': task.preferences
+        } for task in pending_tasks
+    ]
+    return user_profile, tasks_data
+
+def _few_shot_examples(user_profile, tasks_data):
+    """Retrieve highly rated schedules from similar users as few-shot context"""
+    example_store = get_example_store()
+    if example_store.needs_rebuild():
+        # Answer from the current index while a fresh one is built
+        rebuild_examples_in_background(example_store)
+    return example_store.query(user_profile, tasks_data)
+
+def _save_schedule(user_id, date_str, schedule_data, source):
+    """Create or replace the user's schedule for a date"""
+    date_obj = datetime.strptime(date_str, "%Y-%m-%d").date()
+    Schedule.upsert(user_id, date_obj, schedule_data, source)
+    metrics.SCHEDULES.inc(source=source)
+
+# Maximum number of operations accepted by one batch request
+TASK_BATCH_LIMIT = 500
+
+@app.route('/api/tasks/batch', methods=['POST'])
+@login_required
+def api_tasks_batch():
+    """Apply many complete/delete operations in a single transaction"""
+    data = request.json or {}
+    operations = data.get('operations')
+    if not isinstance(operations, list) or not operations:
+        return jsonify({"status": "error", "message": "A non-empty 'operations' list is required"}), 400
+    if len(operations) > TASK_BATCH_LIMIT:
+        return jsonify({"status": "error", "message": f"At most {TASK_BATCH_LIMIT} operations per batch"}), 400
+    
+    results = []
+    ids_by_action = {'complete': set(), 'delete': set()}
+    for op in operations:
+        op = op if isinstance(op, dict) else {}
+        task_id, action = op.get('id'), op.get('action')
+        try:
+            task_id = int(task_id)
+        except (TypeError, ValueError):
+            results.append({"id": task_id, "action": action, "status": "error", "message": "Invalid task id"})
+            continue
+        if action not in ids_by_action:
+            results.append({"id": task_id, "action": action, "status": "error", "message": "Unknown action"})
+        else:
+            ids_by_action[action].add(task_id)
+            results.append({"id": task_id, "action": action})
+    
+    # One query to find which of the requested tasks belong to the user
+    requested = ids_by_action['complete'] | ids_by_action['delete']
+    owned = {}
+    if requested:
+        owned = dict(db.session.query(Task.id, Task.status).filter(Task.user_id == current_user.id, Task.id.in_(requested)))
+    
+    # Deletes win over completes for the same id
+    to_delete = ids_by_action['delete'] & owned.keys()
+    to_complete = (ids_by_action['complete'] & owned.keys()) - to_delete
+    newly_completed = sum(1 for task_id in to_complete if owned[task_id] != 'completed')
+    deleted_completed = sum(1 for task_id in to_delete if owned[task_id] == 'completed')
+    try:
+        if to_complete:
+            Task.query.filter(Task.user_id == current_user.id, Task.id.in_(to_complete)) \
+                .update({Task.status: 'completed', Task.completed_date: datetime.now()}, synchronize_session=False)
+        if to_delete:
+            Task.query.filter(Task.user_id == current_user.id, Task.id.in_(to_delete)) \
+                .delete(synchronize_session=False)
+        UserStats.record(
+            current_user.id,
+            pending_task_count=-newly_completed - (len(to_delete) - deleted_completed),
+            completed_task_count=newly_completed - deleted_completed
+        )
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"status": "error", "message": f"Failed to apply batch: {str(e)}"}), 500
+    
+    messages = {'complete': "Task completed", 'delete': "Task deleted"}
+    for result in results:
+        if 'status' in result:
+            continue
+        if result['id'] not in owned:
+            result.update(status="error", message="Task not found")
+        elif result['action'] == 'complete' and result['id'] in to_delete:
+            result.update(status="error", message="Task deleted in the same batch")
+        else:
+            result.update(status="success", message=messages[result['action']])
+    
+    return jsonify({"status": "success", "results": results})
+
 # AI optimize
 @app.route('/api/ai_optimize', methods=['POST'])
 @login_required
@@ -339,51 +497,25 @@ def api_ai_optimize():
         pending_tasks = Task.query.filter_by(user_id=current_user.id, status='pending').all()
         # Allow optimization even without tasks (will use generic slots)
 
+        # Serve tonight's precomputed schedule without touching the LLM
+        schedule_data = _precomputed_schedule(current_user.id, date_str, prompt, pending_tasks)
+        if schedule_data:
+            return jsonify({"status": "success", "date": date_str, "schedule": schedule_data, "source": "precomputed"})
+
         # Get LLM service
         llm_service = get_llm_service()
         
         # Check if Ollama is available
         if llm_service.check_ollama_status():
-            # Prepare user profile data
-            user_profile = {
-                'name': current_user.name,
-                'role': current_user.role,
-                'main_goals': current_user.main_goals,
-                'peak_energy': current_user.peak_energy,
-                'study_preference': current_user.study_preference,
-                'workout_preference': current_user.workout_preference,
-                'workout_impact': current_user.workout_impact,
-                'family_time': current_user.family_time,
-                'sleep_schedule': current_user.sleep_schedule,
-                'weekly_schedule': current_user.weekly_schedule
-            }
-            
-            # Prepare tasks data
-            tasks_data = [
-                {
-                    'description': task.description,
-                    'priority': task.priority,
-                    'duration': task.duration,
-                    'type': task.type,
-                    'preferences': task.preferences
-                } for task in pending_tasks
-            ]
+            user_profile, tasks_data = _llm_inputs(current_user, pending_tasks)
+            examples = _few_shot_examples(user_profile, tasks_data)
             
             # Generate schedule using LLM
-            schedule_data = llm_service.generate_schedule(user_profile, tasks_data, prompt)
+            schedule_data = llm_service.generate_schedule(user_profile, tasks_data, prompt, examples, date_str=date_str)
             
             if schedule_data:
                 # Save schedule to database
-                date_obj = datetime.strptime(date_str, "%Y-%m-%d").date()
-                existing = Schedule.query.filter_by(user_id=current_user.id, date=date_obj).first()
-                
-                if existing:
-                    existing.schedule_data = schedule_data
-                    db.session.commit()
-                else:
-                    new_schedule = Schedule(user_id=current_user.id, date=date_obj, schedule_data=schedule_data)
-                    db.session.add(new_schedule)
-                    db.session.commit()
+                _save_schedule(current_user.id, date_str, schedule_data, 'llm')
                 
                 return jsonify({"status": "success", "date": date_str, "schedule": schedule_data, "source": "llm"})
         
@@ -393,6 +525,8 @@ def api_ai_optimize():
     except Exception as e:
         return jsonify({"error": "server_error", "message": f"Failed to optimize: {str(e)}"}), 500
 
+AI_CHAT_FALLBACK_MESSAGE = "I'm currently unable to access the AI service. Please try again later or use the scheduling feature which can work without AI assistance."
+
 # General AI chat
 @app.route('/api/ai_chat', methods=['POST'])
 @login_required
@@ -404,21 +538,24 @@ def api_ai_chat():
         if not user_message:
             return jsonify({"error": "message_required", "message": "Message is required"}), 400
 
-        # Get LLM service
-        llm_service = get_llm_service()
+        # Answer canned intents locally before any network I/O
+        routed = get_intent_router().respond(user_message, {'name': current_user.name})
+        if routed:
+            metrics.CHAT_RESPONSES.inc(source='intent')
+            return jsonify({"status": "success", "response": routed['response'], "source": "intent", "intent": routed['intent']})
         
-        # Check if Ollama is available
-        if llm_service.check_ollama_status():
-            # Generate response using LLM
-            response = llm_service.generate_general_response(user_message)
-            
-            if response:
-                return jsonify({"status": "success", "response": response})
+        # Generate response using LLM (returns None if Ollama is unavailable)
+        response = get_llm_service().generate_general_response(user_message)
+        
+        if response:
+            metrics.CHAT_RESPONSES.inc(source='llm')
+            return jsonify({"status": "success", "response": response, "source": "llm"})
         
         # Fallback response if LLM is not available
+        metrics.CHAT_RESPONSES.inc(source='fallback')
         return jsonify({
             "status": "fallback",
-            "response": "I'm currently unable to access the AI service. Please try again later or use the scheduling feature which can work without AI assistance."
+            "response": AI_CHAT_FALLBACK_MESSAGE
         })
         
     except Exception as e:
@@ -426,6 +563,12 @@ def api_ai_chat():
 
 def _fallback_optimize(user, pending_tasks, prompt, date_str):
     """Fallback rule-based optimization when LLM is unavailable"""
+    schedule_data = _rule_based_schedule(user, pending_tasks, prompt)
+    _save_schedule(user.id, date_str, schedule_data, 'fallback')
+    return jsonify({"status": "success", "date": date_str, "schedule": schedule_data, "source": "fallback"})
+
+def _rule_based_schedule(user, pending_tasks, prompt):
+    """Build a schedule from the profile, tasks and prompt keywords without the LLM"""
     try:
         sleep_schedule = json.loads(user.sleep_schedule) if isinstance(user.sleep_schedule, str) else (user.sleep_schedule or {})
     except Exception:
@@ -446,17 +589,13 @@ def _fallback_optimize(user, pending_tasks, prompt, date_str):
         start_str = time_match.group(1).upper().replace('AM',' AM').replace('PM',' PM').replace('  ',' ')
         end_str = time_match.group(2).upper().replace('AM',' AM').replace('PM',' PM').replace('  ',' ')
         # Normalize and validate
-        try:
-            _ = datetime.strptime(start_str.strip(), "%I:%M %p")
-            _ = datetime.strptime(end_str.strip(), "%I:%M %p")
+        if parse_clock(start_str) is not None and parse_clock(end_str) is not None:
             college_time_range = (start_str.strip(), end_str.strip())
-        except Exception:
-            college_time_range = None
 
     schedule_items = []
 
     def fmt(dt):
-        return dt.strftime("%I:%M %p").lstrip('0')
+        return format_clock(dt.hour * 60 + dt.minute)
 
     wake_dt = parse_time_str(wake_time)
     cursor = wake_dt
@@ -556,18 +695,28 @@ def _fallback_optimize(user, pending_tasks, prompt, date_str):
             "Hydrate and move regularly"
         ]
     }
+    return schedule_data
 
-    # Save
+def _precomputed_schedule(user_id, date_str, prompt, pending_tasks):
+    """
+    Schedule generated overnight by precompute.py, if it still applies
+    
+    Only used for plain requests (no prompt) while the pending tasks are
+    exactly the ones the schedule was generated for. Rows without task_ids
+    (written by older precompute runs) are regenerated.
+    
+    Returns:
+        dict: Stored schedule data, or None to generate a new one
+    """
+    if prompt:
+        return None
     date_obj = datetime.strptime(date_str, "%Y-%m-%d").date()
-    existing = Schedule.query.filter_by(user_id=user.id, date=date_obj).first()
-    if existing:
-        existing.schedule_data = schedule_data
-        db.session.commit()
-    else:
-        new_schedule = Schedule(user_id=user.id, date=date_obj, schedule_data=schedule_data)
-        db.session.add(new_schedule)
-        db.session.commit()
-    return jsonify({"status": "success", "date": date_str, "schedule": schedule_data, "source": "fallback"})
+    schedule = Schedule.query.filter_by(user_id=user_id, date=date_obj, source='precomputed').first()
+    if schedule is None or schedule.task_ids is None:
+        return None
+    if sorted(schedule.task_ids) != sorted(task.id for task in pending_tasks):
+        return None
+    return schedule.schedule_data
 
 # API routes for schedule
 @app.route('/api/schedule', methods=['POST'])
@@ -575,9 +724,10 @@ def _fallback_optimize(user, pending_tasks, prompt, date_str):
 def api_schedule():
     data = request.json
     date_str = data.get('date', get_today())
+    date_obj = datetime.strptime(date_str, "%Y-%m-%d").date()
     
     # Check if schedule already exists for this date
-    existing_schedule = Schedule.query.filter_by(user_id=current_user.id, date=datetime.strptime(date_str, "%Y-%m-%d").date()).first()
+    existing_schedule = Schedule.query.filter_by(user_id=current_user.id, date=date_obj).first()
     if existing_schedule:
         return jsonify(existing_schedule.schedule_data)
     
@@ -710,17 +860,17 @@ def api_schedule():
         ]
     }
     
-    # Save schedule to database
-    new_schedule = Schedule(
-        user_id=current_user.id,
-        date=datetime.strptime(date_str, "%Y-%m-%d").date(),
-        schedule_data=schedule_data
-    )
-    db.session.add(new_schedule)
-    db.session.commit()
+    # Save schedule to database, keeping one written concurrently
+    if not Schedule.upsert(current_user.id, date_obj, schedule_data, 'rule', overwrite=False):
+        existing_schedule = Schedule.query.filter_by(user_id=current_user.id, date=date_obj).first()
+        return jsonify(existing_schedule.schedule_data)
     
+    metrics.SCHEDULES.inc(source='rule')
     return jsonify(schedule_data)
 
+# Users per admin list page
+ADMIN_PAGE_SIZE = 50
+
 # Admin route
 @app.route('/admin')
 @login_required
@@ -729,8 +879,88 @@ def admin():
         flash('Access denied')
         return redirect(url_for('index'))
     
-    users = User.query.all()
-    return render_template('admin.html', users=users)
+    search = request.args.get('q', '').strip()
+    after = request.args.get('after', type=int)
+    before = request.args.get('before', type=int)
+    
+    # Summary rows are maintained on write, so this is one indexed page query
+    query = db.session.query(User, UserStats, FeedbackRollup) \
+        .outerjoin(UserStats, UserStats.user_id == User.id) \
+        .outerjoin(FeedbackRollup, db.and_(FeedbackRollup.scope_id == User.id, FeedbackRollup.kind == FeedbackRollup.TOTAL))
+    if search:
+        # Case-insensitive prefix scans on the lower(column) indexes
+        query = query.filter(db.or_(*(_prefix_match(column, search) for column in (User.username, User.email, User.name))))
+    
+    # Keyset pagination: pages start after (or end before) a user id, so
+    # deep pages cost the same as the first. One extra row tells whether
+    # there is another page without COUNT(*).
+    if before is not None:
+        rows = query.filter(User.id < before).order_by(User.id.desc()).limit(ADMIN_PAGE_SIZE + 1).all()
+        has_prev, has_next = len(rows) > ADMIN_PAGE_SIZE, True
+        rows = rows[:ADMIN_PAGE_SIZE][::-1]
+    else:
+        if after is not None:
+            query = query.filter(User.id > after)
+        rows = query.order_by(User.id).limit(ADMIN_PAGE_SIZE + 1).all()
+        has_prev, has_next = after is not None, len(rows) > ADMIN_PAGE_SIZE
+        rows = rows[:ADMIN_PAGE_SIZE]
+    
+    return render_template(
+        'admin.html',
+        users=rows,
+        site_stats=SiteStats.get(),
+        site_feedback=FeedbackRollup.get(FeedbackRollup.GLOBAL),
+        search=search,
+        has_prev=has_prev and bool(rows),
+        has_next=has_next and bool(rows)
+    )
+
+def _prefix_match(column, prefix):
+    """
+    lower(column) starts with lower(prefix), in a form its index can serve
+    
+    PostgreSQL uses LIKE 'prefix%' on the text_pattern_ops index (a range is
+    unreliable under non-C collations); SQLite compares bytewise, so a range
+    on the expression index works where its LIKE optimization does not.
+    """
+    lowered = db.func.lower(column)
+    if db.engine.dialect.name == 'postgresql':
+        escaped = prefix.lower().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        return lowered.like(escaped + '%', escape='\\')
+    # lower() on both sides, so non-ASCII letters are folded the same way
+    lowered_prefix = db.func.lower(prefix)
+    return db.and_(lowered >= lowered_prefix, lowered < lowered_prefix.concat('\U0010ffff'))
+
+# Slowest profiled requests shown in the admin UI
+ADMIN_PROFILE_LIMIT = 50
+
+@app.route('/admin/profiles')
+@app.route('/admin/profiles/<profile_id>')
+@login_required
+def admin_profiles(profile_id=None):
+    if not current_user.is_admin:
+        flash('Access denied')
+        return redirect(url_for('index'))
+    
+    store = app.extensions['profile_store']
+    selected = None
+    if profile_id:
+        selected = store.get(profile_id)
+        if selected is None:
+            abort(404)
+    return render_template('admin_profiles.html', profiles=store.slowest(ADMIN_PROFILE_LIMIT), selected=selected)
+
+@app.route('/admin/profiles/<profile_id>.folded')
+@login_required
+def admin_profile_stacks(profile_id):
+    """Collapsed stacks for flamegraph.pl / speedscope"""
+    if not current_user.is_admin:
+        abort(403)
+    collapsed = app.extensions['profile_store'].load(profile_id, '.folded')
+    if collapsed is None:
+        abort(404)
+    return Response(collapsed, mimetype='text/plain',
+                    headers={'Content-Disposition': f'attachment; filename={profile_id}.folded'})
 
 # Schedule feedback endpoint
 @app.route('/api/schedule/feedback', methods=['POST'])
@@ -769,8 +999,13 @@ def submit_schedule_feedback():
         )
         
         db.session.add(feedback)
+        UserStats.record(current_user.id)
+        FeedbackRollup.record(feedback)
         db.session.commit()
         
+        # New ratings may change which schedules serve as few-shot examples
+        get_example_store().mark_stale()
+        
         return jsonify({
             "status": "success",
             "message": "Thank you for your feedback! This helps improve AI scheduling."
@@ -779,8 +1014,21 @@ def submit_schedule_feedback():
     except Exception as e:
         return jsonify({"error": "server_error", "message": str(e)}), 500
 
-# Initialize database tables
-with app.app_context():
+# Number of most reported aspects returned per polarity
+FEEDBACK_TOP_ASPECTS = 5
+
+@app.route('/api/feedback/stats')
+@login_required
+def api_feedback_stats():
+    """Precomputed feedback aggregates for the current user and all users"""
+    return jsonify({
+        "status": "success",
+        "user": FeedbackRollup.get(current_user.id).summary(FEEDBACK_TOP_ASPECTS),
+        "global": FeedbackRollup.get(FeedbackRollup.GLOBAL).summary(FEEDBACK_TOP_ASPECTS)
+    })
+
+def init_database():
+    """Create missing tables and the default admin user (run inside an app context)"""
     db.create_all()
     
     # Create admin user if not exists
@@ -790,9 +1038,30 @@ with app.app_context():
             admin_user = User(username='admin', email='admin@example.com', is_admin=True)
             admin_user.set_password('admin123')
             db.session.add(admin_user)
+            db.session.flush()
+            UserStats.record(admin_user.id, user_count=1)
             db.session.commit()
+            return True
     except Exception as e:
+        db.session.rollback()
         print(f"Error creating admin user: {e}")
+    return False
+
+_db_initialized = False
+_db_init_lock = threading.Lock()
+
+@app.before_request
+def auto_init_database():
+    """Initialize the database on the first request when AUTO_INIT_DB is set"""
+    global _db_initialized
+    if _db_initialized or not app.config['AUTO_INIT_DB']:
+        return
+    with _db_init_lock:
+        if not _db_initialized:
+            init_database()
+            _db_initialized = True
+
+metrics.record_startup('import app', time.perf_counter() - _IMPORT_STARTED)
 
 if __name__ == '__main__':
     app.run(debug=True, port=5012)
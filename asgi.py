@@ -0,0 +1,242 @@
+"""
+ASGI Entry Point with Async LLM Endpoints
+This module serves the Flask app under an ASGI server. The LLM-bound
+endpoints (/api/ai_optimize and /api/ai_chat) are handled natively on the
+event loop, so a request waiting on Ollama no longer pins an OS thread.
+Database work for those endpoints runs in a bounded thread pool off the
+event loop, and every other route is passed through unchanged to the
+Flask (WSGI) app.
+
+Run with:
+    pip install uvicorn
+    uvicorn asgi:application --host 0.0.0.0 --port 5012
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Tuple
+
+from asgiref.wsgi import WsgiToAsgi
+from flask import jsonify, request
+from flask_login import current_user
+from werkzeug.test import EnvironBuilder
+
+from app import (app, AI_CHAT_FALLBACK_MESSAGE, _fallback_optimize, _few_shot_examples,
+                 _llm_inputs, _precomputed_schedule, _save_schedule, get_today)
+from intent_router import get_intent_router
+from llm_service import aclose_llm_service, get_llm_service
+import metrics
+from models import Task
+
+
+# Threads reserved for blocking database work of the async endpoints
+DB_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.environ.get('ASYNC_DB_WORKERS', '8')),
+    thread_name_prefix='asgi-db'
+)
+
+wsgi_application = WsgiToAsgi(app)
+
+
+class _Request:
+    """Buffered ASGI request that can be replayed into Flask request contexts"""
+
+    def __init__(self, scope: Dict, body: bytes):
+        self.scope = scope
+        self.body = body
+
+    def environ(self) -> Dict:
+        """Build a fresh WSGI environ (each context consumes its own input stream)"""
+        scope = self.scope
+        headers = [(name.decode('latin-1'), value.decode('latin-1')) for name, value in scope.get('headers', [])]
+        host, port = scope.get('server') or ('localhost', None)
+        netloc = f"{host}:{port}" if port else host
+        builder = EnvironBuilder(
+            path=scope.get('root_path', '') + scope['path'],
+            method=scope['method'],
+            headers=headers,
+            data=self.body,
+            query_string=scope.get('query_string', b'').decode('latin-1'),
+            base_url=f"{scope.get('scheme', 'http')}://{netloc}",
+        )
+        environ = builder.get_environ()
+        if scope.get('client'):
+            environ['REMOTE_ADDR'] = scope['client'][0]
+        # Spans several request contexts; application() records the timing
+        environ[metrics.EXTERNAL_TIMING_KEY] = True
+        return environ
+
+
+def _finalize(rv) -> Tuple[int, list, bytes]:
+    """Run Flask's response processing and unpack the result for ASGI"""
+    response = app.process_response(app.make_response(rv))
+    return response.status_code, response.headers.to_wsgi_list(), response.get_data()
+
+
+def _in_request_context(req: _Request, fn: Callable, *args):
+    with app.request_context(req.environ()):
+        return fn(*args)
+
+
+async def _run_db(req: _Request, fn: Callable, *args):
+    """Run blocking Flask/SQLAlchemy work in a request context off the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(DB_EXECUTOR, _in_request_context, req, fn, *args)
+
+
+def _authenticate():
+    """Return an early response for unauthenticated or intercepted requests"""
+    rv = app.preprocess_request()
+    if rv is not None:
+        return _finalize(rv)
+    if not current_user.is_authenticated:
+        return _finalize(app.login_manager.unauthorized())
+    return None
+
+
+# AI optimize --------------------------------------------------------------
+
+def _prepare_optimize():
+    early = _authenticate()
+    if early:
+        return early, None
+
+    data = request.get_json(silent=True) or {}
+    prompt = data.get('prompt', '').strip()
+    date_str = data.get('date', get_today())
+    pending_tasks = Task.query.filter_by(user_id=current_user.id, status='pending').all()
+    schedule_data = _precomputed_schedule(current_user.id, date_str, prompt, pending_tasks)
+    if schedule_data:
+        return _finalize(jsonify({"status": "success", "date": date_str, "schedule": schedule_data, "source": "precomputed"})), None
+
+    user_profile, tasks_data = _llm_inputs(current_user, pending_tasks)
+    return None, {
+        'prompt': prompt,
+        'date': date_str,
+        'user_profile': user_profile,
+        'tasks': tasks_data,
+        'examples': _few_shot_examples(user_profile, tasks_data),
+    }
+
+
+def _complete_optimize(job: Dict, schedule_data: Dict):
+    if schedule_data:
+        _save_schedule(current_user.id, job['date'], schedule_data, 'llm')
+        return _finalize(jsonify({"status": "success", "date": job['date'], "schedule": schedule_data, "source": "llm"}))
+
+    # Fallback to rule-based optimization if LLM is not available
+    pending_tasks = Task.query.filter_by(user_id=current_user.id, status='pending').all()
+    return _finalize(_fallback_optimize(current_user, pending_tasks, job['prompt'], job['date']))
+
+
+async def ai_optimize(req: _Request):
+    early, job = await _run_db(req, _prepare_optimize)
+    if early:
+        return early
+
+    schedule_data = await get_llm_service().agenerate_schedule(
+        job['user_profile'], job['tasks'], job['prompt'], job['examples'], date_str=job['date']
+    )
+    return await _run_db(req, _complete_optimize, job, schedule_data)
+
+
+# General AI chat ----------------------------------------------------------
+
+def _prepare_chat():
+    early = _authenticate()
+    if early:
+        return early, None
+
+    data = request.get_json(silent=True) or {}
+    user_message = data.get('message', '').strip()
+    if not user_message:
+        return _finalize((jsonify({"error": "message_required", "message": "Message is required"}), 400)), None
+
+    # Answer canned intents locally before any network I/O
+    routed = get_intent_router().respond(user_message, {'name': current_user.name})
+    if routed:
+        metrics.CHAT_RESPONSES.inc(source='intent')
+        return _finalize(jsonify({"status": "success", "response": routed['response'], "source": "intent", "intent": routed['intent']})), None
+    return None, user_message
+
+
+def _complete_chat(response):
+    if response:
+        metrics.CHAT_RESPONSES.inc(source='llm')
+        return _finalize(jsonify({"status": "success", "response": response, "source": "llm"}))
+    metrics.CHAT_RESPONSES.inc(source='fallback')
+    return _finalize(jsonify({"status": "fallback", "response": AI_CHAT_FALLBACK_MESSAGE}))
+
+
+async def ai_chat(req: _Request):
+    early, user_message = await _run_db(req, _prepare_chat)
+    if early:
+        return early
+
+    response = await get_llm_service().agenerate_general_response(user_message)
+    return await _run_db(req, _complete_chat, response)
+
+
+ASYNC_ROUTES = {
+    ('POST', '/api/ai_optimize'): ('Failed to optimize', ai_optimize),
+    ('POST', '/api/ai_chat'): ('Failed to process message', ai_chat),
+}
+
+
+# ASGI plumbing ------------------------------------------------------------
+
+async def _read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            break
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body'):
+            break
+    return b''.join(chunks)
+
+
+async def _send_response(send, status: int, headers: list, body: bytes):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            DB_EXECUTOR.shutdown(wait=False)
+            await aclose_llm_service()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send):
+    """ASGI application: async LLM endpoints, everything else via Flask"""
+    if scope['type'] == 'lifespan':
+        return await _lifespan(receive, send)
+
+    route = ASYNC_ROUTES.get((scope.get('method'), scope.get('path'))) if scope['type'] == 'http' else None
+    if route is None:
+        return await wsgi_application(scope, receive, send)
+
+    error_message, handler = route
+    started = time.perf_counter()
+    req = _Request(scope, await _read_body(receive))
+    try:
+        status, headers, body = await handler(req)
+    except Exception as e:
+        status, headers, body = await _run_db(
+            req, lambda: _finalize((jsonify({"error": "server_error", "message": f"{error_message}: {str(e)}"}), 500))
+        )
+    metrics.REQUEST_SECONDS.observe(time.perf_counter() - started, method=scope['method'], route=scope['path'], status=status)
+    await _send_response(send, status, headers, body)
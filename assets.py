@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Static Asset Pipeline
+Stylesheets and scripts live in static/ and are linked from templates with
+asset_url('css/app.css'). That returns a fingerprinted URL
+(/assets/css/app.<hash>.css) whose content can never change, so it is
+served with a one-year immutable Cache-Control header. A new deploy that
+changes a file changes its URL.
+
+Vendor libraries (Bootstrap, jQuery, Font Awesome) are self-hosted under
+static/vendor so pages work without internet access. Fetch the pinned
+versions once and commit them:
+    python assets.py vendor
+Until a vendor file is present, asset_url falls back to its CDN URL. That
+is only meant for development: the deploy step below fails while any
+vendor file (or a font its CSS refers to) is missing, unless --allow-cdn
+is given.
+
+Precompressed .gz (and .br, if the 'brotli' package is installed) copies
+sit next to each file and are served to clients that accept them:
+    python assets.py build
+"""
+
+import argparse
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import sys
+import urllib.parse
+import urllib.request
+from typing import Dict, List, Optional, Tuple
+
+from flask import abort, request, send_file, url_for
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+
+# Local path under static/ -> pinned upstream URL
+VENDOR = {
+    'vendor/bootstrap-5.3.0/css/bootstrap.min.css': 'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css',
+    'vendor/bootstrap-5.3.0/js/bootstrap.bundle.min.js': 'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js',
+    'vendor/jquery-3.6.0/jquery.min.js': 'https://code.jquery.com/jquery-3.6.0.min.js',
+    'vendor/fontawesome-6.0.0/css/all.min.css': 'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css',
+}
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+COMPRESSIBLE = ('.css', '.js', '.svg', '.json', '.map', '.ttf', '.eot')
+CSS_URL = re.compile(r"""url\(\s*['"]?([^'")]+)['"]?\s*\)""")
+
+# path -> (mtime_ns, digest); files only change between deploys or in debug mode
+_digests: Dict[str, Tuple[int, str]] = {}
+
+
+def _source_path(path: str) -> str:
+    return os.path.join(STATIC_DIR, *path.split('/'))
+
+
+def file_digest(path: str) -> Optional[str]:
+    """First 10 hex digits of the file's SHA-256, or None if it does not exist"""
+    source = _source_path(path)
+    try:
+        mtime = os.stat(source).st_mtime_ns
+    except OSError:
+        return None
+    cached = _digests.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    with open(source, 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()[:10]
+    _digests[path] = (mtime, digest)
+    return digest
+
+
+def fingerprinted_name(path: str, digest: str) -> str:
+    """css/app.css -> css/app.<digest>.css"""
+    stem, ext = os.path.splitext(path)
+    return f"{stem}.{digest}{ext}"
+
+
+def split_fingerprint(name: str) -> Tuple[str, Optional[str]]:
+    """css/app.<digest>.css -> ('css/app.css', digest); names without one come back unchanged"""
+    stem, ext = os.path.splitext(name)
+    base, dot, digest = stem.rpartition('.')
+    if dot and len(digest) == 10 and all(c in '0123456789abcdef' for c in digest):
+        return base + ext, digest
+    return name, None
+
+
+def asset_url(path: str) -> str:
+    """
+    URL of a static asset for templates
+
+    Args:
+        path: Path under static/, e.g. 'css/app.css'
+
+    Returns:
+        str: Fingerprinted /assets/ URL, or the CDN URL of a vendor file that has not been fetched
+    """
+    digest = file_digest(path)
+    if digest is None:
+        if path in VENDOR:
+            return VENDOR[path]
+        return url_for('static', filename=path)
+    return url_for('asset', filename=fingerprinted_name(path, digest))
+
+
+def serve_asset(filename: str):
+    """Serve a static file, preferring a fresh precompressed copy the client accepts"""
+    path, digest = split_fingerprint(filename)
+    source = safe_join(STATIC_DIR, path)
+    if source is None or not os.path.isfile(source):
+        abort(404)
+
+    # Unversioned files (e.g. fonts referenced from vendor CSS) and outdated
+    # fingerprints are cached briefly, current fingerprints for good
+    immutable = digest is not None and digest == file_digest(path)
+    max_age = IMMUTABLE_MAX_AGE if immutable else 3600
+
+    mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    response = None
+    for encoding, suffix in (('br', '.br'), ('gzip', '.gz')):
+        variant = source + suffix
+        # Quality lookup honours q=0 and '*', unlike a substring test
+        if request.accept_encodings[encoding] > 0 and os.path.isfile(variant) \
+                and os.stat(variant).st_mtime_ns >= os.stat(source).st_mtime_ns:
+            response = send_file(variant, mimetype=mimetype, conditional=True, max_age=max_age)
+            response.headers['Content-Encoding'] = encoding
+            break
+    if response is None:
+        response = send_file(source, mimetype=mimetype, conditional=True, max_age=max_age)
+    response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.immutable = immutable or None
+    return response
+
+
+def init_app(app):
+    """Register the /assets/ route and the asset_url template helper"""
+    app.add_url_rule('/assets/<path:filename>', 'asset', serve_asset)
+    app.jinja_env.globals['asset_url'] = asset_url
+
+
+# Build commands -------------------------------------------------------------
+
+def _fetch(url: str) -> bytes:
+    with urllib.request.urlopen(url, timeout=60) as response:
+        return response.read()
+
+
+def _write(path: str, data: bytes):
+    target = _source_path(path)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(target, 'wb') as f:
+        f.write(data)
+
+
+def _css_refs(path: str, url: str, data: bytes):
+    """(local path, upstream URL) of each relative url() in a vendor stylesheet"""
+    for ref in sorted(set(CSS_URL.findall(data.decode('utf-8')))):
+        if ref.startswith(('data:', '#', '/')) or '://' in ref:
+            continue
+        relative = ref.split('?', 1)[0].split('#', 1)[0]
+        local = os.path.normpath(os.path.join(os.path.dirname(path), relative)).replace(os.sep, '/')
+        yield local, urllib.parse.urljoin(url, relative)
+
+
+def missing_vendor_files() -> List[str]:
+    """Vendor files, and fonts their stylesheets refer to, that have not been fetched"""
+    missing = []
+    for path, url in VENDOR.items():
+        if not os.path.exists(_source_path(path)):
+            missing.append(path)
+            continue
+        if path.endswith('.css'):
+            with open(_source_path(path), 'rb') as f:
+                data = f.read()
+            missing.extend(local for local, _ in _css_refs(path, url, data)
+                           if not os.path.exists(_source_path(local)))
+    return missing
+
+
+def vendor(force: bool = False) -> int:
+    """
+    Download the pinned vendor files, including fonts their CSS refers to
+
+    Returns:
+        int: Number of files written
+    """
+    written = 0
+    for path, url in VENDOR.items():
+        if os.path.exists(_source_path(path)) and not force:
+            with open(_source_path(path), 'rb') as f:
+                data = f.read()
+        else:
+            data = _fetch(url)
+            _write(path, data)
+            written += 1
+            print(f"{path} <- {url}")
+        if not path.endswith('.css'):
+            continue
+        for local, ref_url in _css_refs(path, url, data):
+            if os.path.exists(_source_path(local)) and not force:
+                continue
+            _write(local, _fetch(ref_url))
+            written += 1
+            print(f"{local} <- {ref_url}")
+    return written
+
+
+def build() -> int:
+    """
+    Write precompressed .gz/.br copies of the text assets under static/
+
+    Returns:
+        int: Number of compressed files written
+    """
+    written = 0
+    for root, _, files in os.walk(STATIC_DIR):
+        for name in files:
+            if not name.endswith(COMPRESSIBLE):
+                continue
+            source = os.path.join(root, name)
+            with open(source, 'rb') as f:
+                data = f.read()
+            variants = {'.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                variants['.br'] = brotli.compress(data, quality=11)
+            for suffix, compressed in variants.items():
+                if len(compressed) >= len(data):
+                    continue
+                with open(source + suffix, 'wb') as f:
+                    f.write(compressed)
+                written += 1
+    if brotli is None:
+        print("brotli is not installed; only gzip copies were written")
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fetch vendor libraries and precompress static assets")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    vendor_parser = subparsers.add_parser('vendor', help="Download the pinned vendor files into static/vendor")
+    vendor_parser.add_argument('--force', action='store_true', help="Download files that already exist")
+    build_parser = subparsers.add_parser('build', help="Write .gz/.br copies next to static files")
+    build_parser.add_argument('--allow-cdn', action='store_true',
+                              help="Build even if vendor files are missing (pages then load them from the CDN)")
+    args = parser.parse_args(argv)
+
+    if args.command == 'vendor':
+        print(f"Fetched {vendor(args.force)} vendor files")
+        return 0
+
+    missing = missing_vendor_files()
+    if missing and not args.allow_cdn:
+        print("❌ Vendor files are missing; run 'python assets.py vendor' and commit static/vendor:")
+        for path in missing:
+            print(f"   {path}")
+        return 1
+    print(f"Wrote {build()} compressed files")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks: time_utils against the strptime-based helpers it replaced
+Checks that both give the same answers on a sample of schedule strings,
+then times each pair.
+
+    python bench_time_utils.py [--number 20000]
+"""
+
+import argparse
+import timeit
+from datetime import datetime, timedelta
+
+import time_utils
+
+SAMPLE_TIMES = ['7:00 AM', '12:30 PM', '11:45 PM', '12:00 AM', '5:30 AM', '10:30 PM', '19:00', '07:15', 'noon', '']
+SAMPLE_RANGES = ['9:00 AM - 11:00 AM', '7:00 AM - 7:30 AM', '11:00 PM - 1:00 AM', '1:00 PM - 2:30 PM',
+                 '6:30 - 7:00 PM', 'Generated by AI', '12:00 PM - 12:45 PM']
+
+
+# Previous implementations (app.add_time, app.parse_time_str, OllamaLLMService._estimate_duration)
+
+def legacy_add_time(time_str, minutes):
+    try:
+        if "AM" in time_str.upper() or "PM" in time_str.upper():
+            time_obj = datetime.strptime(time_str.strip(), "%I:%M %p")
+        else:
+            time_obj = datetime.strptime(time_str.strip(), "%H:%M")
+        new_time = time_obj + timedelta(minutes=minutes)
+        if "AM" in time_str.upper() or "PM" in time_str.upper():
+            return new_time.strftime("%I:%M %p").lstrip('0')
+        else:
+            return new_time.strftime("%H:%M")
+    except:
+        return time_str
+
+
+def legacy_parse_time_str(time_str):
+    try:
+        if "AM" in time_str.upper() or "PM" in time_str.upper():
+            return datetime.strptime(time_str.strip(), "%I:%M %p")
+        return datetime.strptime(time_str.strip(), "%H:%M")
+    except:
+        return datetime.strptime("7:00 AM", "%I:%M %p")
+
+
+def legacy_estimate_duration(time_range):
+    try:
+        parts = time_range.split('-')
+        if len(parts) != 2:
+            return 60
+        start = datetime.strptime(parts[0].strip(), "%I:%M %p")
+        end = datetime.strptime(parts[1].strip(), "%I:%M %p")
+        duration = (end - start).total_seconds() / 60
+        return int(duration) if duration > 0 else 60
+    except:
+        return 60
+
+
+def new_parse_time_str(time_str):
+    minutes = time_utils.parse_clock(time_str)
+    return time_utils.clock_datetime(7 * 60 if minutes is None else minutes)
+
+
+PAIRS = [
+    ('add_time', lambda: [legacy_add_time(t, 90) for t in SAMPLE_TIMES],
+     lambda: [time_utils.shift_clock(t, 90) for t in SAMPLE_TIMES]),
+    ('parse_time_str', lambda: [legacy_parse_time_str(t) for t in SAMPLE_TIMES],
+     lambda: [new_parse_time_str(t) for t in SAMPLE_TIMES]),
+    ('estimate_duration', lambda: [legacy_estimate_duration(r) for r in SAMPLE_RANGES],
+     lambda: [time_utils.range_minutes(r) for r in SAMPLE_RANGES]),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--number', type=int, default=20000, help='calls of each batch per measurement')
+    args = parser.parse_args()
+
+    for name, legacy, new in PAIRS:
+        legacy_result, new_result = legacy(), new()
+        # Expected: time_utils reads a start without AM/PM ("6:30 - 7:00 PM") in the end's half of the day
+        if legacy_result != new_result:
+            mismatches = [(a, b) for a, b in zip(legacy_result, new_result) if a != b]
+            print(f"{name}: results differ {mismatches}")
+        legacy_seconds = min(timeit.repeat(legacy, number=args.number, repeat=3))
+        new_seconds = min(timeit.repeat(new, number=args.number, repeat=3))
+        per_call = args.number * len(legacy_result)
+        print(f"{name:18} strptime {legacy_seconds / per_call * 1e6:7.2f} us/call   "
+              f"time_utils {new_seconds / per_call * 1e6:7.2f} us/call   x{legacy_seconds / new_seconds:.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,10 @@
+"""
+Pytest setup shared by every test module
+
+Points the app at an in-memory database before any test imports it, so a
+test run never reads or changes the committed instance/task_optimizer.db.
+"""
+
+import os
+
+os.environ['DATABASE_URL'] = 'sqlite://'
@@ -0,0 +1,382 @@
+"""
+Feedback-Aware Few-Shot Example Store
+This module builds a compact similarity index over highly rated schedules
+so that the schedule prompt can include the most similar examples users
+actually liked. Each example is reduced to a normalized feature vector
+(role, peak energy, task-type mix and durations); retrieval is a dot
+product against every stored vector followed by a top-k selection.
+
+With numpy installed the vectors are kept as one matrix and scored with a
+single matrix-vector product. numpy is optional: the index holds at most
+EXAMPLE_STORE_CONFIG['max_examples'] vectors of DIMENSIONS floats, which
+plain Python scores in well under a millisecond, and the serverless
+deployment would otherwise pay for importing it on every cold start.
+
+Rebuilding from the database runs on a background thread; queries keep
+using the current index until the new one is swapped in.
+"""
+
+import heapq
+import json
+import math
+import os
+import threading
+import time
+from operator import mul
+from typing import Dict, List, Optional
+
+from llm_config import EXAMPLE_STORE_CONFIG, FEW_SHOT_EXAMPLES
+from time_utils import range_minutes
+
+try:
+    import numpy  # Optional: vectorized scoring
+except ImportError:
+    numpy = None
+
+
+ROLES = ['student', 'working professional']
+PEAK_ENERGY = ['morning', 'afternoon', 'evening', 'night']
+TASK_TYPES = ['study', 'work', 'college', 'personal', 'health', 'family']
+DIMENSIONS = len(ROLES) + 1 + len(PEAK_ENERGY) + len(TASK_TYPES) + 2
+
+
+def _one_hot(value: Optional[str], choices: List[str], other: bool = False) -> List[float]:
+    value = (value or '').lower()
+    vector = [1.0 if choice in value else 0.0 for choice in choices]
+    if other:
+        vector.append(0.0 if any(vector) else 1.0)
+    return vector
+
+
+def _task_minutes(duration: Optional[str]) -> float:
+    """Parse task durations like '1h', '1.5h' or '30m' into minutes"""
+    duration = (duration or '1h').lower().strip()
+    try:
+        if 'h' in duration:
+            return float(duration.replace('h', '').strip()) * 60
+        if 'm' in duration:
+            return float(duration.replace('m', '').strip())
+    except ValueError:
+        pass
+    return 60.0
+
+
+def _block_minutes(time_range: str) -> float:
+    """Parse schedule blocks like '9:00 AM - 11:00 AM' into minutes"""
+    return float(range_minutes(time_range))
+
+
+def _resolve_path(path: str) -> str:
+    """Resolve relative index paths against the project directory"""
+    return path if os.path.isabs(path) else os.path.join(os.path.dirname(os.path.abspath(__file__)), path)
+
+
+def feature_vector(role: Optional[str], peak_energy: Optional[str], types: List[str], minutes: List[float]) -> List[float]:
+    """
+    Build a unit-length feature vector
+
+    Args:
+        role: User role ('student', 'working professional', ...)
+        peak_energy: Peak energy time of day
+        types: Task or schedule item types
+        minutes: Task or schedule block durations in minutes
+
+    Returns:
+        List of DIMENSIONS floats with Euclidean norm 1 (or all zeros)
+    """
+    mix = [0.0] * len(TASK_TYPES)
+    for item_type in types:
+        item_type = (item_type or '').lower()
+        for i, known in enumerate(TASK_TYPES):
+            if known in item_type:
+                mix[i] += 1.0
+    total = sum(mix)
+    if total:
+        mix = [count / total for count in mix]
+
+    total_hours = sum(minutes) / 60
+    mean_hours = total_hours / len(minutes) if minutes else 0.0
+    durations = [min(total_hours / 12, 1.0), min(mean_hours / 3, 1.0)]
+
+    vector = _one_hot(role, ROLES, other=True) + _one_hot(peak_energy, PEAK_ENERGY) + mix + durations
+    norm = math.sqrt(sum(v * v for v in vector))
+    return [v / norm for v in vector] if norm else vector
+
+
+class ExampleStore:
+    """Similarity index over highly rated schedules used as few-shot context"""
+
+    def __init__(self, config: Dict = None):
+        """
+        Initialize the example store
+
+        Args:
+            config: Store settings (default: EXAMPLE_STORE_CONFIG)
+        """
+        self.config = config if config is not None else EXAMPLE_STORE_CONFIG
+        self.examples: List[Dict] = []
+        self._vectors: List[tuple] = []
+        self._matrix = None
+        self.built_at = 0.0
+        self._stale = True
+        self._generation = 0  # Bumped by mark_stale
+        self._lock = threading.Lock()
+        self._load_seed_examples()
+
+    def _load_seed_examples(self):
+        """Index the static FEW_SHOT_EXAMPLES so the store is never empty"""
+        for example in FEW_SHOT_EXAMPLES:
+            context = example['user_context']
+            tasks = context.get('tasks', [])
+            self._add(
+                context.get('role'),
+                context.get('peak_energy'),
+                [t.get('type') for t in tasks],
+                [_task_minutes(t.get('duration')) for t in tasks],
+                {
+                    'role': context.get('role'),
+                    'peak_energy': context.get('peak_energy'),
+                    'rating': None,
+                    'items': [example['good_schedule_snippet']],
+                }
+            )
+
+    def _add(self, role, peak_energy, types, minutes, example: Dict):
+        self._vectors.append(tuple(feature_vector(role, peak_energy, types, minutes)))
+        self.examples.append(example)
+        self._matrix = None
+
+    def __len__(self) -> int:
+        return len(self.examples)
+
+    def mark_stale(self):
+        """Request a rebuild (e.g. after new feedback)"""
+        with self._lock:
+            self._stale = True
+            self._generation += 1
+
+    def needs_rebuild(self) -> bool:
+        """True if marked stale or older than the configured TTL"""
+        return self._stale or time.time() - self.built_at > self.config['rebuild_interval_seconds']
+
+    def add_schedule(self, role: Optional[str], peak_energy: Optional[str], schedule_data: Dict, rating: float):
+        """
+        Index one rated schedule
+
+        Args:
+            role: Role of the schedule's owner
+            peak_energy: Peak energy time of the schedule's owner
+            schedule_data: Stored schedule JSON
+            rating: Average user rating (1-5)
+        """
+        items = [item for item in (schedule_data or {}).get('schedule', []) if isinstance(item, dict)]
+        if not items:
+            return
+        # Keep the most instructive blocks: high priority and task-specific first
+        snippet = sorted(items, key=lambda item: (item.get('priority') != 'high', item.get('type') in ('break', 'personal')))
+        self._add(
+            role,
+            peak_energy,
+            [item.get('type') for item in items],
+            [_block_minutes(item.get('time', '')) for item in items],
+            {
+                'role': role,
+                'peak_energy': peak_energy,
+                'rating': round(rating, 1),
+                'items': [
+                    {k: item.get(k) for k in ('time', 'task', 'reason', 'type', 'priority') if item.get(k)}
+                    for item in snippet[:self.config['max_items_per_example']]
+                ],
+            }
+        )
+
+    def query(self, user_profile: Dict, tasks: List[Dict], k: int = None) -> List[Dict]:
+        """
+        Retrieve the top-k most similar highly rated examples
+
+        Args:
+            user_profile: Profile of the user requesting a schedule
+            tasks: The user's pending tasks
+            k: Number of examples (default: config 'top_k')
+
+        Returns:
+            List of example dicts, most similar first
+        """
+        k = k or self.config['top_k']
+        target = feature_vector(
+            user_profile.get('role'),
+            user_profile.get('peak_energy'),
+            [t.get('type') for t in tasks],
+            [_task_minutes(t.get('duration')) for t in tasks]
+        )
+        with self._lock:
+            vectors = self._vectors
+            examples = self.examples
+            matrix = self._matrix
+        if numpy is not None and vectors:
+            if matrix is None:
+                matrix = numpy.asarray(vectors)
+                with self._lock:
+                    if self._vectors is vectors:
+                        self._matrix = matrix
+            scores = matrix @ numpy.asarray(target)
+            top = numpy.argsort(-scores, kind='stable')[:k]
+            return [examples[i] for i in top]
+        scores = [sum(map(mul, target, vector)) for vector in vectors]
+        return [examples[i] for i in heapq.nlargest(k, range(len(scores)), key=scores.__getitem__)]
+
+    def _swap(self, examples: List[Dict], vectors: List[tuple], built_at: float, generation: int = None):
+        """Publish a new index; it stays stale if marked so after generation"""
+        with self._lock:
+            self.examples = examples
+            self._vectors = vectors
+            self._matrix = None
+            self.built_at = built_at
+            self._stale = generation is not None and generation != self._generation
+
+    def rebuild(self, rows, generation: int = None) -> 'ExampleStore':
+        """
+        Rebuild the index from rated schedule rows
+
+        Args:
+            rows: Iterable of (role, peak_energy, schedule_data, rating)
+            generation: self.generation when the rows were read; feedback
+                marked after that keeps the index stale
+
+        Returns:
+            self
+        """
+        fresh = ExampleStore(self.config)
+        for role, peak_energy, schedule_data, rating in rows:
+            fresh.add_schedule(role, peak_energy, schedule_data, rating)
+        self._swap(fresh.examples, fresh._vectors, time.time(), generation)
+        return self
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def save(self, path: str = None):
+        """Persist the index so new processes start warm"""
+        path = _resolve_path(path or self.config['index_path'])
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'built_at': self.built_at, 'examples': self.examples, 'vectors': self._vectors}, f)
+        os.replace(tmp_path, path)
+
+    def load(self, path: str = None) -> bool:
+        """
+        Load a persisted index
+
+        Returns:
+            bool: True if an index compatible with this version was loaded
+        """
+        path = _resolve_path(path or self.config['index_path'])
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        vectors = [tuple(vector) for vector in data.get('vectors', [])]
+        examples = data.get('examples', [])
+        if len(vectors) != len(examples) or any(len(vector) != DIMENSIONS for vector in vectors):
+            return False
+        self._swap(examples, vectors, data.get('built_at', 0.0))
+        return True
+
+
+def format_examples(examples: List[Dict]) -> str:
+    """Render retrieved examples as a prompt section"""
+    lines = []
+    for i, example in enumerate(examples, 1):
+        rating = f", rated {example['rating']}/5" if example.get('rating') else ''
+        lines.append(f"Example {i} ({example.get('role') or 'user'}, {example.get('peak_energy') or 'any'} peak energy{rating}):")
+        lines.append(json.dumps(example.get('items', [])))
+    return '\n'.join(lines)
+
+
+def rebuild_from_database(store: ExampleStore) -> ExampleStore:
+    """
+    Rebuild an example store from highly rated Schedule rows
+
+    A schedule's rating is the average of its ScheduleFeedback ratings,
+    falling back to Schedule.user_rating. Must run inside an app context.
+    Returns at once, leaving the index as it is, if another rebuild is
+    already running.
+    """
+    if not _rebuild_lock.acquire(blocking=False):
+        return store
+    try:
+        _rebuild(store)
+    finally:
+        _rebuild_lock.release()
+    return store
+
+
+def rebuild_in_background(store: ExampleStore, app) -> bool:
+    """
+    Rebuild on a daemon thread so the calling request is not delayed
+
+    Queries keep using the current index until the rebuilt one is
+    swapped in (stale-while-rebuild).
+
+    Args:
+        store: Store to rebuild
+        app: Flask app providing the database
+
+    Returns:
+        bool: False if a rebuild was already running
+    """
+    if not _rebuild_lock.acquire(blocking=False):
+        return False
+
+    def run():
+        try:
+            with app.app_context():
+                _rebuild(store)
+        except Exception as e:
+            print(f"Could not rebuild few-shot index: {e}")
+        finally:
+            _rebuild_lock.release()
+
+    threading.Thread(target=run, name='example-store-rebuild', daemon=True).start()
+    return True
+
+
+def _rebuild(store: ExampleStore):
+    from models import db, User, Schedule, ScheduleFeedback
+
+    generation = store.generation
+    feedback = db.session.query(
+        ScheduleFeedback.schedule_id.label('schedule_id'),
+        db.func.avg(ScheduleFeedback.overall_rating).label('rating')
+    ).group_by(ScheduleFeedback.schedule_id).subquery()
+    rating = db.func.coalesce(feedback.c.rating, Schedule.user_rating)
+
+    rows = db.session.query(User.role, User.peak_energy, Schedule, rating) \
+        .join(User, User.id == Schedule.user_id) \
+        .outerjoin(feedback, feedback.c.schedule_id == Schedule.id) \
+        .filter(rating >= store.config['min_rating']) \
+        .order_by(Schedule.created_at.desc()) \
+        .limit(store.config['max_examples'])
+
+    store.rebuild(((role, peak, schedule.schedule_data, float(score)) for role, peak, schedule, score in rows), generation)
+    try:
+        store.save()
+    except OSError as e:
+        # Read-only filesystems (e.g. serverless) keep the in-memory index
+        print(f"Could not persist few-shot index: {e}")
+
+
+# Singleton instance
+_example_store = None
+_rebuild_lock = threading.Lock()
+
+def get_example_store() -> ExampleStore:
+    """Get or create the example store singleton, loading a persisted index"""
+    global _example_store
+    if _example_store is None:
+        _example_store = ExampleStore()
+        _example_store.load()
+    return _example_store
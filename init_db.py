@@ -1,15 +1,9 @@
-from app import app, db, User
+from app import app, init_database
 
+# Creates the schema and the admin user; run once per deployment (the web app no
+# longer does this at import time, see AUTO_INIT_DB in app.py)
 with app.app_context():
-    db.create_all()
-    
-    # Create admin user if not exists
-    admin_user = User.query.filter_by(username='admin').first()
-    if not admin_user:
-        admin_user = User(username='admin', email='admin@example.com', is_admin=True)
-        admin_user.set_password('admin123')
-        db.session.add(admin_user)
-        db.session.commit()
+    if init_database():
         print('Database initialized and admin user created')
     else:
-        print('Admin user already exists')
\ No newline at end of file
+        print('Admin user already exists')
@@ -0,0 +1,108 @@
+"""
+Local Intent Router for AI Chat
+This module classifies chat messages before any network I/O so that
+canned or templated intents (greetings, thanks, scheduling redirects)
+are answered immediately without calling the Ollama API.
+"""
+
+import re
+from typing import Dict, List, Optional, Pattern, Tuple
+
+from llm_config import PREFERENCE_ADAPTATION
+
+
+class _TemplateContext(dict):
+    """Format mapping that leaves unknown placeholders empty"""
+
+    def __missing__(self, key):
+        return ''
+
+
+class IntentRouter:
+    """Keyword/regex automaton that maps chat messages to local intents"""
+
+    DEFAULT_CONTEXT = {'name': 'there'}
+
+    def __init__(self, config: Dict = None):
+        """
+        Initialize the intent router
+
+        Args:
+            config: Mapping with 'intent_keywords', 'intent_patterns' and
+                'intent_responses' (default: PREFERENCE_ADAPTATION)
+        """
+        config = config if config is not None else PREFERENCE_ADAPTATION
+        self.responses: Dict[str, str] = dict(config.get('intent_responses', {}))
+        self._matchers: List[Tuple[str, Pattern]] = self._compile(
+            config.get('intent_keywords', {}),
+            config.get('intent_patterns', {})
+        )
+
+    def _compile(self, keywords: Dict[str, List[str]], patterns: Dict[str, List[str]]) -> List[Tuple[str, Pattern]]:
+        """
+        Compile keywords and patterns into one regex per intent
+
+        Keywords match at the start of a word, so 'plan' also matches
+        'planning'. Intents without a response template are ignored.
+
+        Returns:
+            List of (intent, compiled pattern) in priority order
+        """
+        matchers = []
+        for intent in self.responses:
+            alternatives = [r'\b' + re.escape(kw.lower()) for kw in keywords.get(intent, [])]
+            alternatives.extend(f'(?:{p})' for p in patterns.get(intent, []))
+            if alternatives:
+                matchers.append((intent, re.compile('|'.join(alternatives), re.IGNORECASE)))
+        return matchers
+
+    def classify(self, message: str) -> Optional[str]:
+        """
+        Classify a chat message
+
+        Args:
+            message: The user's chat message
+
+        Returns:
+            str: Name of the first matching intent, or None if the message
+            needs the model
+        """
+        if not message:
+            return None
+        for intent, pattern in self._matchers:
+            if pattern.search(message):
+                return intent
+        return None
+
+    def respond(self, message: str, context: Dict = None) -> Optional[Dict]:
+        """
+        Answer a message locally if it matches a canned or templated intent
+
+        Args:
+            message: The user's chat message
+            context: Values for the response template (e.g. {'name': 'Alex'})
+
+        Returns:
+            Dict with 'intent' and 'response', or None if the model is needed
+        """
+        intent = self.classify(message)
+        if intent is None:
+            return None
+
+        values = _TemplateContext(self.DEFAULT_CONTEXT)
+        values.update({k: v for k, v in (context or {}).items() if v})
+        return {
+            'intent': intent,
+            'response': self.responses[intent].format_map(values)
+        }
+
+
+# Singleton instance
+_intent_router = None
+
+def get_intent_router() -> IntentRouter:
+    """Get or create the intent router singleton"""
+    global _intent_router
+    if _intent_router is None:
+        _intent_router = IntentRouter()
+    return _intent_router
@@ -0,0 +1,230 @@
+"""
+Tolerant JSON Extraction for LLM Output
+This module recovers schedule JSON from model output that contains
+surrounding prose, markdown fences, small syntax slips (trailing commas,
+unquoted keys, Python literals) or a truncated `schedule` array, and
+validates the recovered items against the schedule item schema.
+"""
+
+import json
+import re
+from typing import Dict, List, Optional, Tuple
+
+from llm_config import VALIDATION_CONFIG
+
+
+_CLOSERS = {'{': '}', '[': ']'}
+_TRAILING_COMMA = re.compile(r',(\s*[}\]])')
+_BARE_KEY = re.compile(r'([{,]\s*)([A-Za-z_][\w\-]*)(\s*:)')
+_PY_LITERALS = re.compile(r'\b(True|False|None)\b')
+_PY_LITERAL_MAP = {'True': 'true', 'False': 'false', 'None': 'null'}
+
+
+class StreamingJSONExtractor:
+    """
+    Incrementally locate the first top-level JSON object in a text stream
+
+    Chunks are fed as they arrive; the extractor tracks string/escape state
+    and bracket nesting so it knows exactly when the top-level object closes,
+    and remembers the last position where the object can be cut cleanly
+    if the stream ends early.
+    """
+
+    def __init__(self):
+        self.buffer = ''
+        self.start = -1
+        self.end = -1
+        self._pos = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._safe_cut: Tuple[int, Tuple[str, ...]] = (-1, ())
+
+    @property
+    def complete(self) -> bool:
+        """True once the top-level object has closed"""
+        return self.end != -1
+
+    def feed(self, chunk: str) -> bool:
+        """
+        Consume a chunk of model output
+
+        Args:
+            chunk: Newly generated text
+
+        Returns:
+            bool: True if the top-level JSON object is now complete
+        """
+        if self.complete or not chunk:
+            return self.complete
+
+        self.buffer += chunk
+        text = self.buffer
+        while self._pos < len(text):
+            ch = text[self._pos]
+            if self.start == -1:
+                if ch == '{':
+                    self.start = self._pos
+                    self._stack.append(ch)
+            elif self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in _CLOSERS:
+                self._stack.append(ch)
+            elif ch in '}]' and self._stack:
+                self._stack.pop()
+                if not self._stack:
+                    self.end = self._pos + 1
+                    self._pos += 1
+                    return True
+                # A nested container just closed: cutting here keeps valid JSON
+                self._safe_cut = (self._pos + 1, tuple(self._stack))
+            self._pos += 1
+        return False
+
+    def candidate(self) -> Optional[str]:
+        """Return the complete top-level object text, if any"""
+        if self.complete:
+            return self.buffer[self.start:self.end]
+        return None
+
+    def truncated_candidate(self) -> Optional[str]:
+        """
+        Close a truncated object at the last complete nested value
+
+        Returns:
+            str: Text ending after the last complete nested container with
+            the still-open brackets closed, or None if nothing is salvageable
+        """
+        cut, stack = self._safe_cut
+        if self.start == -1 or cut == -1:
+            return None
+        closers = ''.join(_CLOSERS[opener] for opener in reversed(stack))
+        return self.buffer[self.start:cut] + closers
+
+
+def _outside_strings(text: str, fix) -> str:
+    """Apply `fix` to the segments of `text` that are not inside JSON strings"""
+    out = []
+    segment_start = 0
+    in_string = False
+    escape = False
+    for i, ch in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == '\\':
+                escape = True
+            elif ch == '"':
+                in_string = False
+                out.append(text[segment_start:i + 1])
+                segment_start = i + 1
+        elif ch == '"':
+            out.append(fix(text[segment_start:i]))
+            segment_start = i
+            in_string = True
+    tail = text[segment_start:]
+    out.append(tail if in_string else fix(tail))
+    return ''.join(out)
+
+
+def _repair_segment(segment: str) -> str:
+    segment = _TRAILING_COMMA.sub(r'\1', segment)
+    segment = _BARE_KEY.sub(r'\1"\2"\3', segment)
+    return _PY_LITERALS.sub(lambda m: _PY_LITERAL_MAP[m.group(1)], segment)
+
+
+def repair_json(text: str) -> str:
+    """
+    Repair common LLM JSON defects outside of string literals
+
+    Fixes trailing commas, unquoted object keys and Python-style
+    True/False/None literals.
+    """
+    return _outside_strings(text, _repair_segment)
+
+
+def _loads(text: Optional[str]) -> Optional[Dict]:
+    """Parse text as JSON, retrying once after repair"""
+    if not text:
+        return None
+    for attempt in (text, repair_json(text)):
+        try:
+            data = json.loads(attempt)
+        except json.JSONDecodeError:
+            continue
+        return data if isinstance(data, dict) else None
+    return None
+
+
+def validate_schedule(data: Dict, schema: Dict = None) -> Optional[Dict]:
+    """
+    Validate schedule items against the schedule item schema
+
+    Items missing required fields are dropped, optional fields get their
+    defaults and non-string values are coerced to strings.
+
+    Args:
+        data: Parsed schedule dictionary
+        schema: Field rules (default: VALIDATION_CONFIG['schedule_item_schema'])
+
+    Returns:
+        Dict with a cleaned 'schedule' list, or None if no valid item remains
+    """
+    schema = schema or VALIDATION_CONFIG['schedule_item_schema']
+    items = data.get('schedule') if isinstance(data, dict) else None
+    if not isinstance(items, list):
+        return None
+
+    valid_items = []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        if any(rule.get('required') and not item.get(field) for field, rule in schema.items()):
+            continue
+        for field, rule in schema.items():
+            if field not in item or item[field] is None:
+                if 'default' in rule:
+                    item[field] = rule['default']
+            elif not isinstance(item[field], str):
+                item[field] = str(item[field])
+        valid_items.append(item)
+
+    if not valid_items:
+        return None
+
+    data['schedule'] = valid_items
+    if not isinstance(data.get('daily_summary'), str):
+        data['daily_summary'] = ''
+    tips = data.get('tips')
+    data['tips'] = [str(tip) for tip in tips] if isinstance(tips, list) else []
+    return data
+
+
+def extract_schedule(text: str, extractor: StreamingJSONExtractor = None) -> Optional[Dict]:
+    """
+    Extract and validate a schedule dictionary from raw model output
+
+    Args:
+        text: Full generated text (ignored if `extractor` already holds it)
+        extractor: Extractor that was fed a streamed response
+
+    Returns:
+        Validated schedule dictionary, or None if nothing could be recovered
+    """
+    if extractor is None:
+        extractor = StreamingJSONExtractor()
+        extractor.feed(text or '')
+
+    data = _loads(extractor.candidate())
+    if data is None:
+        data = _loads(extractor.truncated_candidate())
+    if data is None:
+        return None
+    return validate_schedule(data)
@@ -9,6 +9,15 @@ MODEL_CONFIG = {
     'model_name': 'mistral',
     'base_url': 'http://localhost:11434',
     
+    # Model routing by task complexity: the first pulled model in each
+    # list serves the request, falling back to 'model_name' otherwise
+    'routes': {
+        'simple': ['phi3:mini', 'mistral'],
+        'moderate': ['mistral'],
+        'complex': ['mistral'],
+    },
+    'model_list_ttl': 300,  # seconds before re-reading the pulled model list
+    
     # Generation parameters by complexity
     'parameters': {
         'simple': {
@@ -37,6 +46,28 @@ MODEL_CONFIG = {
     # API settings
     'timeout': 60,  # seconds
     'retry_attempts': 2,
+    'async_max_connections': 500,  # Concurrent Ollama requests in async (ASGI) mode
+    
+    # Ask Ollama to constrain schedule output to valid JSON (format: json)
+    'json_mode': True,
+    
+    # Stream schedule generations and disconnect as soon as the top-level
+    # JSON object closes instead of waiting for trailing prose
+    'stream_schedule': True,
+    
+    # Stop sequences after the JSON object. Ollama drops the matched text, so
+    # none may contain the closing brace: the extractor would never see the
+    # object close and would cut it back to the last nested value
+    'stop_sequences': ['\n```'],
+    
+    # num_predict budget: base + tokens_per_item * (pending tasks + fixed
+    # blocks), clamped to [min_tokens, max_tokens of the complexity level]
+    'token_budget': {
+        'base_tokens': 300,       # daily_summary, tips and productivity_score
+        'tokens_per_item': 70,    # one schedule item with its reasoning
+        'fixed_items': 8,         # routine, meals, breaks, family, workout, review
+        'min_tokens': 700,
+    },
 }
 
 # Prompt Engineering Settings
@@ -105,6 +136,28 @@ VALIDATION_CONFIG = {
         'min_break_hours': 1,
         'max_continuous_work_minutes': 120,
         'required_components': ['morning_routine', 'meals', 'breaks', 'workout'],
+    },
+    
+    # Interval checks on schedule blocks (schedule_intervals.py)
+    'conflicts': {
+        'overlap_penalty': 15,       # Realism points per pair of double-booked blocks
+        'commitment_penalty': 10,    # Per block colliding with class/work hours or sleep
+        'gap_penalty': 5,            # Per long unplanned stretch of the waking day
+        'max_penalty': 60,
+        'min_gap_minutes': 180,
+        # Block types that are the commitment itself rather than a collision with it
+        'commitment_types': ['sleep', 'college', 'work', 'college/work', 'class'],
+    },
+    
+    # Schedule item schema used when parsing LLM output
+    # (items missing a required field are dropped, defaults fill gaps)
+    'schedule_item_schema': {
+        'time': {'required': True},
+        'task': {'required': True},
+        'reason': {'default': ''},
+        'type': {'default': 'general'},
+        'priority': {},
+        'flexibility': {},
     }
 }
 
@@ -147,6 +200,41 @@ FEW_SHOT_EXAMPLES = [
     }
 ]
 
+# Few-shot example store built from highly rated schedules
+EXAMPLE_STORE_CONFIG = {
+    'min_rating': 4,                   # Average rating needed to become an example
+    'max_examples': 500,               # Most recent rated schedules to index
+    'top_k': 2,                        # Examples added to each prompt
+    'max_items_per_example': 4,        # Schedule blocks kept per example
+    'rebuild_interval_seconds': 3600,  # Rebuild at least this often
+    'index_path': 'instance/few_shot_index.json',
+}
+
+# Retention of old schedules and feedback (see retention.py)
+RETENTION_CONFIG = {
+    'hot_days': 90,                # Schedules older than this move to ScheduleArchive
+    'batch_size': 200,             # Schedules archived per transaction
+    'batch_pause_seconds': 0.05,   # Pause between batches so other writers get the lock
+    'max_batches_per_run': 50,     # Upper bound per run; the next run resumes (None = no limit)
+}
+
+# Overnight precomputation of next-day schedules (see precompute.py)
+PRECOMPUTE_CONFIG = {
+    'workers': 2,                  # Users generated concurrently
+    'requests_per_minute': 6,      # Ceiling on schedule requests sent to the Ollama host
+    'stop_at': '06:30',            # Local time after which no new users are started
+}
+
+# Storage of the tracker.py CLI data (see task_store.py)
+CLI_STORAGE_CONFIG = {
+    'backend': 'json',             # 'json' (user_profile.json/tasks_data.json), 'oplog' or 'sql'; TRACKER_STORAGE overrides
+    'data_dir': 'tracker_data',    # Snapshot and operation log directory of the oplog backend
+    'compact_after_ops': 500,      # Logged operations before the log is folded into a new snapshot
+    'fsync': True,                 # fsync every appended operation (durable across power loss)
+    'schedule_cache_dir': '.tracker_cache',  # Generated schedules keyed by their inputs
+    'schedule_cache_max_entries': 200,       # Oldest cached schedules beyond this are removed
+}
+
 # Feedback and Learning Settings
 FEEDBACK_CONFIG = {
     'enable_user_feedback': True,
@@ -203,7 +291,23 @@ PREFERENCE_ADAPTATION = {
         'structure': -0.1,
         'flexibility': +0.1,
         'stress': -0.15,  # More focused when stressed
-    }
+    },
+    
+    # Chat intents answered locally, before any call to Ollama.
+    # Intents are checked in the order of 'intent_responses'; a message
+    # matches an intent if any keyword prefix or regex pattern matches.
+    'intent_keywords': {
+        'scheduling': ['schedule', 'plan', 'organize', 'task', 'productivity', 'time', 'day', 'week', 'optimize'],
+    },
+    'intent_patterns': {
+        'greeting': [r'^\s*(hi|hello|hey|hiya|good (morning|afternoon|evening))( there)?[\s!.,]*$'],
+        'thanks': [r'^\s*(thanks|thank you|thx|ty)\b[\w\s!.,]{0,20}$'],
+    },
+    'intent_responses': {
+        'greeting': "Hello {name}! I'm your AI Task Optimizer Assistant. I can help with scheduling, programming, studying, or just a chat. What can I do for you today?",
+        'thanks': "You're welcome, {name}! Let me know if there's anything else I can help with.",
+        'scheduling': "I notice you're asking about scheduling or task organization. For the best scheduling experience, please use the dedicated scheduling feature in the application. You can add your tasks in the 'Tasks' section and then generate a schedule in the 'Schedule' section. This will allow me to create a personalized schedule based on your profile and preferences.",
+    },
 }
 
 # Error handling and fallback
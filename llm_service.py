@@ -5,10 +5,27 @@ versatile AI assistance including task scheduling, programming help,
 conversations, and more based on user requests.
 """
 
+import asyncio
 import requests
 import json
+import threading
+import time
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
+
+import metrics
+from example_store import format_examples
+from intent_router import get_intent_router
+from json_extractor import StreamingJSONExtractor, extract_schedule
+from llm_config import FEEDBACK_CONFIG, MODEL_CONFIG
+from model_router import ModelRouter
+from schedule_intervals import diagnose_schedule, realism_penalty
+from time_utils import range_minutes
+
+try:
+    import httpx  # Optional: only needed for the async (ASGI) serving mode
+except ImportError:
+    httpx = None
 
 
 class OllamaLLMService:
@@ -22,8 +39,23 @@ class OllamaLLMService:
             base_url: The base URL for Ollama API (default: http://localhost:11434)
         """
         self.base_url = base_url
-        self.model = "mistral"
+        self.model = MODEL_CONFIG['model_name']
         self.api_endpoint = f"{base_url}/api/generate"
+        self.router = ModelRouter(default_model=self.model)
+        # requests.Session is not thread-safe, so each worker thread keeps
+        # its own keep-alive connections to Ollama (see the session property)
+        self._local = threading.local()
+        self._async_client = None
+        self._async_loop = None
+        self._async_closing = None
+    
+    @property
+    def session(self) -> requests.Session:
+        """Get the calling thread's HTTP session, creating it on first use"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
     
     def check_ollama_status(self) -> bool:
         """
@@ -33,8 +65,14 @@ class OllamaLLMService:
             bool: True if service is available, False otherwise
         """
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
-            return response.status_code == 200
+            response = self.session.get(f"{self.base_url}/api/tags", timeout=5)
+            if response.status_code != 200:
+                return False
+            # Keep the router's list of pulled models fresh for free
+            if self.router.needs_refresh():
+                models = response.json().get('models', [])
+                self.router.update_available_models(m.get('name', '') for m in models)
+            return True
         except Exception:
             return False
     
@@ -174,7 +212,7 @@ With this information, I can create a personalized schedule that maximizes your
         
         return prompt
     
-    def create_prompt(self, user_profile: Dict, tasks: List[Dict], user_prompt: str = "") -> str:
+    def create_prompt(self, user_profile: Dict, tasks: List[Dict], user_prompt: str = "", examples: List[Dict] = None) -> str:
         """
         Create a comprehensive, fine-tuned prompt for the LLM based on user data
         
@@ -182,6 +220,7 @@ With this information, I can create a personalized schedule that maximizes your
             user_profile: Dictionary containing user profile information
             tasks: List of pending tasks
             user_prompt: Additional user-provided context or requirements
+            examples: Highly rated schedule examples from similar users
             
         Returns:
             str: Formatted prompt for the LLM
@@ -197,14 +236,14 @@ With this information, I can create a personalized schedule that maximizes your
         family_time = user_profile.get('family_time', 'Not specified')
         
         # Extract sleep schedule
-        sleep_schedule = user_profile.get('sleep_schedule', {})
+        sleep_schedule = user_profile.get('sleep_schedule') or {}
         if isinstance(sleep_schedule, str):
             sleep_schedule = json.loads(sleep_schedule)
         wake_time = sleep_schedule.get('wake_time', '7:00 AM')
         bedtime = sleep_schedule.get('bedtime', '11:00 PM')
         
         # Extract weekly schedule
-        weekly_schedule = user_profile.get('weekly_schedule', {})
+        weekly_schedule = user_profile.get('weekly_schedule') or {}
         if isinstance(weekly_schedule, str):
             weekly_schedule = json.loads(weekly_schedule)
         
@@ -219,6 +258,11 @@ With this information, I can create a personalized schedule that maximizes your
             for day, schedule in weekly_schedule.items():
                 schedule_text += f"- {day}: {schedule.get('start', 'N/A')} - {schedule.get('end', 'N/A')}\n"
         
+        # Format few-shot examples from highly rated schedules
+        examples_text = ""
+        if examples:
+            examples_text = "\nHIGHLY RATED SCHEDULES FROM SIMILAR USERS (use as guidance, do not copy):\n" + format_examples(examples) + "\n"
+        
         # Create the comprehensive, fine-tuned prompt with examples
         prompt = f"""You are an expert AI task scheduling assistant specializing in productivity optimization and time management. Your goal is to create a highly personalized, realistic, and actionable daily schedule.
 
@@ -282,7 +326,7 @@ CRITICAL INSTRUCTIONS:
    - Include transition time between activities
    - Suggest alternatives for flexible tasks
    - Mark tasks that can be moved if needed
-
+{examples_text}
 EXAMPLE OUTPUT (follow this structure EXACTLY):
 {{
     "schedule": [
@@ -359,13 +403,15 @@ Respond ONLY with valid JSON. No markdown formatting, no code blocks, no explana
 
         return prompt
     
-    def _get_optimal_parameters(self, complexity: str, user_prompt: str) -> Dict:
+    def _get_optimal_parameters(self, complexity: str, user_prompt: str, feedback_stats: Dict = None) -> Dict:
         """
         Get optimal LLM parameters based on task complexity and user needs
         
         Args:
             complexity: Task complexity level ('simple', 'moderate', 'complex')
             user_prompt: User's custom prompt
+            feedback_stats: Per-user and global feedback aggregates
+                (see FeedbackRollup.for_user)
             
         Returns:
             Dict with temperature, top_p, and max_tokens
@@ -398,12 +444,117 @@ Respond ONLY with valid JSON. No markdown formatting, no code blocks, no explana
             # User wants more creative suggestions
             params[complexity]['temperature'] += 0.1
         
+        self._apply_feedback(params[complexity], feedback_stats)
+        
         # Clamp temperature between 0.3 and 0.9
         params[complexity]['temperature'] = max(0.3, min(0.9, params[complexity]['temperature']))
         
         return params[complexity]
     
-    def _validate_and_score_schedule(self, schedule_data: Dict, user_profile: Dict, tasks: List[Dict]) -> Dict:
+    def _apply_feedback(self, params: Dict, feedback_stats: Optional[Dict]):
+        """
+        Nudge sampling parameters using aggregated schedule feedback
+        
+        Uses the user's own aggregates once they reach min_feedback_count,
+        otherwise the global ones. Poor accuracy/realism ratings lower the
+        temperature and a majority of negative aspect mentions narrows
+        top_p, each scaled by FEEDBACK_CONFIG['learning_rate'].
+        
+        Args:
+            params: Parameters to adjust in place
+            feedback_stats: {'user': summary, 'global': summary} or None
+        """
+        if not feedback_stats or not FEEDBACK_CONFIG.get('enable_user_feedback', True):
+            return
+        min_count = FEEDBACK_CONFIG['min_feedback_count']
+        stats = next((feedback_stats[scope] for scope in ('user', 'global')
+                      if feedback_stats.get(scope, {}).get('feedback_count', 0) >= min_count), None)
+        if stats is None:
+            return
+        
+        learning_rate = FEEDBACK_CONFIG['learning_rate']
+        means = stats['mean_ratings']
+        ratings = [means[c] for c in ('accuracy', 'realism') if means.get(c) is not None] or \
+                  [means[c] for c in ('overall',) if means.get(c) is not None]
+        if ratings:
+            # 3/5 is neutral; a 1/5 average lowers temperature by 2x the learning rate
+            params['temperature'] -= learning_rate * max(0.0, 3 - sum(ratings) / len(ratings))
+        
+        mentions = stats['positive_count'] + stats['negative_count']
+        if mentions:
+            negative_share = stats['negative_count'] / mentions
+            params['top_p'] = max(0.7, params['top_p'] - learning_rate * max(0.0, negative_share - 0.5))
+    
+    def _estimate_token_budget(self, tasks: List[Dict], max_tokens: int) -> int:
+        """
+        Estimate the num_predict budget for a schedule generation
+        
+        Args:
+            tasks: List of pending tasks
+            max_tokens: Upper bound for the task complexity level
+            
+        Returns:
+            int: Token budget sized to the expected number of schedule items
+        """
+        budget = MODEL_CONFIG['token_budget']
+        expected_items = len(tasks) + budget['fixed_items']
+        estimate = budget['base_tokens'] + budget['tokens_per_item'] * expected_items
+        return max(budget['min_tokens'], min(max_tokens, estimate))
+    
+    def _read_generation(self, response, stream: bool, model: str, started: float,
+                         on_token: Callable[[str], None] = None) -> StreamingJSONExtractor:
+        """
+        Read a generation into a JSON extractor
+        
+        When streaming, reading stops as soon as the top-level JSON object
+        closes; the caller then closes the connection so Ollama stops decoding.
+        
+        Args:
+            response: Response from the generate endpoint
+            stream: Whether the request was made with streaming enabled
+            model: Model that serves the request (for metrics)
+            started: perf_counter() when the request was sent
+            on_token: Called with each piece of generated text as it arrives
+            
+        Returns:
+            StreamingJSONExtractor holding the generated text
+        """
+        extractor = StreamingJSONExtractor()
+        if not stream:
+            result = response.json()
+            if on_token:
+                on_token(result.get('response', ''))
+            extractor.feed(result.get('response', ''))
+            metrics.observe_ollama(result, model)
+            return extractor
+        
+        first_at, chunks, final = None, 0, None
+        for line in response.iter_lines():
+            if not line:
+                continue
+            chunk = json.loads(line)
+            first_at = first_at or time.perf_counter()
+            chunks += 1
+            final = chunk if chunk.get('done') else None
+            if on_token and chunk.get('response'):
+                on_token(chunk['response'])
+            if extractor.feed(chunk.get('response', '')) or chunk.get('done'):
+                break
+        self._observe_stream(model, started, first_at, chunks, final)
+        return extractor
+    
+    def _observe_stream(self, model: str, started: float, first_at: Optional[float], chunks: int, final: Optional[Dict]):
+        """Record timings of a streamed generation (Ollama's own if it finished)"""
+        if first_at is not None:
+            metrics.OLLAMA_FIRST_TOKEN_SECONDS.observe(first_at - started, model=model)
+        if final is not None:
+            metrics.observe_ollama(final, model)
+        elif chunks:
+            # Cut off before the 'done' chunk; each streamed chunk is one token
+            metrics.OLLAMA_EVAL_TOKENS.inc(chunks, model=model)
+    
+    def _validate_and_score_schedule(self, schedule_data: Dict, user_profile: Dict, tasks: List[Dict],
+                                     date_str: str = None) -> Dict:
         """
         Validate schedule quality and add scoring metrics
         
@@ -411,6 +562,7 @@ Respond ONLY with valid JSON. No markdown formatting, no code blocks, no explana
             schedule_data: Generated schedule
             user_profile: User profile data
             tasks: List of tasks
+            date_str: Schedule date (YYYY-MM-DD), for the weekday's class/work hours
             
         Returns:
             Enhanced schedule with quality scores
@@ -421,7 +573,7 @@ Respond ONLY with valid JSON. No markdown formatting, no code blocks, no explana
         schedule_items = schedule_data.get('schedule', [])
         
         # Extract profile data
-        sleep_schedule = user_profile.get('sleep_schedule', {})
+        sleep_schedule = user_profile.get('sleep_schedule') or {}
         if isinstance(sleep_schedule, str):
             import json
             sleep_schedule = json.loads(sleep_schedule)
@@ -535,6 +687,10 @@ Respond ONLY with valid JSON. No markdown formatting, no code blocks, no explana
         if break_time < 30:
             realism_score -= 20  # Not enough breaks
         
+        # Check for double-booked blocks and collisions with commitments
+        diagnostics = diagnose_schedule(schedule_items, user_profile, date_str)
+        realism_score -= realism_penalty(diagnostics)
+        
         scores['realism'] = max(0, realism_score)
         
         # 5. Time Management Score (0-100)
@@ -572,7 +728,12 @@ Respond ONLY with valid JSON. No markdown formatting, no code blocks, no explana
             feedback.append("Schedule may be unbalanced - add more breaks or personal time")
         if scores['realism'] < 70:
             feedback.append("Schedule might be too packed - consider reducing tasks or extending time")
+        for overlap in diagnostics['overlaps']:
+            feedback.append(f"'{overlap['tasks'][0]}' and '{overlap['tasks'][1]}' overlap at {overlap['time']}")
+        for conflict in diagnostics['commitment_conflicts']:
+            feedback.append(f"'{conflict['task']}' collides with {conflict['commitment']} at {conflict['time']}")
         
+        schedule_data['diagnostics'] = diagnostics
         if feedback:
             schedule_data['improvement_suggestions'] = feedback
         
@@ -588,24 +749,22 @@ Respond ONLY with valid JSON. No markdown formatting, no code blocks, no explana
         Returns:
             Duration in minutes
         """
-        try:
-            parts = time_range.split('-')
-            if len(parts) != 2:
-                return 60  # Default 1 hour
-            
-            start_str = parts[0].strip()
-            end_str = parts[1].strip()
-            
-            # Simple parsing (can be enhanced)
-            from datetime import datetime
-            
-            start = datetime.strptime(start_str, "%I:%M %p")
-            end = datetime.strptime(end_str, "%I:%M %p")
-            
-            duration = (end - start).total_seconds() / 60
-            return int(duration) if duration > 0 else 60
-        except:
-            return 60
+        return range_minutes(time_range)
+    
+    def _general_payload(self, prompt: str) -> Dict:
+        """Build the generate request for a general chat response"""
+        return {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": False,
+            "options": {
+                "temperature": 0.7,
+                "top_p": 0.9,
+                "max_tokens": 2048,
+                "repeat_penalty": 1.1,
+                "top_k": 40
+            }
+        }
     
     def generate_general_response(self, user_input: str, conversation_history: List[Dict] = None) -> Optional[str]:
         """
@@ -618,37 +777,21 @@ Respond ONLY with valid JSON. No markdown formatting, no code blocks, no explana
         Returns:
             str: Generated response or None if failed
         """
+        # Answer canned intents (greetings, scheduling redirects) locally
+        routed = get_intent_router().respond(user_input)
+        if routed:
+            return routed['response']
+        
         if not self.check_ollama_status():
             return None
         
-        # Determine if this is a scheduling request
-        scheduling_keywords = ['schedule', 'plan', 'organize', 'task', 'productivity', 'time', 'day', 'week', 'optimize']
-        is_scheduling_request = any(keyword in user_input.lower() for keyword in scheduling_keywords)
-        
-        if is_scheduling_request:
-            # Return a message directing user to the scheduling feature
-            return "I notice you're asking about scheduling or task organization. For the best scheduling experience, please use the dedicated scheduling feature in the application. You can add your tasks in the 'Tasks' section and then generate a schedule in the 'Schedule' section. This will allow me to create a personalized schedule based on your profile and preferences."
-        
         # Create general prompt
         prompt = self.create_general_prompt(user_input, conversation_history)
         
         try:
-            payload = {
-                "model": self.model,
-                "prompt": prompt,
-                "stream": False,
-                "options": {
-                    "temperature": 0.7,
-                    "top_p": 0.9,
-                    "max_tokens": 2048,
-                    "repeat_penalty": 1.1,
-                    "top_k": 40
-                }
-            }
-            
-            response = requests.post(
+            response = self.session.post(
                 self.api_endpoint,
-                json=payload,
+                json=self._general_payload(prompt),
                 timeout=60
             )
             
@@ -661,9 +804,84 @@ Respond ONLY with valid JSON. No markdown formatting, no code blocks, no explana
                 
         except Exception as e:
             print(f"Error generating general response with LLM: {str(e)}")
+            metrics.LLM_ERRORS.inc(operation='chat')
             return None
     
-    def generate_schedule(self, user_profile: Dict, tasks: List[Dict], user_prompt: str = "") -> Optional[Dict]:
+    def _prepare_schedule_request(self, user_profile: Dict, tasks: List[Dict], user_prompt: str, examples: List[Dict],
+                                  date_str: str = None) -> Dict:
+        """
+        Work out prompt, model route and sampling options for a schedule request
+        
+        Returns:
+            Dict with complexity, prompt, sampling parameters and token budget
+        """
+        # Calculate task complexity
+        complexity = self._calculate_task_complexity(tasks)
+        
+        # Get optimal parameters based on complexity
+        optimal_params = self._get_optimal_parameters(complexity, user_prompt, user_profile.get('feedback_stats'))
+        
+        with metrics.timed(metrics.LLM_PHASE_SECONDS, phase='prompt'):
+            prompt = self.create_prompt(user_profile, tasks, user_prompt, examples)
+        
+        return {
+            'complexity': complexity,
+            'prompt': prompt,
+            'params': optimal_params,
+            # Size the decode budget to the expected number of schedule items
+            'num_predict': self._estimate_token_budget(tasks, optimal_params['max_tokens']),
+            'stream': MODEL_CONFIG.get('stream_schedule', False),
+            'date': date_str,
+        }
+    
+    def _schedule_payload(self, model: str, request: Dict) -> Dict:
+        """Build the generate request for one routed schedule attempt"""
+        payload = {
+            "model": model,
+            "prompt": request['prompt'],
+            "stream": request['stream'],
+            "options": {
+                "temperature": request['params']['temperature'],
+                "top_p": request['params']['top_p'],
+                "max_tokens": request['num_predict'],
+                "num_predict": request['num_predict'],
+                "repeat_penalty": 1.1,  # Reduce repetition
+                "top_k": 40,  # Limit token selection for consistency
+                "stop": MODEL_CONFIG.get('stop_sequences', [])
+            }
+        }
+        if MODEL_CONFIG.get('json_mode'):
+            payload["format"] = "json"
+        return payload
+    
+    def _finish_schedule(self, extractor: StreamingJSONExtractor, request: Dict, model: str, latency: float,
+                         user_profile: Dict, tasks: List[Dict]) -> Dict:
+        """
+        Turn a finished generation into a scored schedule and record the route
+        
+        Returns:
+            Validated schedule, or the fallback structure if no JSON was recovered
+        """
+        metrics.LLM_PHASE_SECONDS.observe(latency, phase='generation')
+        
+        # Recover the schedule JSON, repairing small defects and
+        # salvaging truncated schedule arrays where possible
+        with metrics.timed(metrics.LLM_PHASE_SECONDS, phase='parse'):
+            schedule_data = extract_schedule('', extractor)
+            if schedule_data:
+                # Validate and score the schedule
+                schedule_data = self._validate_and_score_schedule(schedule_data, user_profile, tasks, request['date'])
+        if schedule_data:
+            self.router.record(request['complexity'], model, latency, schedule_data.get('overall_quality'))
+            return schedule_data
+        
+        # Fallback: create a basic structure
+        self.router.record(request['complexity'], model, latency, success=False)
+        metrics.SCHEDULES.inc(source='llm_unparsed')
+        return self._create_fallback_response(extractor.buffer)
+    
+    def generate_schedule(self, user_profile: Dict, tasks: List[Dict], user_prompt: str = "", examples: List[Dict] = None,
+                          on_token: Callable[[str], None] = None, date_str: str = None) -> Optional[Dict]:
         """
         Generate an optimized schedule using Ollama Mistral
         
@@ -671,6 +889,9 @@ Respond ONLY with valid JSON. No markdown formatting, no code blocks, no explana
             user_profile: User profile information
             tasks: List of pending tasks
             user_prompt: Additional user context
+            examples: Few-shot examples to include in the prompt
+            on_token: Called with generated text as it streams in (e.g. console echo)
+            date_str: Date being planned, checked against that weekday's commitments
             
         Returns:
             Dict containing the generated schedule or None if failed
@@ -678,65 +899,175 @@ Respond ONLY with valid JSON. No markdown formatting, no code blocks, no explana
         if not self.check_ollama_status():
             return None
         
-        # Calculate task complexity
-        complexity = self._calculate_task_complexity(tasks)
+        request = self._prepare_schedule_request(user_profile, tasks, user_prompt, examples, date_str)
         
-        # Get optimal parameters based on complexity
-        optimal_params = self._get_optimal_parameters(complexity, user_prompt)
+        # Route to the smallest pulled model suited to this workload,
+        # moving down the route if Ollama reports a model as missing
+        for model in self.router.candidates(request['complexity']):
+            try:
+                started = time.perf_counter()
+                with self.session.post(
+                    self.api_endpoint,
+                    json=self._schedule_payload(model, request),
+                    timeout=60,
+                    stream=request['stream']
+                ) as response:
+                    if response.status_code == 404:
+                        # Model not pulled on this host
+                        self.router.mark_unavailable(model)
+                        continue
+                    
+                    if response.status_code != 200:
+                        self.router.record(request['complexity'], model, time.perf_counter() - started, success=False)
+                        return None
+                    
+                    # Leaving the block closes the connection, which aborts
+                    # decoding once the schedule object has been read
+                    extractor = self._read_generation(response, request['stream'], model, started, on_token)
+                
+                return self._finish_schedule(extractor, request, model, time.perf_counter() - started, user_profile, tasks)
+                    
+            except Exception as e:
+                print(f"Error generating schedule with LLM: {str(e)}")
+                metrics.LLM_ERRORS.inc(operation='schedule')
+                return None
+        
+        return None
+    
+    # ------------------------------------------------------------------
+    # Async variants used by the ASGI serving mode (asgi.py). They share
+    # prompt building, routing and parsing with the sync methods above but
+    # wait on Ollama without holding an OS thread.
+    # ------------------------------------------------------------------
+    
+    def _get_async_client(self):
+        """Get the shared async HTTP client for the running event loop"""
+        if httpx is None:
+            raise RuntimeError("Async mode requires the 'httpx' package")
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            if self._async_client is not None:
+                self._retire_async_client(loop)
+            self._async_client = httpx.AsyncClient(
+                timeout=httpx.Timeout(MODEL_CONFIG['timeout'], connect=5),
+                limits=httpx.Limits(max_connections=MODEL_CONFIG.get('async_max_connections', 500))
+            )
+            self._async_loop = loop
+        return self._async_client
+    
+    def _retire_async_client(self, loop):
+        """Close the client a previous event loop left behind"""
+        client, old_loop = self._async_client, self._async_loop
+        if old_loop.is_running() and not old_loop.is_closed():
+            # Still serving on another thread: close it there
+            asyncio.run_coroutine_threadsafe(client.aclose(), old_loop)
+        else:
+            # Its loop is gone, so the sockets can't shut down cleanly, but
+            # aclose() still empties the pool and marks the client closed
+            self._async_closing = loop.create_task(self._aclose_quietly(client))
+    
+    @staticmethod
+    async def _aclose_quietly(client):
+        try:
+            await client.aclose()
+        except RuntimeError:
+            pass
+    
+    async def aclose(self):
+        """Close the async HTTP client (call on ASGI lifespan shutdown)"""
+        client, self._async_client, self._async_loop = self._async_client, None, None
+        if client is not None:
+            await self._aclose_quietly(client)
+    
+    async def acheck_ollama_status(self) -> bool:
+        """Async version of check_ollama_status"""
+        try:
+            response = await self._get_async_client().get(f"{self.base_url}/api/tags", timeout=5)
+            if response.status_code != 200:
+                return False
+            if self.router.needs_refresh():
+                models = response.json().get('models', [])
+                self.router.update_available_models(m.get('name', '') for m in models)
+            return True
+        except Exception:
+            return False
+    
+    async def agenerate_general_response(self, user_input: str, conversation_history: List[Dict] = None) -> Optional[str]:
+        """Async version of generate_general_response"""
+        routed = get_intent_router().respond(user_input)
+        if routed:
+            return routed['response']
         
-        prompt = self.create_prompt(user_profile, tasks, user_prompt)
+        if not await self.acheck_ollama_status():
+            return None
+        
+        prompt = self.create_general_prompt(user_input, conversation_history)
         
         try:
-            payload = {
-                "model": self.model,
-                "prompt": prompt,
-                "stream": False,
-                "options": {
-                    "temperature": optimal_params['temperature'],
-                    "top_p": optimal_params['top_p'],
-                    "max_tokens": optimal_params['max_tokens'],
-                    "num_predict": optimal_params['max_tokens'],
-                    "repeat_penalty": 1.1,  # Reduce repetition
-                    "top_k": 40  # Limit token selection for consistency
-                }
-            }
-            
-            response = requests.post(
-                self.api_endpoint,
-                json=payload,
-                timeout=60
-            )
-            
+            response = await self._get_async_client().post(self.api_endpoint, json=self._general_payload(prompt))
             if response.status_code == 200:
-                result = response.json()
-                generated_text = result.get('response', '')
-                
-                # Try to extract JSON from the response
-                try:
-                    # Find JSON object in the response
-                    start_idx = generated_text.find('{')
-                    end_idx = generated_text.rfind('}') + 1
-                    
-                    if start_idx != -1 and end_idx > start_idx:
-                        json_str = generated_text[start_idx:end_idx]
-                        schedule_data = json.loads(json_str)
-                        
-                        # Validate and score the schedule
-                        schedule_data = self._validate_and_score_schedule(schedule_data, user_profile, tasks)
-                        
-                        return schedule_data
-                    else:
-                        # Fallback: create a basic structure
-                        return self._create_fallback_response(generated_text)
-                except json.JSONDecodeError:
-                    return self._create_fallback_response(generated_text)
-            else:
-                return None
-                
+                return response.json().get('response', '').strip()
+            return None
         except Exception as e:
-            print(f"Error generating schedule with LLM: {str(e)}")
+            print(f"Error generating general response with LLM: {str(e)}")
+            metrics.LLM_ERRORS.inc(operation='chat')
             return None
     
+    async def _aread_generation(self, response, stream: bool, model: str, started: float) -> StreamingJSONExtractor:
+        """Async version of _read_generation"""
+        extractor = StreamingJSONExtractor()
+        if not stream:
+            await response.aread()
+            result = response.json()
+            extractor.feed(result.get('response', ''))
+            metrics.observe_ollama(result, model)
+            return extractor
+        
+        first_at, chunks, final = None, 0, None
+        async for line in response.aiter_lines():
+            if not line:
+                continue
+            chunk = json.loads(line)
+            first_at = first_at or time.perf_counter()
+            chunks += 1
+            final = chunk if chunk.get('done') else None
+            if extractor.feed(chunk.get('response', '')) or chunk.get('done'):
+                break
+        self._observe_stream(model, started, first_at, chunks, final)
+        return extractor
+    
+    async def agenerate_schedule(self, user_profile: Dict, tasks: List[Dict], user_prompt: str = "", examples: List[Dict] = None,
+                                 date_str: str = None) -> Optional[Dict]:
+        """Async version of generate_schedule"""
+        if not await self.acheck_ollama_status():
+            return None
+        
+        request = self._prepare_schedule_request(user_profile, tasks, user_prompt, examples, date_str)
+        client = self._get_async_client()
+        
+        for model in self.router.candidates(request['complexity']):
+            try:
+                started = time.perf_counter()
+                async with client.stream('POST', self.api_endpoint, json=self._schedule_payload(model, request)) as response:
+                    if response.status_code == 404:
+                        self.router.mark_unavailable(model)
+                        continue
+                    
+                    if response.status_code != 200:
+                        self.router.record(request['complexity'], model, time.perf_counter() - started, success=False)
+                        return None
+                    
+                    extractor = await self._aread_generation(response, request['stream'], model, started)
+                
+                return self._finish_schedule(extractor, request, model, time.perf_counter() - started, user_profile, tasks)
+            
+            except Exception as e:
+                print(f"Error generating schedule with LLM: {str(e)}")
+                metrics.LLM_ERRORS.inc(operation='schedule')
+                return None
+        
+        return None
+    
     def _create_fallback_response(self, text: str) -> Dict:
         """Create a fallback response when JSON parsing fails"""
         return {
@@ -756,9 +1087,15 @@ Respond ONLY with valid JSON. No markdown formatting, no code blocks, no explana
 # Singleton instance
 _llm_service = None
 
+async def aclose_llm_service():
+    """Close the singleton's async HTTP client, if the service was ever created"""
+    if _llm_service is not None:
+        await _llm_service.aclose()
+
 def get_llm_service() -> OllamaLLMService:
     """Get or create the LLM service singleton"""
     global _llm_service
     if _llm_service is None:
         _llm_service = OllamaLLMService()
+        metrics.register_collector(lambda: metrics.route_stats_lines(_llm_service.router.get_stats()))
     return _llm_service
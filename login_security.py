@@ -0,0 +1,208 @@
+"""
+Password Hashing and Login Throttling
+Password hashes use a configurable werkzeug method (PASSWORD_HASH_METHOD).
+Stored hashes made with other parameters are upgraded the next time their
+owner logs in. The key derivation runs in a small dedicated thread pool
+with a bounded queue: a burst of logins waits for (or is turned away from)
+those threads instead of burning CPU in every request worker at once.
+Login attempts are rate limited per client IP and per username with
+in-memory token buckets, which reset when the process restarts and are
+not shared between processes.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from functools import lru_cache
+from typing import Dict, Tuple
+
+from flask import current_app, has_app_context
+from werkzeug.security import check_password_hash, generate_password_hash
+
+DEFAULT_HASH_METHOD = 'scrypt:32768:8:1'
+
+
+class LoginBusy(Exception):
+    """Too many password hashes are already queued"""
+
+
+class TokenBucket:
+    """
+    Token buckets keyed by client (IP, username, ...)
+
+    Each key holds up to `burst` tokens and regains `per_minute` tokens a
+    minute; an attempt takes one token.
+    """
+
+    def __init__(self, burst: int, per_minute: float, max_keys: int = 10000):
+        self.burst = burst
+        self.rate = per_minute / 60.0
+        self.max_keys = max_keys
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def _tokens(self, key: str, now: float) -> float:
+        tokens, updated = self._buckets.get(key, (self.burst, now))
+        return min(self.burst, tokens + (now - updated) * self.rate)
+
+    def consume(self, key: str) -> float:
+        """
+        Take a token for an attempt
+
+        Returns:
+            float: 0 if the attempt is allowed, otherwise seconds until it would be
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens = self._tokens(key, now)
+            if tokens < 1:
+                return (1 - tokens) / self.rate if self.rate else float('inf')
+            self._buckets[key] = (tokens - 1, now)
+            if len(self._buckets) > self.max_keys:
+                self._prune(now)
+            return 0.0
+
+    def reset(self, key: str):
+        """Forget a key (a successful login refills that user's bucket)"""
+        with self._lock:
+            self._buckets.pop(key, None)
+
+    def _prune(self, now: float):
+        # Full buckets carry no state; if that is not enough, drop the stalest
+        for key in [key for key in self._buckets if self._tokens(key, now) >= self.burst]:
+            del self._buckets[key]
+        if len(self._buckets) > self.max_keys:
+            by_age = sorted(self._buckets, key=lambda key: self._buckets[key][1])
+            for key in by_age[:len(self._buckets) - self.max_keys]:
+                del self._buckets[key]
+
+
+class PasswordHasher:
+    """Hashes and verifies passwords on a bounded thread pool"""
+
+    def __init__(self, method: str, workers: int = 2, max_queue: int = 8, timeout: float = 10.0):
+        self.method = method
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise LoginBusy()
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            raise LoginBusy()
+
+    def hash(self, password: str) -> str:
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash: str, password: str) -> bool:
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """True if the hash was made with another method or other parameters"""
+        return password_hash.split('$', 1)[0] != method_prefix(self.method)
+
+
+@lru_cache(maxsize=8)
+def dummy_hash(method: str) -> str:
+    """A hash of the empty password, verified in place of unknown users' hashes"""
+    return generate_password_hash('', method)
+
+
+def method_prefix(method: str) -> str:
+    """
+    The "method:params" prefix werkzeug writes for a method
+
+    Partial methods ("scrypt", "pbkdf2:sha256") are expanded to werkzeug's
+    defaults by hashing an empty password once.
+    """
+    return dummy_hash(method).split('$', 1)[0]
+
+
+def hash_password(password: str) -> str:
+    """Hash with the app's configured method and pool (DEFAULT_HASH_METHOD outside the app)"""
+    if has_app_context() and 'password_hasher' in current_app.extensions:
+        return current_app.extensions['password_hasher'].hash(password)
+    return generate_password_hash(password, DEFAULT_HASH_METHOD)
+
+
+def check_login(user, password: str) -> bool:
+    """
+    Verify a login password, upgrading the stored hash if its parameters are outdated
+
+    An unknown username (user is None) is checked against a dummy hash, so
+    the response time does not reveal whether the account exists. The caller
+    commits the session (the upgraded hash is only set on the user).
+
+    Raises:
+        LoginBusy: The hashing pool is saturated
+    """
+    hasher = current_app.extensions['password_hasher']
+    if user is None:
+        hasher.verify(dummy_hash(hasher.method), password)
+        return False
+    if not hasher.verify(user.password_hash, password):
+        return False
+    if hasher.needs_rehash(user.password_hash):
+        user.password_hash = hasher.hash(password)
+    return True
+
+
+def throttle(ip: str, username: str) -> float:
+    """
+    Count a login attempt against the client's IP and the username
+
+    Returns:
+        float: 0 if the attempt may proceed, otherwise seconds to wait
+    """
+    limits = current_app.extensions['login_limits']
+    retry_after = limits['ip'].consume(f"ip:{ip}")
+    if not retry_after:
+        retry_after = limits['user'].consume(f"user:{username.strip().lower()}")
+    return retry_after
+
+
+def login_succeeded(username: str):
+    current_app.extensions['login_limits']['user'].reset(f"user:{username.strip().lower()}")
+
+
+def init_app(app):
+    """
+    Set up password hashing and login limits
+
+    Config (defaults from the environment):
+        PASSWORD_HASH_METHOD: werkzeug method, e.g. 'scrypt:32768:8:1' or 'pbkdf2:sha256:600000'
+        PASSWORD_HASH_WORKERS: Threads deriving password hashes (default 2)
+        PASSWORD_HASH_QUEUE: Logins allowed to wait for those threads (default 8)
+        PASSWORD_HASH_TIMEOUT: Seconds a login waits for its hash (default 10)
+        LOGIN_IP_BURST / LOGIN_IP_PER_MINUTE: Attempts per client IP (default 20, then 10 a minute)
+        LOGIN_USER_BURST / LOGIN_USER_PER_MINUTE: Attempts per username (default 5, then 2 a minute)
+    """
+    app.config.setdefault('PASSWORD_HASH_METHOD', os.environ.get('PASSWORD_HASH_METHOD', DEFAULT_HASH_METHOD))
+    app.config.setdefault('PASSWORD_HASH_WORKERS', int(os.environ.get('PASSWORD_HASH_WORKERS', '2')))
+    app.config.setdefault('PASSWORD_HASH_QUEUE', int(os.environ.get('PASSWORD_HASH_QUEUE', '8')))
+    app.config.setdefault('PASSWORD_HASH_TIMEOUT', float(os.environ.get('PASSWORD_HASH_TIMEOUT', '10')))
+    app.config.setdefault('LOGIN_IP_BURST', int(os.environ.get('LOGIN_IP_BURST', '20')))
+    app.config.setdefault('LOGIN_IP_PER_MINUTE', float(os.environ.get('LOGIN_IP_PER_MINUTE', '10')))
+    app.config.setdefault('LOGIN_USER_BURST', int(os.environ.get('LOGIN_USER_BURST', '5')))
+    app.config.setdefault('LOGIN_USER_PER_MINUTE', float(os.environ.get('LOGIN_USER_PER_MINUTE', '2')))
+
+    app.extensions['password_hasher'] = PasswordHasher(
+        app.config['PASSWORD_HASH_METHOD'],
+        app.config['PASSWORD_HASH_WORKERS'],
+        app.config['PASSWORD_HASH_QUEUE'],
+        app.config['PASSWORD_HASH_TIMEOUT'],
+    )
+    app.extensions['login_limits'] = {
+        'ip': TokenBucket(app.config['LOGIN_IP_BURST'], app.config['LOGIN_IP_PER_MINUTE']),
+        'user': TokenBucket(app.config['LOGIN_USER_BURST'], app.config['LOGIN_USER_PER_MINUTE']),
+    }
@@ -0,0 +1,369 @@
+"""
+Request and LLM Instrumentation
+This module keeps in-process counters and histograms for the hot paths -
+route latency, SQL queries per request, LLM phases and Ollama generation
+timings - and renders them in the Prometheus text exposition format on
+/metrics. Metrics are per process; scrape every worker (or run a single
+one) to see the whole picture.
+"""
+
+import hmac
+import importlib
+import ipaddress
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from flask import Response, before_render_template, g, has_request_context, request, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# Environ key marking requests whose timing is recorded outside Flask's hooks (asgi.py)
+EXTERNAL_TIMING_KEY = 'tracker.external_timing'
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names: Sequence[str], values: Sequence, extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), registry: List = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple, object] = {}
+        self._lock = threading.Lock()
+        (REGISTRY if registry is None else registry).append(self)
+
+    def _key(self, labels: Dict) -> Tuple:
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_value(key, value))
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _render_value(self, key, value):
+        return [f'{self.name}{_labels(self.labelnames, key)} {value}']
+
+
+class Gauge(_Metric):
+    """Value that is set rather than accumulated"""
+    kind = 'gauge'
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def _render_value(self, key, value):
+        return [f'{self.name}{_labels(self.labelnames, key)} {value}']
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets"""
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS,
+                 registry: List = None):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def _render_value(self, key, state):
+        counts, total, count = state
+        lines, cumulative = [], 0
+        for bound, bucket in zip(self.buckets, counts):
+            cumulative += bucket
+            le = 'le="%s"' % bound
+            lines.append(f'{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}')
+        le = 'le="+Inf"'
+        lines.append(f'{self.name}_bucket{_labels(self.labelnames, key, le)} {count}')
+        lines.append(f'{self.name}_sum{_labels(self.labelnames, key)} {total}')
+        lines.append(f'{self.name}_count{_labels(self.labelnames, key)} {count}')
+        return lines
+
+
+REGISTRY: List[_Metric] = []
+_collectors: List[Callable[[], Iterable[str]]] = []
+
+
+def register_collector(collector: Callable[[], Iterable[str]]):
+    """Add a callable producing extra exposition lines at scrape time"""
+    _collectors.append(collector)
+
+
+def render(registry: List[_Metric] = None) -> str:
+    """
+    Metrics in Prometheus text format
+
+    Args:
+        registry: Metrics to render; the global REGISTRY and the registered
+            collectors by default
+    """
+    if registry is not None:
+        return '\n'.join(line for metric in registry for line in metric.render()) + '\n'
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    for collector in _collectors:
+        try:
+            lines.extend(collector())
+        except Exception as e:
+            print(f"Metrics collector failed: {e}")
+    return '\n'.join(lines) + '\n'
+
+
+# Startup --------------------------------------------------------------------
+
+STARTUP_SECONDS = Gauge('app_startup_seconds', 'Cold-start cost: app import and first import of lazily loaded modules', ['phase'])
+
+# Routes ---------------------------------------------------------------------
+
+REQUEST_SECONDS = Histogram('http_request_duration_seconds', 'Request latency by route', ['method', 'route', 'status'])
+REQUEST_QUERIES = Histogram('http_request_db_queries', 'SQL statements executed per request', ['route'], COUNT_BUCKETS)
+REQUEST_DB_SECONDS = Histogram('http_request_db_seconds', 'Time spent in SQL per request', ['route'])
+REQUEST_RENDER_SECONDS = Histogram('http_request_render_seconds', 'Time spent rendering templates per request', ['route'])
+FRAGMENT_CACHE = Counter('template_fragment_cache_total', 'Cached template fragment lookups, by fragment and result (hit, miss)', ['fragment', 'result'])
+
+# Database -------------------------------------------------------------------
+
+QUERY_SECONDS = Histogram('db_query_duration_seconds', 'SQL statement latency', ['statement'])
+
+# LLM ------------------------------------------------------------------------
+
+LLM_PHASE_SECONDS = Histogram('llm_phase_duration_seconds', 'Time per schedule generation phase (prompt, generation, parse)', ['phase'], LLM_BUCKETS)
+LLM_ERRORS = Counter('llm_errors_total', 'LLM calls that raised an error', ['operation'])
+OLLAMA_PROMPT_EVAL_SECONDS = Histogram('ollama_prompt_eval_duration_seconds', 'Prompt evaluation time reported by Ollama', ['model'], LLM_BUCKETS)
+OLLAMA_EVAL_SECONDS = Histogram('ollama_eval_duration_seconds', 'Token generation time reported by Ollama', ['model'], LLM_BUCKETS)
+OLLAMA_OVERHEAD_SECONDS = Histogram('ollama_overhead_duration_seconds', 'Server time not spent evaluating (queueing, model load)', ['model'], LLM_BUCKETS)
+OLLAMA_EVAL_TOKENS = Counter('ollama_eval_tokens_total', 'Tokens generated (reported by Ollama, or streamed chunks when a stream is cut early)', ['model'])
+OLLAMA_FIRST_TOKEN_SECONDS = Histogram('ollama_time_to_first_token_seconds', 'Client-side wait for the first streamed token', ['model'], LLM_BUCKETS)
+
+# Outcomes -------------------------------------------------------------------
+
+SCHEDULES = Counter('schedule_generations_total', 'Schedules produced, by source (llm, fallback, rule, ...)', ['source'])
+CHAT_RESPONSES = Counter('ai_chat_responses_total', 'AI chat responses, by source (intent, llm, fallback)', ['source'])
+LOGIN_ATTEMPTS = Counter('login_attempts_total', 'Login form submissions, by outcome (success, invalid, throttled, busy)', ['outcome'])
+
+
+@contextmanager
+def timed(histogram: Histogram, **labels):
+    """Observe the duration of a block"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - started, **labels)
+
+
+def record_startup(phase: str, seconds: float):
+    """Record a cold-start timing, printed as well when REPORT_IMPORT_TIMES=1"""
+    STARTUP_SECONDS.set(seconds, phase=phase)
+    if os.environ.get('REPORT_IMPORT_TIMES') == '1':
+        print(f"Startup {phase}: {seconds * 1000:.1f} ms")
+
+
+def lazy_import(name: str):
+    """
+    Import a module on first use, timing the cold import
+
+    Args:
+        name: Module name
+
+    Returns:
+        module: The imported module
+    """
+    module = sys.modules.get(name)
+    if module is None:
+        started = time.perf_counter()
+        module = importlib.import_module(name)
+        record_startup(f'import {name}', time.perf_counter() - started)
+    return module
+
+
+def observe_ollama(stats: Dict, model: str = None):
+    """
+    Record generation timings reported by Ollama
+
+    Args:
+        stats: Final Ollama response or 'done' chunk with eval_count and
+            total/eval/prompt_eval durations (nanoseconds)
+        model: Model name (default: stats['model'])
+    """
+    model = model or stats.get('model', 'unknown')
+    prompt_eval = stats.get('prompt_eval_duration', 0) / 1e9
+    evaluation = stats.get('eval_duration', 0) / 1e9
+    total = stats.get('total_duration', 0) / 1e9
+    if prompt_eval:
+        OLLAMA_PROMPT_EVAL_SECONDS.observe(prompt_eval, model=model)
+    if evaluation:
+        OLLAMA_EVAL_SECONDS.observe(evaluation, model=model)
+    if total:
+        OLLAMA_OVERHEAD_SECONDS.observe(max(0.0, total - prompt_eval - evaluation), model=model)
+    if stats.get('eval_count'):
+        OLLAMA_EVAL_TOKENS.inc(stats['eval_count'], model=model)
+
+
+def route_stats_lines(stats: List[Dict]) -> List[str]:
+    """Exposition lines for ModelRouter.get_stats()"""
+    names = ('route', 'model')
+    lines = [
+        '# HELP llm_route_requests_total Schedule requests served per complexity route and model',
+        '# TYPE llm_route_requests_total counter',
+    ]
+    lines += [f'llm_route_requests_total{_labels(names, (s["route"], s["model"]))} {s["requests"]}' for s in stats]
+    lines += ['# HELP llm_route_failures_total Routed requests without a usable schedule', '# TYPE llm_route_failures_total counter']
+    lines += [f'llm_route_failures_total{_labels(names, (s["route"], s["model"]))} {s["failures"]}' for s in stats]
+    lines += ['# HELP llm_route_avg_latency_seconds Mean latency per route and model', '# TYPE llm_route_avg_latency_seconds gauge']
+    lines += [f'llm_route_avg_latency_seconds{_labels(names, (s["route"], s["model"]))} {s["avg_latency"]}' for s in stats]
+    lines += ['# HELP llm_route_avg_quality Mean schedule quality score per route and model', '# TYPE llm_route_avg_quality gauge']
+    lines += [f'llm_route_avg_quality{_labels(names, (s["route"], s["model"]))} {s["avg_quality"]}'
+              for s in stats if s['avg_quality'] is not None]
+    return lines
+
+
+# SQLAlchemy hooks -----------------------------------------------------------
+
+_query_hooks: List[Callable[[str, float], None]] = []
+
+
+def add_query_hook(hook: Callable[[str, float], None]):
+    """Call hook(statement, seconds) after every SQL statement"""
+    _query_hooks.append(hook)
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['query_started'].pop()
+    elapsed = time.perf_counter() - started
+    QUERY_SECONDS.observe(elapsed, statement=statement.split(None, 1)[0].upper() if statement else '')
+    if has_request_context() and 'metrics_queries' in g:
+        g.metrics_queries += 1
+        g.metrics_db_seconds += elapsed
+    for hook in _query_hooks:
+        hook(statement, elapsed)
+
+
+@event.listens_for(Engine, 'handle_error')
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute; drop its start
+    # time so the next query on this (pooled) connection isn't timed from it
+    conn = context.connection
+    if conn is not None and context.statement is not None and conn.info.get('query_started'):
+        conn.info['query_started'].pop()
+
+
+# Flask integration ----------------------------------------------------------
+
+def route_label() -> str:
+    """Route template of the current request (bounded cardinality)"""
+    return request.url_rule.rule if request.url_rule else 'unmatched'
+
+
+def _start_request():
+    if request.environ.get(EXTERNAL_TIMING_KEY):
+        return
+    g.metrics_started = time.perf_counter()
+    g.metrics_queries = 0
+    g.metrics_db_seconds = 0.0
+    g.metrics_render_seconds = 0.0
+
+
+def _start_render(sender, template, context, **extra):
+    if 'metrics_started' in g:
+        g.metrics_render_started = time.perf_counter()
+
+
+def _finish_render(sender, template, context, **extra):
+    if 'metrics_render_started' in g:
+        g.metrics_render_seconds += time.perf_counter() - g.pop('metrics_render_started')
+
+
+def _finish_request(response):
+    if 'metrics_started' in g:
+        route = route_label()
+        REQUEST_SECONDS.observe(time.perf_counter() - g.metrics_started,
+                                method=request.method, route=route, status=response.status_code)
+        REQUEST_QUERIES.observe(g.metrics_queries, route=route)
+        REQUEST_DB_SECONDS.observe(g.metrics_db_seconds, route=route)
+        REQUEST_RENDER_SECONDS.observe(g.metrics_render_seconds, route=route)
+    return response
+
+
+def _is_loopback(address: Optional[str]) -> bool:
+    try:
+        return ipaddress.ip_address(address or '').is_loopback
+    except ValueError:
+        return False
+
+
+def init_app(app):
+    """
+    Install request timing hooks and the /metrics endpoint
+
+    Scrapes must send 'Authorization: Bearer <METRICS_TOKEN>'. Without a
+    token only loopback clients may scrape; behind a reverse proxy that is
+    every client, so set METRICS_TOKEN when the proxy is reachable publicly.
+    """
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    before_render_template.connect(_start_render, app)
+    template_rendered.connect(_finish_render, app)
+
+    @app.route('/metrics')
+    def metrics():
+        token = app.config.get('METRICS_TOKEN') or os.environ.get('METRICS_TOKEN')
+        if token:
+            if not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+                return Response('Unauthorized\n', status=401, mimetype='text/plain')
+        elif not _is_loopback(request.remote_addr):
+            return Response('Forbidden: set METRICS_TOKEN to scrape remotely\n', status=403, mimetype='text/plain')
+        return Response(render(), mimetype='text/plain; version=0.0.4')
@@ -5,8 +5,14 @@ Adds new fields for schedule quality scoring and user feedback
 """
 
 from app import app, db
-from models import Schedule, ScheduleFeedback
+from models import (User, Schedule, ScheduleFeedback, ScheduleArchive, FeedbackRollup, FeedbackRollupAspect,
+                    UserStats, SiteStats)
 from sqlalchemy import inspect
+from schedule_codec import encode_schedule
+import json
+
+# Rows converted per transaction when compacting stored schedules
+COMPACT_BATCH_SIZE = 500
 
 def check_column_exists(table_name, column_name):
     """Check if a column exists in a table"""
@@ -14,11 +20,61 @@ def check_column_exists(table_name, column_name):
     columns = [col['name'] for col in inspector.get_columns(table_name)]
     return column_name in columns
 
+def check_index_exists(table_name, index_name):
+    """Check if an index exists (SQLite reflection skips expression indexes)"""
+    if db.engine.dialect.name == 'sqlite':
+        with db.engine.connect() as conn:
+            return conn.execute(db.text("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = :name"),
+                                {'name': index_name}).first() is not None
+    return index_name in [i['name'] for i in inspect(db.engine).get_indexes(table_name)]
+
+def check_unique_schedule_index():
+    """Check if schedule has a unique index or constraint on (user_id, date)"""
+    inspector = inspect(db.engine)
+    unique_sets = [set(c['column_names']) for c in inspector.get_unique_constraints('schedule')]
+    unique_sets += [set(i['column_names']) for i in inspector.get_indexes('schedule') if i.get('unique')]
+    return {'user_id', 'date'} in unique_sets
+
+def compact_schedules(batch_size=COMPACT_BATCH_SIZE):
+    """
+    Re-encode JSON schedules into the compact schedule_blob format
+    
+    Converts in batches so a large table never holds one long write lock.
+    
+    Returns:
+        int: Number of rows converted
+    """
+    converted = 0
+    last_id = 0
+    while True:
+        with db.engine.connect() as conn:
+            rows = conn.execute(db.text(
+                'SELECT id, schedule_data FROM schedule '
+                'WHERE schedule_blob IS NULL AND id > :last_id ORDER BY id LIMIT :limit'
+            ), {'last_id': last_id, 'limit': batch_size}).fetchall()
+            if not rows:
+                return converted
+            for schedule_id, schedule_data in rows:
+                if isinstance(schedule_data, str):
+                    schedule_data = json.loads(schedule_data)
+                conn.execute(db.text(
+                    "UPDATE schedule SET schedule_blob = :blob, schedule_data = '{}' WHERE id = :id"
+                ), {'blob': encode_schedule(schedule_data or {}), 'id': schedule_id})
+            conn.commit()
+        converted += len(rows)
+        last_id = rows[-1][0]
+
 def migrate_database():
     """Add new columns to existing tables"""
     with app.app_context():
         print("🔄 Starting database migration...")
         
+        # Retention and summary tables
+        for model in (ScheduleArchive, FeedbackRollup, FeedbackRollupAspect, UserStats, SiteStats):
+            if not inspect(db.engine).has_table(model.__tablename__):
+                model.__table__.create(db.engine)
+                print(f"➕ Created {model.__tablename__} table")
+        
         # Create all tables (will create ScheduleFeedback if it doesn't exist)
         db.create_all()
         print("✅ Created new tables (if any)")
@@ -47,11 +103,123 @@ def migrate_database():
                 conn.commit()
             needs_update = True
         
+        if not check_column_exists('schedule', 'generated_at'):
+            print("➕ Adding generated_at column to Schedule table")
+            with db.engine.connect() as conn:
+                conn.execute(db.text('ALTER TABLE schedule ADD COLUMN generated_at TIMESTAMP'))
+                conn.commit()
+            needs_update = True
+        
+        if not check_column_exists('schedule', 'source'):
+            print("➕ Adding source column to Schedule table")
+            with db.engine.connect() as conn:
+                conn.execute(db.text('ALTER TABLE schedule ADD COLUMN source VARCHAR(20)'))
+                conn.commit()
+            needs_update = True
+        
+        # Schedule upserts need a unique (user_id, date) key; keep the newest
+        # row of any duplicates created before the constraint existed, moving
+        # feedback given on the older rows onto it
+        if not check_unique_schedule_index():
+            print("➕ Adding unique (user_id, date) index to Schedule table")
+            with db.engine.connect() as conn:
+                moved = conn.execute(db.text(
+                    'UPDATE schedule_feedback SET schedule_id = ('
+                    '  SELECT MAX(n.id) FROM schedule n JOIN schedule s'
+                    '    ON n.user_id = s.user_id AND n.date = s.date'
+                    '  WHERE s.id = schedule_feedback.schedule_id) '
+                    'WHERE schedule_id IN ('
+                    '  SELECT s.id FROM schedule s WHERE EXISTS ('
+                    '    SELECT 1 FROM schedule newer'
+                    '    WHERE newer.user_id = s.user_id AND newer.date = s.date AND newer.id > s.id))'
+                )).rowcount
+                removed = conn.execute(db.text(
+                    'DELETE FROM schedule WHERE EXISTS ('
+                    '  SELECT 1 FROM schedule newer'
+                    '  WHERE newer.user_id = schedule.user_id AND newer.date = schedule.date AND newer.id > schedule.id)'
+                )).rowcount
+                conn.execute(db.text('CREATE UNIQUE INDEX uq_schedule_user_date ON schedule (user_id, date)'))
+                conn.commit()
+            if removed:
+                print(f"🧹 Removed {removed} duplicate schedule rows ({moved} feedback entries moved to the kept row)")
+            needs_update = True
+        
+        if not check_column_exists('schedule', 'schedule_blob'):
+            print("➕ Adding schedule_blob column to Schedule table")
+            with db.engine.connect() as conn:
+                # BLOB on SQLite, BYTEA on PostgreSQL
+                blob_type = db.LargeBinary().compile(dialect=db.engine.dialect)
+                conn.execute(db.text(f'ALTER TABLE schedule ADD COLUMN schedule_blob {blob_type}'))
+                conn.commit()
+            needs_update = True
+        
+        if not check_column_exists('schedule', 'task_ids'):
+            print("➕ Adding task_ids column to Schedule table")
+            with db.engine.connect() as conn:
+                json_type = db.JSON().compile(dialect=db.engine.dialect)
+                conn.execute(db.text(f'ALTER TABLE schedule ADD COLUMN task_ids {json_type}'))
+                conn.commit()
+            needs_update = True
+        
+        if app.config.get('SCHEDULE_COMPACT_STORAGE'):
+            converted = compact_schedules()
+            if converted:
+                print(f"🗜️  Converted {converted} schedules to compact storage")
+                needs_update = True
+        
         if needs_update:
             print("✅ Schedule table updated successfully")
         else:
             print("✅ Schedule table already up to date")
         
+        if 'ix_task_user_status' not in [i['name'] for i in inspect(db.engine).get_indexes('task')]:
+            print("➕ Adding (user_id, status) index to Task table")
+            with db.engine.connect() as conn:
+                conn.execute(db.text('CREATE INDEX ix_task_user_status ON task (user_id, status)'))
+                conn.commit()
+        
+        # Admin search indexes on lower(username), lower(email) and lower(name)
+        for index in User.__table__.indexes:
+            if not check_index_exists('user', index.name):
+                print(f"➕ Adding {index.name} index to User table")
+                index.create(db.engine)
+        if check_index_exists('user', 'ix_user_name'):
+            # Superseded by ix_user_name_lower
+            with db.engine.connect() as conn:
+                conn.execute(db.text('DROP INDEX ix_user_name'))
+                conn.commit()
+        
+        # scrypt hashes (~160 characters) overflow the old VARCHAR(128); SQLite
+        # does not enforce VARCHAR lengths, so only PostgreSQL needs widening
+        password_hash = next(c for c in inspect(db.engine).get_columns('user') if c['name'] == 'password_hash')
+        if db.engine.dialect.name == 'postgresql' and (getattr(password_hash['type'], 'length', None) or 256) < 256:
+            print("➕ Widening password_hash column of User table to 256 characters")
+            with db.engine.connect() as conn:
+                conn.execute(db.text('ALTER TABLE "user" ALTER COLUMN password_hash TYPE VARCHAR(256)'))
+                conn.commit()
+        
+        if not check_column_exists('site_stats', 'rebuilt_at'):
+            print("➕ Adding rebuilt_at column to SiteStats table")
+            with db.engine.connect() as conn:
+                timestamp_type = db.DateTime().compile(dialect=db.engine.dialect)
+                conn.execute(db.text(f'ALTER TABLE site_stats ADD COLUMN rebuilt_at {timestamp_type}'))
+                conn.commit()
+        
+        # Backfill admin dashboard summaries; afterwards they are kept current on
+        # write. Writes made before this first backfill (a registration, the
+        # seeded admin) only created partial rows, so go by the marker instead.
+        if SiteStats.get().rebuilt_at is None:
+            UserStats.rebuild()
+            db.session.commit()
+            print(f"📊 Built summary rows for {UserStats.query.count()} users")
+        
+        # Backfill running feedback aggregates; afterwards they grow on insert
+        if FeedbackRollup.query.filter_by(kind=FeedbackRollup.TOTAL).first() is None \
+                and ScheduleFeedback.query.first() is not None:
+            FeedbackRollup.rebuild()
+            db.session.commit()
+            print("📊 Built feedback aggregates")
+        
         # Verify ScheduleFeedback table exists
         if db.engine.dialect.has_table(db.engine.connect(), 'schedule_feedback'):
             print("✅ ScheduleFeedback table exists")
@@ -65,6 +233,7 @@ def migrate_database():
         print("  - Schedule quality scoring")
         print("  - User feedback and ratings")
         print("  - Enhanced AI optimization metrics")
+        print("  - Compact schedule storage")
 
 if __name__ == '__main__':
     migrate_database()
@@ -0,0 +1,143 @@
+"""
+Model Routing by Task Complexity
+This module picks which Ollama model serves a schedule request: simple
+workloads go to a small quantized model and complex ones to the larger
+model, falling back along the configured route when a model has not been
+pulled. Latency and quality scores are recorded per route.
+"""
+
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+from llm_config import MODEL_CONFIG
+
+
+class ModelRouter:
+    """Select an available model for each complexity level and track route stats"""
+
+    def __init__(self, routes: Dict[str, List[str]] = None, default_model: str = None, model_list_ttl: int = None):
+        """
+        Initialize the model router
+
+        Args:
+            routes: Complexity level -> models in order of preference
+                (default: MODEL_CONFIG['routes'])
+            default_model: Model used when no routed model is available
+                (default: MODEL_CONFIG['model_name'])
+            model_list_ttl: Seconds before the list of pulled models is stale
+        """
+        self.routes = routes if routes is not None else MODEL_CONFIG.get('routes', {})
+        self.default_model = default_model or MODEL_CONFIG['model_name']
+        self.model_list_ttl = model_list_ttl if model_list_ttl is not None else MODEL_CONFIG.get('model_list_ttl', 300)
+        self._available: Optional[Set[str]] = None
+        self._available_at = 0.0
+        self._stats: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(name: str) -> str:
+        """Treat 'mistral' and 'mistral:latest' as the same model"""
+        return name[:-len(':latest')] if name.endswith(':latest') else name
+
+    def update_available_models(self, names: Iterable[str]):
+        """
+        Refresh the set of pulled models
+
+        Args:
+            names: Model names as reported by Ollama's /api/tags
+        """
+        with self._lock:
+            self._available = {self._normalize(name) for name in names}
+            self._available_at = time.monotonic()
+
+    def mark_unavailable(self, model: str):
+        """Drop a model that Ollama reported as missing"""
+        with self._lock:
+            if self._available is None:
+                self._available = set(self._all_models())
+                self._available_at = time.monotonic()
+            self._available.discard(self._normalize(model))
+
+    def _all_models(self) -> List[str]:
+        models = [self._normalize(m) for route in self.routes.values() for m in route]
+        return models + [self._normalize(self.default_model)]
+
+    def needs_refresh(self) -> bool:
+        """True if the pulled-model list is unknown or older than the TTL"""
+        return self._available is None or time.monotonic() - self._available_at > self.model_list_ttl
+
+    def candidates(self, complexity: str) -> List[str]:
+        """
+        Models to try for a complexity level, in order
+
+        Unpulled models are skipped once the model list is known; the
+        default model is always tried last.
+
+        Args:
+            complexity: 'simple', 'moderate' or 'complex'
+
+        Returns:
+            List of model names
+        """
+        ordered = []
+        for model in list(self.routes.get(complexity, [])) + [self.default_model]:
+            name = self._normalize(model)
+            if name not in ordered:
+                ordered.append(name)
+
+        available = self._available
+        if available is None:
+            return ordered
+        pulled = [m for m in ordered if m in available]
+        return pulled or [self._normalize(self.default_model)]
+
+    def record(self, complexity: str, model: str, latency: float, quality: Optional[int] = None, success: bool = True):
+        """
+        Record the outcome of one routed request
+
+        Args:
+            complexity: Route the request took
+            model: Model that served it
+            latency: Wall-clock seconds for the generation
+            quality: Overall quality score of the schedule (0-100)
+            success: False if no usable schedule was produced
+        """
+        key = f"{complexity}:{model}"
+        with self._lock:
+            stats = self._stats.setdefault(key, {
+                'route': complexity,
+                'model': model,
+                'requests': 0,
+                'failures': 0,
+                'total_latency': 0.0,
+                'quality_samples': 0,
+                'total_quality': 0,
+            })
+            stats['requests'] += 1
+            stats['total_latency'] += latency
+            if not success:
+                stats['failures'] += 1
+            if quality is not None:
+                stats['quality_samples'] += 1
+                stats['total_quality'] += quality
+
+    def get_stats(self) -> List[Dict]:
+        """
+        Per-route summary of recorded requests
+
+        Returns:
+            List of dicts with request counts, average latency and quality
+        """
+        with self._lock:
+            summary = []
+            for stats in self._stats.values():
+                summary.append({
+                    'route': stats['route'],
+                    'model': stats['model'],
+                    'requests': stats['requests'],
+                    'failures': stats['failures'],
+                    'avg_latency': round(stats['total_latency'] / stats['requests'], 3),
+                    'avg_quality': round(stats['total_quality'] / stats['quality_samples'], 1) if stats['quality_samples'] else None,
+                })
+            return summary
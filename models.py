@@ -1,15 +1,30 @@
+from flask import current_app
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import datetime
+from werkzeug.security import check_password_hash
+from datetime import datetime, timedelta
+
+from login_security import hash_password
+from schedule_codec import encode_schedule, decode_schedule
 
 db = SQLAlchemy()
 
+def _upsert_insert():
+    """The dialect's INSERT ... ON CONFLICT construct, or None if unsupported"""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    return insert
+
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
-    password_hash = db.Column(db.String(120), nullable=False)
+    password_hash = db.Column(db.String(256), nullable=False)  # scrypt hashes are ~160 characters
     is_admin = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
@@ -31,7 +46,7 @@ class User(UserMixin, db.Model):
     schedules = db.relationship('Schedule', backref='user', lazy=True)
     
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
     
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
@@ -39,7 +54,23 @@ class User(UserMixin, db.Model):
     def __repr__(self):
         return f'<User {self.username}>'
 
+def _lower_prefix_index(column):
+    """
+    Index on lower(column) for the admin's case-insensitive prefix search
+    
+    text_pattern_ops lets PostgreSQL serve LIKE 'prefix%' from it under any
+    collation; SQLite range-scans the plain expression index.
+    """
+    label = f'{column.key}_lower'
+    return db.Index(f'ix_user_{label}', db.func.lower(column).label(label), postgresql_ops={label: 'text_pattern_ops'})
+
+for _column in (User.username, User.email, User.name):
+    _lower_prefix_index(_column)
+
 class Task(db.Model):
+    # Every task listing filters on the owner and status
+    __table_args__ = (db.Index('ix_task_user_status', 'user_id', 'status'),)
+    
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     description = db.Column(db.String(200), nullable=False)
@@ -55,17 +86,126 @@ class Task(db.Model):
         return f'<Task {self.description}>'
 
 class Schedule(db.Model):
+    # One schedule per user and date; writers go through Schedule.upsert
+    __table_args__ = (db.UniqueConstraint('user_id', 'date', name='uq_schedule_user_date'),)
+    # Columns an overwriting upsert replaces (created_at keeps the first insert)
+    REPLACED_COLUMNS = ('schedule_data', 'schedule_blob', 'source', 'generated_at', 'quality_score', 'task_ids')
+    
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     date = db.Column(db.Date, nullable=False)
-    schedule_data = db.Column(db.JSON, nullable=False)
+    # Legacy JSON column; empty ({}) when the schedule is stored compactly
+    _schedule_json = db.Column('schedule_data', db.JSON, nullable=False)
+    # Compact encoding (see schedule_codec), decoded lazily by schedule_data
+    schedule_blob = db.Column(db.LargeBinary)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Generation metadata
+    generated_at = db.Column(db.DateTime)  # When schedule_data was last generated
+    source = db.Column(db.String(20))  # 'llm', 'fallback', 'rule', 'cli' or 'precomputed'
+    # Pending task ids a precomputed schedule was generated for
+    task_ids = db.Column(db.JSON)
+    
     # Quality metrics
     quality_score = db.Column(db.Integer)  # Overall quality score
     user_rating = db.Column(db.Integer)  # User's rating (1-5)
     user_feedback = db.Column(db.Text)  # User's feedback text
     
+    @property
+    def schedule_data(self):
+        """Schedule JSON, decoded from the compact blob on first access"""
+        blob = self.schedule_blob
+        if blob is None:
+            return self._schedule_json
+        cached = self.__dict__.get('_decoded_schedule')
+        if cached is None or cached[0] is not blob:
+            cached = (blob, decode_schedule(blob))
+            self.__dict__['_decoded_schedule'] = cached
+        return cached[1]
+    
+    @schedule_data.setter
+    def schedule_data(self, value):
+        self._schedule_json, self.schedule_blob = self.storage_values(value)
+    
+    @staticmethod
+    def storage_values(schedule_data):
+        """
+        Column values for a schedule under the configured storage format
+        
+        Returns:
+            tuple: (schedule_data JSON column, schedule_blob column)
+        """
+        if current_app.config.get('SCHEDULE_COMPACT_STORAGE'):
+            return {}, encode_schedule(schedule_data)
+        return schedule_data, None
+    
+    @classmethod
+    def upsert(cls, user_id, date, schedule_data, source, overwrite=True, task_ids=None):
+        """
+        Insert or replace the schedule for (user_id, date) in one statement
+        
+        Uses INSERT ... ON CONFLICT on SQLite and PostgreSQL, so concurrent
+        writers can never create duplicate rows for the same date.
+        
+        Args:
+            user_id: Owner of the schedule
+            date: Schedule date
+            schedule_data: Schedule JSON
+            source: Generator of the schedule ('llm', 'fallback', 'rule', 'cli', 'precomputed')
+            overwrite: If False, keep an existing schedule untouched
+            task_ids: Pending task ids the schedule was generated for (precomputed schedules)
+            
+        Returns:
+            bool: True if the row was inserted or replaced
+        """
+        now = datetime.utcnow()
+        schedule_json, schedule_blob = cls.storage_values(schedule_data)
+        values = {
+            'user_id': user_id,
+            'date': date,
+            'schedule_data': schedule_json,
+            'schedule_blob': schedule_blob,
+            'source': source,
+            'generated_at': now,
+            'quality_score': schedule_data.get('overall_quality'),
+            'task_ids': task_ids,
+        }
+        
+        insert = _upsert_insert()
+        if insert is None:
+            return cls._upsert_generic(values, overwrite)
+        
+        # Insert if absent, then replace if wanted; the insert's rowcount says
+        # whether this call created the row
+        table = cls.__table__
+        stmt = insert(table).values(created_at=now, **values).on_conflict_do_nothing(index_elements=['user_id', 'date'])
+        inserted = db.session.execute(stmt).rowcount > 0
+        if inserted:
+            UserStats.record(user_id, schedule_count=1)
+        elif overwrite:
+            db.session.execute(table.update()
+                               .where(table.c.user_id == user_id, table.c.date == date)
+                               .values({key: values[key] for key in cls.REPLACED_COLUMNS}))
+        db.session.commit()
+        return inserted or overwrite
+    
+    @classmethod
+    def _upsert_generic(cls, values, overwrite):
+        """Read-modify-write fallback for databases without ON CONFLICT"""
+        # Map column names to attributes (schedule_data is stored as _schedule_json)
+        values = {('_schedule_json' if key == 'schedule_data' else key): value for key, value in values.items()}
+        existing = cls.query.filter_by(user_id=values['user_id'], date=values['date']).first()
+        if existing is None:
+            db.session.add(cls(**values))
+            UserStats.record(values['user_id'], schedule_count=1)
+        elif overwrite:
+            for key, value in values.items():
+                setattr(existing, key, value)
+        else:
+            return False
+        db.session.commit()
+        return True
+    
     def __repr__(self):
         return f'<Schedule {self.date}>'
 
@@ -92,4 +232,335 @@ class ScheduleFeedback(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     def __repr__(self):
-        return f'<ScheduleFeedback {self.id} - Rating: {self.overall_rating}>'
\ No newline at end of file
+        return f'<ScheduleFeedback {self.id} - Rating: {self.overall_rating}>'
+
+class ScheduleArchive(db.Model):
+    """Schedules moved out of the hot table by retention.py"""
+    __table_args__ = (db.Index('ix_schedule_archive_user_date', 'user_id', 'date'),)
+    
+    id = db.Column(db.Integer, primary_key=True)
+    schedule_id = db.Column(db.Integer, nullable=False)  # Original Schedule.id
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    schedule_blob = db.Column(db.LargeBinary, nullable=False)  # Always compact (see schedule_codec)
+    source = db.Column(db.String(20))
+    quality_score = db.Column(db.Integer)
+    user_rating = db.Column(db.Integer)
+    user_feedback = db.Column(db.Text)
+    created_at = db.Column(db.DateTime)
+    generated_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    @property
+    def schedule_data(self):
+        return decode_schedule(self.schedule_blob)
+    
+    def __repr__(self):
+        return f'<ScheduleArchive {self.date}>'
+
+class _Counters:
+    """Counter columns updated with atomic increments (see UserStats.record)"""
+    COUNTERS = ()
+    
+    @classmethod
+    def _increment(cls, key, deltas, values=None):
+        """
+        Add deltas to a row's counters, creating the row if needed
+        
+        Runs in the caller's transaction; the caller commits.
+        
+        Args:
+            key: Primary key column -> value
+            deltas: Counter column -> amount to add
+            values: Other columns to overwrite
+        """
+        values = values or {}
+        insert = _upsert_insert()
+        if insert is None:
+            row = db.session.get(cls, tuple(key.values()))
+            if row is None:
+                row = cls(**key, **{c: 0 for c in cls.COUNTERS})
+                db.session.add(row)
+            for column, delta in deltas.items():
+                setattr(row, column, getattr(row, column) + delta)
+            for column, value in values.items():
+                setattr(row, column, value)
+            return
+        
+        table = cls.__table__
+        stmt = insert(table).values(**key, **values, **{c: deltas.get(c, 0) for c in cls.COUNTERS})
+        update = {c: table.c[c] + stmt.excluded[c] for c in deltas}
+        update.update({c: stmt.excluded[c] for c in values})
+        if update:
+            stmt = stmt.on_conflict_do_update(index_elements=list(key), set_=update)
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=list(key))
+        db.session.execute(stmt)
+
+class SiteStats(_Counters, db.Model):
+    """Site-wide totals (a single row, id=1) maintained by UserStats.record"""
+    COUNTERS = ('user_count', 'pending_task_count', 'completed_task_count', 'schedule_count')
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_count = db.Column(db.Integer, nullable=False, default=0)
+    pending_task_count = db.Column(db.Integer, nullable=False, default=0)
+    completed_task_count = db.Column(db.Integer, nullable=False, default=0)
+    schedule_count = db.Column(db.Integer, nullable=False, default=0)  # Includes archived schedules
+    # Set by UserStats.rebuild; None means the counters only hold increments
+    # made since the table appeared and still need a backfill
+    rebuilt_at = db.Column(db.DateTime)
+    
+    @classmethod
+    def get(cls):
+        return db.session.get(cls, 1) or cls(**{c: 0 for c in cls.COUNTERS})
+
+class UserStats(_Counters, db.Model):
+    """
+    Per-user summary for the admin dashboard, kept current on every write
+    
+    Feedback counts and ratings live in FeedbackRollup.
+    """
+    COUNTERS = ('pending_task_count', 'completed_task_count', 'schedule_count')
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    pending_task_count = db.Column(db.Integer, nullable=False, default=0)
+    completed_task_count = db.Column(db.Integer, nullable=False, default=0)
+    schedule_count = db.Column(db.Integer, nullable=False, default=0)
+    last_activity_at = db.Column(db.DateTime)
+    
+    @classmethod
+    def record(cls, user_id, **deltas):
+        """
+        Record a user's write: bump their counters and the site totals
+        
+        Also stamps last_activity_at. Runs in the caller's transaction.
+        
+        Args:
+            user_id: Acting user
+            **deltas: Counter -> change (e.g. pending_task_count=-1);
+                user_count only applies to SiteStats. None just stamps the activity.
+        """
+        cls._increment({'user_id': user_id}, {c: d for c, d in deltas.items() if c in cls.COUNTERS},
+                       {'last_activity_at': datetime.utcnow()})
+        site_deltas = {c: d for c, d in deltas.items() if c in SiteStats.COUNTERS}
+        if site_deltas:
+            SiteStats._increment({'id': 1}, site_deltas)
+    
+    # Activity newer than this is not re-stamped by touch()
+    TOUCH_INTERVAL = timedelta(minutes=5)
+    
+    @classmethod
+    def touch(cls, user_id):
+        """
+        Stamp last_activity_at for a read-only action such as logging in
+        
+        A single conditional UPDATE that writes nothing when the user was
+        active within TOUCH_INTERVAL. Runs in the caller's transaction.
+        """
+        now = datetime.utcnow()
+        db.session.execute(db.update(cls).where(
+            cls.user_id == user_id,
+            db.or_(cls.last_activity_at.is_(None), cls.last_activity_at < now - cls.TOUCH_INTERVAL)
+        ).values(last_activity_at=now))
+    
+    @classmethod
+    def rebuild(cls):
+        """
+        Recompute every summary row from the source tables
+        
+        Used to backfill after migration; normal operation only increments.
+        Must be followed by a commit.
+        """
+        per_user = {user_id: dict({c: 0 for c in cls.COUNTERS}, last_activity_at=created_at)
+                    for user_id, created_at in db.session.query(User.id, User.created_at)}
+        
+        def add(rows, column=None):
+            for user_id, count, last_at in rows:
+                if user_id in per_user:
+                    stats = per_user[user_id]
+                    if column:
+                        stats[column] += count or 0
+                    if last_at and (stats['last_activity_at'] is None or last_at > stats['last_activity_at']):
+                        stats['last_activity_at'] = last_at
+        
+        for status in ('pending', 'completed'):
+            add(db.session.query(Task.user_id, db.func.count(Task.id), db.func.max(Task.added_date))
+                .filter(Task.status == status).group_by(Task.user_id), f'{status}_task_count')
+        add(db.session.query(Schedule.user_id, db.func.count(Schedule.id), db.func.max(Schedule.created_at))
+            .group_by(Schedule.user_id), 'schedule_count')
+        add(db.session.query(ScheduleArchive.user_id, db.func.count(ScheduleArchive.id), db.func.max(ScheduleArchive.created_at))
+            .group_by(ScheduleArchive.user_id), 'schedule_count')
+        # Feedback only moves last_activity_at; its counts are in FeedbackRollup
+        add(db.session.query(ScheduleFeedback.user_id, db.func.count(ScheduleFeedback.id), db.func.max(ScheduleFeedback.created_at))
+            .group_by(ScheduleFeedback.user_id))
+        
+        cls.query.delete()
+        SiteStats.query.delete()
+        db.session.add_all(cls(user_id=user_id, **stats) for user_id, stats in per_user.items())
+        site = SiteStats(id=1, user_count=len(per_user), rebuilt_at=datetime.utcnow(), **{c: 0 for c in cls.COUNTERS})
+        for stats in per_user.values():
+            for column in cls.COUNTERS:
+                setattr(site, column, getattr(site, column) + stats[column])
+        db.session.add(site)
+
+class FeedbackRollup(_Counters, db.Model):
+    """
+    Feedback aggregates: counts, rating sums and aspect mentions
+    
+    scope_id is the user id for per-user rows and GLOBAL (0) for the
+    site-wide row. Each scope has up to two rows:
+    
+    - TOTAL covers all feedback ever given. It grows as each ScheduleFeedback
+      is inserted, so reads are a primary-key lookup.
+    - ARCHIVED covers the feedback retention.py has deleted along with its
+      schedule. It is already included in TOTAL and is kept so rebuild()
+      can recompute TOTAL from the rows that still exist.
+    """
+    GLOBAL = 0
+    TOTAL = 'total'
+    ARCHIVED = 'archived'
+    RATING_CATEGORIES = ('overall', 'accuracy', 'realism', 'helpfulness')
+    COUNTERS = ('feedback_count', 'positive_count', 'negative_count') + tuple(
+        f'{category}_{part}' for category in RATING_CATEGORIES for part in ('sum', 'count'))
+    
+    scope_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    kind = db.Column(db.String(10), primary_key=True, default=TOTAL)
+    feedback_count = db.Column(db.Integer, nullable=False, default=0)
+    overall_sum = db.Column(db.Integer, nullable=False, default=0)
+    overall_count = db.Column(db.Integer, nullable=False, default=0)
+    accuracy_sum = db.Column(db.Integer, nullable=False, default=0)
+    accuracy_count = db.Column(db.Integer, nullable=False, default=0)
+    realism_sum = db.Column(db.Integer, nullable=False, default=0)
+    realism_count = db.Column(db.Integer, nullable=False, default=0)
+    helpfulness_sum = db.Column(db.Integer, nullable=False, default=0)
+    helpfulness_count = db.Column(db.Integer, nullable=False, default=0)
+    positive_count = db.Column(db.Integer, nullable=False, default=0)  # Positive aspect mentions
+    negative_count = db.Column(db.Integer, nullable=False, default=0)  # Negative aspect mentions
+    
+    @classmethod
+    def _add(cls, kind, feedback_rows):
+        """Add feedback rows to their users' and the global rows of one kind"""
+        deltas, aspects = {}, {}
+        for feedback in feedback_rows:
+            row = {'feedback_count': 1,
+                   'positive_count': len(feedback.positive_aspects or []),
+                   'negative_count': len(feedback.negative_aspects or [])}
+            for category in cls.RATING_CATEGORIES:
+                rating = getattr(feedback, f'{category}_rating')
+                if rating is not None:
+                    row[f'{category}_sum'] = rating
+                    row[f'{category}_count'] = 1
+            for scope_id in (feedback.user_id, cls.GLOBAL):
+                scope = deltas.setdefault(scope_id, {})
+                for column, delta in row.items():
+                    scope[column] = scope.get(column, 0) + delta
+                for polarity in ('positive', 'negative'):
+                    for aspect in getattr(feedback, f'{polarity}_aspects') or []:
+                        key = (scope_id, polarity, str(aspect)[:100])
+                        aspects[key] = aspects.get(key, 0) + 1
+        
+        for scope_id, scope_deltas in deltas.items():
+            cls._increment({'scope_id': scope_id, 'kind': kind}, scope_deltas)
+        for (scope_id, polarity, aspect), count in aspects.items():
+            FeedbackRollupAspect._increment(
+                {'scope_id': scope_id, 'kind': kind, 'polarity': polarity, 'aspect': aspect}, {'count': count})
+    
+    @classmethod
+    def record(cls, feedback):
+        """
+        Add one new feedback row to its user's and the global totals
+        
+        Runs in the caller's transaction; the caller commits.
+        
+        Args:
+            feedback: The ScheduleFeedback being inserted
+        """
+        cls._add(cls.TOTAL, [feedback])
+    
+    @classmethod
+    def archive(cls, feedback_rows):
+        """
+        Keep the aggregates of feedback that retention is about to delete
+        
+        The totals are unchanged. Runs in the caller's transaction.
+        """
+        cls._add(cls.ARCHIVED, feedback_rows)
+    
+    @property
+    def average_rating(self):
+        return round(self.overall_sum / self.feedback_count, 2) if self.feedback_count else None
+    
+    def means(self):
+        """Mean rating per category (None where nothing was rated)"""
+        return {
+            category: round(getattr(self, f'{category}_sum') / getattr(self, f'{category}_count'), 2)
+            if getattr(self, f'{category}_count') else None
+            for category in self.RATING_CATEGORIES
+        }
+    
+    def summary(self, top_aspects=None):
+        """
+        Aggregate values for APIs and parameter tuning
+        
+        Args:
+            top_aspects: If set, include the most reported aspects per polarity
+        """
+        summary = {
+            'feedback_count': self.feedback_count or 0,
+            'mean_ratings': self.means(),
+            'positive_count': self.positive_count or 0,
+            'negative_count': self.negative_count or 0,
+        }
+        if top_aspects:
+            for polarity in ('positive', 'negative'):
+                rows = FeedbackRollupAspect.query.filter_by(scope_id=self.scope_id, kind=self.kind, polarity=polarity) \
+                    .order_by(FeedbackRollupAspect.count.desc()).limit(top_aspects)
+                summary[f'top_{polarity}_aspects'] = {row.aspect: row.count for row in rows}
+        return summary
+    
+    @classmethod
+    def _empty(cls, scope_id, kind=TOTAL):
+        return cls(scope_id=scope_id, kind=kind, **{c: 0 for c in cls.COUNTERS})
+    
+    @classmethod
+    def get(cls, scope_id):
+        """Totals for a scope (all zero if there is no feedback yet)"""
+        return db.session.get(cls, (scope_id, cls.TOTAL)) or cls._empty(scope_id)
+    
+    @classmethod
+    def for_user(cls, user_id):
+        """Per-user and global summaries in one primary-key query"""
+        rows = {row.scope_id: row for row in cls.query.filter(cls.scope_id.in_([user_id, cls.GLOBAL]), cls.kind == cls.TOTAL)}
+        return {
+            'user': (rows.get(user_id) or cls._empty(user_id)).summary(),
+            'global': (rows.get(cls.GLOBAL) or cls._empty(cls.GLOBAL)).summary(),
+        }
+    
+    @classmethod
+    def rebuild(cls):
+        """
+        Recompute the totals from ScheduleFeedback rows plus the archived aggregates
+        
+        Used to backfill after migration; must be followed by a commit.
+        """
+        cls.query.filter_by(kind=cls.TOTAL).delete()
+        FeedbackRollupAspect.query.filter_by(kind=cls.TOTAL).delete()
+        db.session.flush()
+        for archived in cls.query.filter_by(kind=cls.ARCHIVED).all():
+            cls._increment({'scope_id': archived.scope_id, 'kind': cls.TOTAL},
+                           {c: getattr(archived, c) for c in cls.COUNTERS})
+        for aspect in FeedbackRollupAspect.query.filter_by(kind=cls.ARCHIVED).all():
+            FeedbackRollupAspect._increment(
+                {'scope_id': aspect.scope_id, 'kind': cls.TOTAL, 'polarity': aspect.polarity, 'aspect': aspect.aspect},
+                {'count': aspect.count})
+        cls._add(cls.TOTAL, ScheduleFeedback.query.yield_per(1000))
+
+class FeedbackRollupAspect(_Counters, db.Model):
+    """How often an aspect was reported, per FeedbackRollup row and polarity"""
+    COUNTERS = ('count',)
+    
+    scope_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    kind = db.Column(db.String(10), primary_key=True)
+    polarity = db.Column(db.String(10), primary_key=True)  # 'positive' or 'negative'
+    aspect = db.Column(db.String(100), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
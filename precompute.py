@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Overnight Precomputation of Next-Day Schedules
+Generates tomorrow's schedule for every user with pending tasks during
+off-peak hours, so the morning rush of /api/ai_optimize requests is
+answered from the database (see _precomputed_schedule in app.py).
+
+Schedules come from the LLM only: the rule-based fallback is cheap to
+produce on demand, and a stored one would be served in the morning instead
+of an LLM schedule. Users are therefore skipped while Ollama is down and
+picked up by the next run. Schedules are stored with source 'precomputed'
+and never replace a schedule that already exists for the date, so an
+interrupted run resumes where it stopped and a user who generated their
+own schedule keeps it. Requests to the single Ollama host are spread out
+by a rate limit and a small worker pool.
+
+Run from cron at night:
+    python precompute.py [--date YYYY-MM-DD] [--workers 2] [--rate 6] [--stop-at 06:30] [--dry-run]
+"""
+
+import argparse
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import metrics
+from llm_config import PRECOMPUTE_CONFIG
+from models import db, Schedule, Task, User
+
+
+class RateLimiter:
+    """Space calls at least 60/per_minute seconds apart across threads"""
+
+    def __init__(self, per_minute: float):
+        self.interval = 60.0 / per_minute if per_minute else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+def pending_user_ids(date_obj) -> List[int]:
+    """Users with pending tasks and no schedule for the date yet"""
+    scheduled = db.session.query(Schedule.user_id).filter(Schedule.date == date_obj)
+    rows = db.session.query(Task.user_id).filter(Task.status == 'pending', ~Task.user_id.in_(scheduled)) \
+        .distinct().order_by(Task.user_id)
+    return [user_id for (user_id,) in rows]
+
+
+def precompute_user(app, user_id: int, date_obj, limiter: RateLimiter) -> str:
+    """
+    Generate and store one user's schedule
+
+    Returns:
+        str: 'llm' if a schedule was stored, 'unavailable' if Ollama is down
+            or produced no schedule, 'skipped' if a schedule appeared in the meantime
+    """
+    from app import _few_shot_examples, _llm_inputs, get_llm_service
+
+    with app.app_context():
+        llm_service = get_llm_service()
+        if not llm_service.check_ollama_status():
+            return 'unavailable'
+        user = db.session.get(User, user_id)
+        pending_tasks = Task.query.filter_by(user_id=user_id, status='pending').all()
+        user_profile, tasks_data = _llm_inputs(user, pending_tasks)
+        examples = _few_shot_examples(user_profile, tasks_data)
+        limiter.wait()
+        schedule_data = llm_service.generate_schedule(user_profile, tasks_data, '', examples,
+                                                      date_str=date_obj.isoformat())
+        if not schedule_data:
+            return 'unavailable'
+
+        # task_ids let the morning request check that the task list has not changed
+        if not Schedule.upsert(user_id, date_obj, schedule_data, 'precomputed', overwrite=False,
+                               task_ids=[task.id for task in pending_tasks]):
+            return 'skipped'
+        metrics.SCHEDULES.inc(source='precomputed')
+        return 'llm'
+
+
+def _deadline(stop_at: Optional[str]) -> Optional[datetime]:
+    """Next occurrence of HH:MM local time"""
+    if not stop_at:
+        return None
+    now = datetime.now()
+    hour, minute = (int(part) for part in stop_at.split(':'))
+    deadline = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    return deadline if deadline > now else deadline + timedelta(days=1)
+
+
+def run_precompute(app, date_str: str = None, workers: int = None, per_minute: float = None,
+                   stop_at: str = None, dry_run: bool = False) -> Dict:
+    """
+    Precompute schedules for all users that still need one
+
+    Args:
+        app: Flask app (each worker pushes its own app context)
+        date_str: Target date (default: tomorrow)
+        workers: Users generated concurrently
+        per_minute: Maximum schedule requests per minute to Ollama
+        stop_at: HH:MM after which no new users are started
+        dry_run: Only count the users that would be processed
+
+    Returns:
+        dict: Target date and counts per outcome
+    """
+    date_obj = datetime.strptime(date_str, "%Y-%m-%d").date() if date_str \
+        else (datetime.now() + timedelta(days=1)).date()
+    workers = workers or PRECOMPUTE_CONFIG['workers']
+    per_minute = PRECOMPUTE_CONFIG['requests_per_minute'] if per_minute is None else per_minute
+    deadline = _deadline(PRECOMPUTE_CONFIG['stop_at'] if stop_at is None else stop_at)
+
+    with app.app_context():
+        user_ids = pending_user_ids(date_obj)
+    result = {'date': date_obj.isoformat(), 'users': len(user_ids), 'llm': 0, 'unavailable': 0,
+              'skipped': 0, 'failed': 0, 'remaining': 0}
+    if dry_run:
+        return result
+    from app import get_llm_service
+    if user_ids and not get_llm_service().check_ollama_status():
+        # Nothing worth storing; the next run picks everyone up
+        result['unavailable'] = len(user_ids)
+        return result
+
+    limiter = RateLimiter(per_minute)
+    in_flight = set()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='precompute') as pool:
+        for i, user_id in enumerate(user_ids):
+            if deadline and datetime.now() >= deadline:
+                result['remaining'] = len(user_ids) - i
+                break
+            if len(in_flight) >= workers:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                _collect(done, result)
+            in_flight.add(pool.submit(precompute_user, app, user_id, date_obj, limiter))
+        _collect(wait(in_flight).done, result)
+    return result
+
+
+def _collect(futures, result: Dict):
+    for future in futures:
+        try:
+            result[future.result()] += 1
+        except Exception as e:
+            print(f"Error precomputing schedule: {e}")
+            result['failed'] += 1
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Precompute tomorrow's schedules for users with pending tasks")
+    parser.add_argument('--date', help='target date YYYY-MM-DD (default: tomorrow)')
+    parser.add_argument('--workers', type=int, help='users generated concurrently')
+    parser.add_argument('--rate', type=float, help='maximum schedule requests per minute to Ollama (0 = unlimited)')
+    parser.add_argument('--stop-at', help="HH:MM local time after which no new users are started ('' = never)")
+    parser.add_argument('--dry-run', action='store_true', help='only report how many users need a schedule')
+    args = parser.parse_args()
+
+    from app import app
+    result = run_precompute(app, args.date, args.workers, args.rate, args.stop_at, args.dry_run)
+    if args.dry_run:
+        print(f"🔍 {result['users']} users need a schedule for {result['date']}")
+    else:
+        print(f"✅ Precomputed schedules for {result['date']}: {result['llm']} LLM, "
+              f"{result['unavailable']} left for later (Ollama unavailable), "
+              f"{result['skipped']} skipped, {result['failed']} failed")
+        if result['remaining']:
+            print(f"⏸️  Stopped at the off-peak limit; {result['remaining']} users left for the next run")
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Opt-in Request Profiler
+Samples the call stack of individual requests and logs their SQL, then
+writes each profile to PROFILE_DIR in collapsed-stack format (one
+"frame;frame;frame count" line per stack) that flamegraph.pl, speedscope
+and inferno read directly. Profiling is off by default and is enabled
+either for every request (PROFILE_ALL_REQUESTS=1) or per request with a
+signed X-Profile header.
+
+Create a header value (valid for one hour) with:
+    PROFILER_SECRET=... python profiler.py token --ttl 3600
+"""
+
+import hashlib
+import hmac
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Dict, List, Optional
+
+from flask import g, has_request_context, request
+
+import metrics
+
+
+PROFILE_HEADER = 'X-Profile'
+
+
+def sign_token(secret: str, ttl: int = 3600) -> str:
+    """
+    Create an X-Profile header value
+
+    Args:
+        secret: PROFILER_SECRET of the target deployment
+        ttl: Seconds until the token expires
+
+    Returns:
+        str: '<expiry>.<hex HMAC-SHA256 of expiry>'
+    """
+    expires = str(int(time.time()) + ttl)
+    return f"{expires}.{hmac.new(secret.encode(), expires.encode(), hashlib.sha256).hexdigest()}"
+
+
+def verify_token(secret: str, token: Optional[str]) -> bool:
+    """True if the token was signed with secret and has not expired"""
+    if not secret or not token or '.' not in token:
+        return False
+    expires, signature = token.split('.', 1)
+    expected = hmac.new(secret.encode(), expires.encode(), hashlib.sha256).hexdigest()
+    return hmac.compare_digest(signature, expected) and expires.isdigit() and int(expires) >= time.time()
+
+
+class StackSampler:
+    """Periodically sample one thread's call stack and count collapsed stacks"""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profiler-sampler', daemon=True)
+
+    def start(self) -> 'StackSampler':
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        """Samples in collapsed-stack (folded) format"""
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class ProfileStore:
+    """Profiles on disk: <id>.folded stacks plus <id>.json metadata and SQL log"""
+
+    def __init__(self, directory: str, max_profiles: int = 200):
+        self.directory = directory
+        self.max_profiles = max_profiles
+
+    def _path(self, profile_id: str, suffix: str) -> str:
+        # Ids are generated here (uuid hex); reject anything else to avoid traversal
+        if not profile_id.isalnum():
+            raise ValueError("Invalid profile id")
+        return os.path.join(self.directory, f"{profile_id}{suffix}")
+
+    def save(self, meta: Dict, collapsed: str):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path(meta['id'], '.folded'), 'w') as f:
+            f.write(collapsed)
+        with open(self._path(meta['id'], '.json'), 'w') as f:
+            json.dump(meta, f)
+        self._prune()
+
+    def _prune(self):
+        metas = sorted(self._meta_files(), key=os.path.getmtime)
+        for path in metas[:max(0, len(metas) - self.max_profiles)]:
+            for suffix in ('.json', '.folded'):
+                try:
+                    os.remove(path[:-len('.json')] + suffix)
+                except OSError:
+                    pass
+
+    def _meta_files(self) -> List[str]:
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+        return [os.path.join(self.directory, name) for name in names if name.endswith('.json')]
+
+    def slowest(self, limit: int = 50) -> List[Dict]:
+        """Metadata of stored profiles, slowest first"""
+        metas = []
+        for path in self._meta_files():
+            try:
+                with open(path) as f:
+                    metas.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return sorted(metas, key=lambda meta: meta['duration_ms'], reverse=True)[:limit]
+
+    def get(self, profile_id: str) -> Optional[Dict]:
+        """Metadata and SQL log of one profile"""
+        data = self.load(profile_id, '.json')
+        return json.loads(data) if data else None
+
+    def load(self, profile_id: str, suffix: str) -> Optional[str]:
+        try:
+            with open(self._path(profile_id, suffix)) as f:
+                return f.read()
+        except (OSError, ValueError):
+            return None
+
+
+def _record_query(statement: str, seconds: float):
+    profile = g.get('profile') if has_request_context() else None
+    if profile is not None:
+        profile['queries'].append({'sql': statement, 'ms': round(seconds * 1000, 3)})
+
+
+def _should_profile(app) -> bool:
+    if app.config['PROFILE_ALL_REQUESTS']:
+        return True
+    token = request.headers.get(PROFILE_HEADER)
+    return token is not None and verify_token(app.config['PROFILER_SECRET'], token)
+
+
+def init_app(app):
+    """
+    Install the profiler hooks
+
+    Config (defaults from the environment):
+        PROFILE_ALL_REQUESTS: Profile every request (default off)
+        PROFILER_SECRET: Secret for signed X-Profile headers (unset = header disabled)
+        PROFILE_DIR: Where profiles are written (default instance/profiles)
+        PROFILE_SAMPLE_INTERVAL: Seconds between stack samples (default 0.005)
+        PROFILE_MAX_FILES: Profiles kept on disk (default 200)
+    """
+    app.config.setdefault('PROFILE_ALL_REQUESTS', os.environ.get('PROFILE_ALL_REQUESTS') == '1')
+    app.config.setdefault('PROFILER_SECRET', os.environ.get('PROFILER_SECRET', ''))
+    app.config.setdefault('PROFILE_DIR', os.environ.get('PROFILE_DIR', os.path.join(app.instance_path, 'profiles')))
+    app.config.setdefault('PROFILE_SAMPLE_INTERVAL', float(os.environ.get('PROFILE_SAMPLE_INTERVAL', '0.005')))
+    app.config.setdefault('PROFILE_MAX_FILES', int(os.environ.get('PROFILE_MAX_FILES', '200')))
+    app.extensions['profile_store'] = ProfileStore(app.config['PROFILE_DIR'], app.config['PROFILE_MAX_FILES'])
+    metrics.add_query_hook(_record_query)
+
+    @app.before_request
+    def start_profile():
+        if not _should_profile(app):
+            return
+        g.profile = {
+            'id': uuid.uuid4().hex,
+            'started': time.perf_counter(),
+            'queries': [],
+            'sampler': StackSampler(threading.get_ident(), app.config['PROFILE_SAMPLE_INTERVAL']).start(),
+        }
+
+    @app.after_request
+    def tag_profile(response):
+        profile = g.get('profile')
+        if profile is not None:
+            profile['status'] = response.status_code
+            response.headers[PROFILE_HEADER + '-Id'] = profile['id']
+        return response
+
+    @app.teardown_request
+    def finish_profile(exc):
+        profile = g.pop('profile', None)
+        if profile is None:
+            return
+        profile['sampler'].stop()
+        meta = {
+            'id': profile['id'],
+            'method': request.method,
+            'path': request.full_path.rstrip('?'),
+            'route': metrics.route_label(),
+            'status': profile.get('status', 500),
+            'duration_ms': round((time.perf_counter() - profile['started']) * 1000, 2),
+            'samples': sum(profile['sampler'].stacks.values()),
+            'query_count': len(profile['queries']),
+            'query_ms': round(sum(q['ms'] for q in profile['queries']), 2),
+            'queries': profile['queries'],
+            'recorded_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        try:
+            app.extensions['profile_store'].save(meta, profile['sampler'].collapsed())
+        except OSError as e:
+            print(f"Could not save request profile: {e}")
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Request profiler utilities')
+    subcommands = parser.add_subparsers(dest='command', required=True)
+    token_parser = subcommands.add_parser('token', help='print a signed X-Profile header value')
+    token_parser.add_argument('--ttl', type=int, default=3600, help='seconds until the token expires')
+    args = parser.parse_args()
+
+    secret = os.environ.get('PROFILER_SECRET')
+    if not secret:
+        parser.error('PROFILER_SECRET is not set')
+    print(f"{PROFILE_HEADER}: {sign_token(secret, args.ttl)}")
@@ -0,0 +1,137 @@
+"""
+Template Fragment Caching and Precompilation
+Expensive blocks of the page templates (task lists, the schedule timeline,
+the profile form) are wrapped in
+
+    {% call cached_fragment('task_list', tasks.version) %} ... {% endcall %}
+
+and their rendered HTML is reused while the current user and the given
+version are unchanged. Versions are derived from the rows a route already
+loaded (see rows_version), so a change made by another process or by a
+bulk UPDATE is picked up without any invalidation step. Only wrap markup
+that depends solely on the key: no flashed messages or per-request tokens.
+
+Templates are compiled once at startup instead of on the first request
+that uses them, and the compiled code is kept in a bytecode cache on disk
+so the next process start skips Jinja's parser and code generator.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable, Iterable
+
+from flask import current_app
+from flask_login import current_user
+from jinja2 import FileSystemBytecodeCache
+from markupsafe import Markup
+
+import metrics
+
+TASK_VERSION_FIELDS = ('id', 'status', 'description', 'priority', 'duration', 'type', 'preferences',
+                       'added_date', 'completed_date')
+
+
+class FragmentCache:
+    """Thread-safe LRU of rendered fragments"""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable):
+        with self._lock:
+            html = self._entries.get(key)
+            if html is not None:
+                self._entries.move_to_end(key)
+            return html
+
+    def set(self, key: Hashable, html: Markup):
+        with self._lock:
+            self._entries[key] = html
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def rows_version(rows: Iterable, fields: Iterable[str] = TASK_VERSION_FIELDS) -> tuple:
+    """Version of a list of ORM rows: the values of the fields a fragment shows"""
+    return tuple(tuple(getattr(row, field) for field in fields) for row in rows)
+
+
+def cached_fragment(name: str, *version, caller):
+    """
+    Jinja call block rendering its body once per (user, name, version)
+
+    Args:
+        name: Fragment name, unique across templates
+        version: Values the fragment's output depends on besides the user
+        caller: Body of the call block (passed by Jinja)
+    """
+    cache = current_app.extensions.get('fragment_cache')
+    if cache is None or current_app.debug:
+        # Edited templates are reloaded in debug mode; their cached output would not be
+        return caller()
+    key = (name, current_user.get_id(), version)
+    html = cache.get(key)
+    if html is None:
+        metrics.FRAGMENT_CACHE.inc(fragment=name, result='miss')
+        html = Markup(caller())
+        cache.set(key, html)
+    else:
+        metrics.FRAGMENT_CACHE.inc(fragment=name, result='hit')
+    return html
+
+
+def precompile_templates(app) -> int:
+    """
+    Load every template so it is compiled before the first request
+
+    Returns:
+        int: Number of templates compiled
+    """
+    started = time.perf_counter()
+    names = [name for name in app.jinja_env.list_templates() if name.endswith('.html')]
+    for name in names:
+        app.jinja_env.get_template(name)
+    metrics.record_startup('compile templates', time.perf_counter() - started)
+    return len(names)
+
+
+def init_app(app):
+    """
+    Install the fragment cache and template compilation
+
+    Config (defaults from the environment):
+        FRAGMENT_CACHE_SIZE: Rendered fragments kept per process (0 disables the cache; default 512)
+        TEMPLATE_BYTECODE_DIR: Where compiled templates are kept (default instance/jinja_cache)
+        PRECOMPILE_TEMPLATES: Compile all templates at startup (default on, except on Vercel where
+            every cold start would pay for templates the request may not use)
+    """
+    app.config.setdefault('FRAGMENT_CACHE_SIZE', int(os.environ.get('FRAGMENT_CACHE_SIZE', '512')))
+    default_dir = '/tmp/jinja_cache' if os.environ.get('VERCEL') else os.path.join(app.instance_path, 'jinja_cache')
+    app.config.setdefault('TEMPLATE_BYTECODE_DIR', os.environ.get('TEMPLATE_BYTECODE_DIR', default_dir))
+    app.config.setdefault('PRECOMPILE_TEMPLATES',
+                          os.environ.get('PRECOMPILE_TEMPLATES', '0' if os.environ.get('VERCEL') else '1') == '1')
+
+    if app.config['FRAGMENT_CACHE_SIZE'] > 0:
+        app.extensions['fragment_cache'] = FragmentCache(app.config['FRAGMENT_CACHE_SIZE'])
+    app.jinja_env.globals['cached_fragment'] = cached_fragment
+
+    try:
+        os.makedirs(app.config['TEMPLATE_BYTECODE_DIR'], exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(app.config['TEMPLATE_BYTECODE_DIR'])
+    except OSError as e:
+        print(f"Template bytecode cache disabled: {e}")
+
+    if app.config['PRECOMPILE_TEMPLATES']:
+        precompile_templates(app)
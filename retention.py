@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Retention for Old Schedules and Feedback
+Moves schedules older than the hot window (RETENTION_CONFIG['hot_days'])
+into ScheduleArchive and deletes their ScheduleFeedback rows, keeping
+their aggregates as FeedbackRollup ARCHIVED rows (the totals already
+include them). Work is done in small batches, each in its own
+short transaction, so the database is never locked for long; an
+interrupted run simply resumes where it stopped.
+
+Run periodically (e.g. from a nightly cron job):
+    python retention.py [--days 90] [--batch-size 200] [--dry-run]
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta
+from typing import Dict
+
+from llm_config import RETENTION_CONFIG
+from models import db, Schedule, ScheduleArchive, ScheduleFeedback, FeedbackRollup
+from schedule_codec import encode_schedule
+
+
+def archive_batch(cutoff, batch_size: int) -> int:
+    """
+    Archive one batch of schedules dated before the cutoff
+
+    Args:
+        cutoff: Schedules with an earlier date are archived
+        batch_size: Maximum number of schedules in this transaction
+
+    Returns:
+        int: Number of schedules archived (0 when nothing is left)
+    """
+    schedules = Schedule.query.filter(Schedule.date < cutoff).order_by(Schedule.id).limit(batch_size).all()
+    if not schedules:
+        return 0
+    ids = [schedule.id for schedule in schedules]
+
+    for schedule in schedules:
+        db.session.add(ScheduleArchive(
+            schedule_id=schedule.id,
+            user_id=schedule.user_id,
+            date=schedule.date,
+            schedule_blob=schedule.schedule_blob or encode_schedule(schedule.schedule_data or {}),
+            source=schedule.source,
+            quality_score=schedule.quality_score,
+            user_rating=schedule.user_rating,
+            user_feedback=schedule.user_feedback,
+            created_at=schedule.created_at,
+            generated_at=schedule.generated_at,
+        ))
+
+    feedback_rows = ScheduleFeedback.query.filter(ScheduleFeedback.schedule_id.in_(ids)).all()
+    if feedback_rows:
+        FeedbackRollup.archive(feedback_rows)
+        ScheduleFeedback.query.filter(ScheduleFeedback.schedule_id.in_(ids)).delete(synchronize_session=False)
+
+    Schedule.query.filter(Schedule.id.in_(ids)).delete(synchronize_session=False)
+    db.session.commit()
+    return len(ids)
+
+
+def run_retention(days: int = None, batch_size: int = None, max_batches: int = None, dry_run: bool = False) -> Dict:
+    """
+    Archive schedules outside the hot window. Must run inside an app context.
+
+    Args:
+        days: Days of schedules to keep hot (default: RETENTION_CONFIG)
+        batch_size: Schedules per transaction (default: RETENTION_CONFIG)
+        max_batches: Batches before stopping; the next run resumes
+        dry_run: Only count what would be archived
+
+    Returns:
+        Dict with the cutoff date and number of schedules archived (or pending)
+    """
+    days = days if days is not None else RETENTION_CONFIG['hot_days']
+    batch_size = batch_size or RETENTION_CONFIG['batch_size']
+    max_batches = max_batches if max_batches is not None else RETENTION_CONFIG['max_batches_per_run']
+    cutoff = (datetime.utcnow() - timedelta(days=days)).date()
+
+    if dry_run:
+        return {'cutoff': cutoff.isoformat(), 'pending': Schedule.query.filter(Schedule.date < cutoff).count()}
+
+    archived = batches = 0
+    while max_batches is None or batches < max_batches:
+        count = archive_batch(cutoff, batch_size)
+        if not count:
+            break
+        archived += count
+        batches += 1
+        time.sleep(RETENTION_CONFIG['batch_pause_seconds'])
+    return {'cutoff': cutoff.isoformat(), 'archived': archived, 'batches': batches}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Archive old schedules and roll up their feedback')
+    parser.add_argument('--days', type=int, help='days of schedules to keep in the hot table')
+    parser.add_argument('--batch-size', type=int, help='schedules archived per transaction')
+    parser.add_argument('--max-batches', type=int, help='stop after this many batches')
+    parser.add_argument('--dry-run', action='store_true', help='only report how many schedules would be archived')
+    args = parser.parse_args()
+
+    from app import app
+    with app.app_context():
+        result = run_retention(args.days, args.batch_size, args.max_batches, args.dry_run)
+    if args.dry_run:
+        print(f"🔍 {result['pending']} schedules dated before {result['cutoff']} would be archived")
+    else:
+        print(f"✅ Archived {result['archived']} schedules dated before {result['cutoff']} in {result['batches']} batches")
@@ -0,0 +1,131 @@
+"""
+Compact Binary Encoding for Stored Schedules
+This module packs schedule JSON into a small binary blob: item types,
+priorities and flexibility values are interned into a string table,
+"7:00 AM - 7:30 AM" ranges become pairs of minute offsets, and the
+result is compressed with zstd (if installed) or zlib. Encoding is
+lossless - values that would not round-trip exactly are stored as-is.
+"""
+
+import json
+import zlib
+from typing import Dict, List, Tuple
+
+from time_utils import format_range, parse_range
+
+try:
+    import zstandard  # Optional: better ratio and faster decode than zlib
+except ImportError:
+    zstandard = None
+
+
+MAGIC = b'SCB1'
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+
+# Item fields stored positionally; anything else goes into an extras dict
+_TEXT_FIELDS = ('task', 'reason')
+_INTERNED_FIELDS = ('type', 'priority', 'flexibility')
+_KNOWN_FIELDS = ('time',) + _TEXT_FIELDS + _INTERNED_FIELDS
+
+
+def _encode_time(value: str) -> Tuple:
+    """Encode a time range as (start, end) minutes, or (raw string, None)"""
+    parsed = parse_range(value)
+    if parsed is not None and format_range(*parsed) == value:
+        return parsed
+    return value, None
+
+
+def _decode_time(start, end) -> str:
+    return start if end is None else format_range(start, end)
+
+
+def _pack_item(item: Dict, strings: List[str], index: Dict[str, int]) -> List:
+    extras = {k: v for k, v in item.items() if k not in _KNOWN_FIELDS or not isinstance(v, str)}
+
+    def intern(value: str) -> int:
+        if value not in index:
+            index[value] = len(strings)
+            strings.append(value)
+        return index[value]
+
+    time_value = item.get('time')
+    start, end = _encode_time(time_value) if 'time' not in extras and time_value is not None else (None, None)
+    packed = [start, end]
+    packed += [item[f] if f in item and f not in extras else None for f in _TEXT_FIELDS]
+    packed += [intern(item[f]) if f in item and f not in extras else -1 for f in _INTERNED_FIELDS]
+    if extras:
+        packed.append(extras)
+    return packed
+
+
+def _unpack_item(packed: List, strings: List[str]) -> Dict:
+    item = {}
+    start, end = packed[0], packed[1]
+    if start is not None:
+        item['time'] = _decode_time(start, end)
+    for offset, field in enumerate(_TEXT_FIELDS, 2):
+        if packed[offset] is not None:
+            item[field] = packed[offset]
+    for offset, field in enumerate(_INTERNED_FIELDS, 2 + len(_TEXT_FIELDS)):
+        if packed[offset] != -1:
+            item[field] = strings[packed[offset]]
+    if len(packed) > 2 + len(_TEXT_FIELDS) + len(_INTERNED_FIELDS):
+        item.update(packed[-1])
+    return item
+
+
+def encode_schedule(schedule_data: Dict, level: int = 6) -> bytes:
+    """
+    Encode schedule JSON into the compact binary format
+
+    Args:
+        schedule_data: Schedule dictionary as produced by the generators
+        level: Compression level
+
+    Returns:
+        bytes: MAGIC + codec byte + compressed payload
+    """
+    strings: List[str] = []
+    index: Dict[str, int] = {}
+    items = schedule_data.get('schedule')
+    payload = {'m': {k: v for k, v in schedule_data.items() if k != 'schedule'}}
+    if isinstance(items, list) and all(isinstance(item, dict) for item in items):
+        payload['i'] = [_pack_item(item, strings, index) for item in items]
+        payload['s'] = strings
+    elif 'schedule' in schedule_data:
+        payload['m']['schedule'] = items
+
+    raw = json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    if zstandard is not None:
+        return MAGIC + bytes([CODEC_ZSTD]) + zstandard.ZstdCompressor(level=level).compress(raw)
+    return MAGIC + bytes([CODEC_ZLIB]) + zlib.compress(raw, level)
+
+
+def decode_schedule(blob: bytes) -> Dict:
+    """
+    Decode a blob produced by encode_schedule
+
+    Raises:
+        ValueError: If the blob is not in a supported format
+    """
+    blob = bytes(blob)
+    if blob[:len(MAGIC)] != MAGIC:
+        raise ValueError("Not a compact schedule blob")
+    codec, body = blob[len(MAGIC)], blob[len(MAGIC) + 1:]
+    if codec == CODEC_ZLIB:
+        raw = zlib.decompress(body)
+    elif codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise ValueError("Schedule was stored with zstd; install the 'zstandard' package")
+        raw = zstandard.ZstdDecompressor().decompress(body)
+    else:
+        raise ValueError(f"Unknown schedule codec {codec}")
+
+    payload = json.loads(raw)
+    schedule_data = {}
+    if 'i' in payload:
+        schedule_data['schedule'] = [_unpack_item(packed, payload['s']) for packed in payload['i']]
+    schedule_data.update(payload['m'])
+    return schedule_data
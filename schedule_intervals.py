@@ -0,0 +1,196 @@
+"""
+Interval Checks for Schedules
+Turns schedule blocks into minute intervals and finds, with sorted sweeps
+(O(n log n) plus the number of reported conflicts):
+
+- overlaps: pairs of blocks that double-book the same time
+- gaps: long unplanned stretches of the waking day
+- commitment conflicts: blocks that collide with the class/work hours of
+  the day (weekly_schedule) or with sleep
+
+Results are plain dicts so they can be stored with the schedule and
+returned by the API.
+"""
+
+import heapq
+import json
+from collections import namedtuple
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from llm_config import VALIDATION_CONFIG
+from time_utils import MINUTES_PER_DAY, format_range, parse_clock, parse_range
+
+Interval = namedtuple('Interval', 'start end index label')
+
+
+def schedule_intervals(items: List[Dict]):
+    """
+    Parse schedule items into intervals sorted by start
+
+    A block whose end is before its start runs past midnight and is
+    extended into the next day.
+
+    Returns:
+        tuple: (sorted intervals, indexes of items without a parseable time)
+    """
+    intervals, unparsed = [], []
+    for index, item in enumerate(items):
+        parsed = parse_range(item.get('time', ''))
+        if parsed is None:
+            unparsed.append(index)
+            continue
+        start, end = parsed
+        if end <= start:
+            end += MINUTES_PER_DAY
+        intervals.append(Interval(start, end, index, item.get('task', '')))
+    intervals.sort()
+    return intervals, unparsed
+
+
+def find_overlaps(intervals: List[Interval]) -> List[Dict]:
+    """Every pair of overlapping intervals (input sorted by start)"""
+    overlaps = []
+    active = []  # Heap of (end, interval) for intervals still open at the sweep position
+    for current in intervals:
+        while active and active[0][0] <= current.start:
+            heapq.heappop(active)
+        for _, other in active:
+            end = min(other.end, current.end)
+            overlaps.append({
+                'items': [other.index, current.index],
+                'tasks': [other.label, current.label],
+                'time': format_range(current.start, end),
+                'minutes': end - current.start,
+            })
+        heapq.heappush(active, (current.end, current))
+    return overlaps
+
+
+def find_gaps(intervals: List[Interval], day_start: int, day_end: int, min_minutes: int) -> List[Dict]:
+    """Unplanned stretches of at least min_minutes between day_start and day_end"""
+    gaps = []
+    cursor = day_start
+    for interval in intervals:
+        if interval.start - cursor >= min_minutes:
+            gaps.append({'time': format_range(cursor, interval.start), 'minutes': interval.start - cursor})
+        cursor = max(cursor, interval.end)
+        if cursor >= day_end:
+            break
+    if day_end - cursor >= min_minutes:
+        gaps.append({'time': format_range(cursor, day_end), 'minutes': day_end - cursor})
+    return gaps
+
+
+def find_commitment_conflicts(intervals: List[Interval], commitments: List[Interval],
+                              items: List[Dict], exempt_types) -> List[Dict]:
+    """
+    Blocks overlapping a fixed commitment (both inputs sorted by start)
+
+    Blocks that are the commitment itself (type in exempt_types, e.g. the
+    'college' block during college hours) do not count.
+    """
+    conflicts = []
+    j = 0
+    for interval in intervals:
+        if str(items[interval.index].get('type', '')).lower() in exempt_types:
+            continue
+        # Commitments ending before this block can't touch later blocks either
+        while j < len(commitments) and commitments[j].end <= interval.start:
+            j += 1
+        k = j
+        while k < len(commitments) and commitments[k].start < interval.end:
+            commitment = commitments[k]
+            start, end = max(interval.start, commitment.start), min(interval.end, commitment.end)
+            if end > start:
+                conflicts.append({
+                    'item': interval.index,
+                    'task': interval.label,
+                    'commitment': commitment.label,
+                    'time': format_range(start, end),
+                    'minutes': end - start,
+                })
+            k += 1
+    return conflicts
+
+
+def _sleep_schedule(user_profile: Dict) -> Dict:
+    sleep_schedule = user_profile.get('sleep_schedule') or {}
+    if isinstance(sleep_schedule, str):
+        try:
+            sleep_schedule = json.loads(sleep_schedule)
+        except ValueError:
+            sleep_schedule = {}
+    return sleep_schedule if isinstance(sleep_schedule, dict) else {}
+
+
+def profile_commitments(user_profile: Dict, date_str: Optional[str]) -> List[Interval]:
+    """Sleep and the class/work hours of the date's weekday, sorted by start"""
+    commitments = []
+    sleep_schedule = _sleep_schedule(user_profile)
+    wake, bedtime = parse_clock(sleep_schedule.get('wake_time')), parse_clock(sleep_schedule.get('bedtime'))
+    if wake is not None and bedtime is not None:
+        if bedtime > wake:
+            commitments.append(Interval(0, wake, -1, 'sleep'))
+            commitments.append(Interval(bedtime, MINUTES_PER_DAY + wake, -1, 'sleep'))
+        else:
+            # Bedtime after midnight
+            commitments.append(Interval(bedtime, wake, -1, 'sleep'))
+
+    weekly_schedule = user_profile.get('weekly_schedule') or {}
+    if isinstance(weekly_schedule, str):
+        try:
+            weekly_schedule = json.loads(weekly_schedule)
+        except ValueError:
+            weekly_schedule = {}
+    if date_str and isinstance(weekly_schedule, dict):
+        weekday = datetime.strptime(date_str, "%Y-%m-%d").strftime("%A").lower()
+        for day, hours in weekly_schedule.items():
+            if day.strip().lower() != weekday or not isinstance(hours, dict):
+                continue
+            start, end = parse_clock(hours.get('start')), parse_clock(hours.get('end'))
+            if start is not None and end is not None and end > start:
+                commitments.append(Interval(start, end, -1, hours.get('type') or 'college/work'))
+    commitments.sort()
+    return commitments
+
+
+def diagnose_schedule(items: List[Dict], user_profile: Dict, date_str: str = None) -> Dict:
+    """
+    Find overlaps, gaps and commitment conflicts in schedule blocks
+
+    Args:
+        items: schedule_data['schedule']
+        user_profile: Profile with sleep_schedule and weekly_schedule
+        date_str: Schedule date, selecting the weekday's commitments
+
+    Returns:
+        dict: overlaps, gaps, commitment_conflicts and unparsed item indexes
+    """
+    config = VALIDATION_CONFIG['conflicts']
+    intervals, unparsed = schedule_intervals(items)
+
+    sleep_schedule = _sleep_schedule(user_profile)
+    day_start = parse_clock(sleep_schedule.get('wake_time'))
+    day_end = parse_clock(sleep_schedule.get('bedtime'))
+    if day_start is None or day_end is None or day_end <= day_start:
+        # Without a usable waking window only report gaps between planned blocks
+        day_start = intervals[0].start if intervals else 0
+        day_end = max((i.end for i in intervals), default=0)
+
+    return {
+        'overlaps': find_overlaps(intervals),
+        'gaps': find_gaps(intervals, day_start, day_end, config['min_gap_minutes']),
+        'commitment_conflicts': find_commitment_conflicts(
+            intervals, profile_commitments(user_profile, date_str), items, set(config['commitment_types'])),
+        'unparsed': unparsed,
+    }
+
+
+def realism_penalty(diagnostics: Dict) -> int:
+    """Realism points to subtract for the diagnosed problems"""
+    config = VALIDATION_CONFIG['conflicts']
+    penalty = (config['overlap_penalty'] * len(diagnostics['overlaps'])
+               + config['commitment_penalty'] * len(diagnostics['commitment_conflicts'])
+               + config['gap_penalty'] * len(diagnostics['gaps']))
+    return min(config['max_penalty'], penalty)
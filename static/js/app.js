@@ -0,0 +1,108 @@
+(function(){
+  const panel = document.getElementById('aiPanel');
+  const openBtn = document.getElementById('openAiOptimizer');
+  const runBtn = document.getElementById('runAiOptimizer');
+  const promptEl = document.getElementById('aiPrompt');
+  const closeBtn = document.getElementById('closeAiPanel');
+  const chatMessages = document.getElementById('chatMessages');
+
+  function openPanel(){ 
+      panel.classList.add('open'); 
+      promptEl.focus(); 
+      // Scroll to bottom
+      chatMessages.scrollTop = chatMessages.scrollHeight;
+  }
+
+  function closePanel(){ panel.classList.remove('open'); }
+
+  if(openBtn){ openBtn.addEventListener('click', openPanel); }
+  if(closeBtn){ closeBtn.addEventListener('click', closePanel); }
+
+  // Auto-resize textarea
+  promptEl.addEventListener('input', function() {
+      this.style.height = 'auto';
+      this.style.height = (this.scrollHeight) + 'px';
+      if(this.value === '') this.style.height = 'auto';
+  });
+
+  // Handle Enter key
+  promptEl.addEventListener('keydown', function(e){ 
+      if(e.key === 'Escape') closePanel(); 
+      if(e.key === 'Enter' && !e.shiftKey) {
+          e.preventDefault();
+          runBtn.click();
+      }
+  });
+
+  function appendMessage(text, type) {
+      const msgDiv = document.createElement('div');
+      msgDiv.className = `message ${type} fade-in`;
+      msgDiv.innerHTML = text; // Allow HTML for links/formatting
+      chatMessages.appendChild(msgDiv);
+      chatMessages.scrollTop = chatMessages.scrollHeight;
+  }
+
+  function showTyping() {
+      const typingDiv = document.createElement('div');
+      typingDiv.className = 'typing-indicator fade-in';
+      typingDiv.id = 'typingIndicator';
+      typingDiv.innerHTML = `
+          <div class="typing-dot"></div>
+          <div class="typing-dot"></div>
+          <div class="typing-dot"></div>
+      `;
+      chatMessages.appendChild(typingDiv);
+      chatMessages.scrollTop = chatMessages.scrollHeight;
+  }
+
+  function removeTyping() {
+      const typingIndicator = document.getElementById('typingIndicator');
+      if(typingIndicator) typingIndicator.remove();
+  }
+
+  if(runBtn){
+    runBtn.addEventListener('click', function(){
+      const promptText = promptEl.value.trim();
+      if(!promptText) return;
+
+      // Add user message
+      appendMessage(promptText.replace(/\n/g, '<br>'), 'user');
+      promptEl.value = '';
+      promptEl.style.height = 'auto';
+
+      // Show typing indicator
+      showTyping();
+      runBtn.disabled = true;
+
+      // Send to general AI chat API instead of schedule API
+      $.ajax({
+        url: '/api/ai_chat',
+        method: 'POST',
+        contentType: 'application/json',
+        data: JSON.stringify({ message: promptText }),
+        success: function(response){
+          removeTyping();
+          runBtn.disabled = false;
+
+          // Display AI response
+          if (response.response) {
+            appendMessage(response.response, 'ai');
+          } else {
+            appendMessage('Sorry, I encountered an issue processing your request.', 'ai');
+          }
+        },
+        error: function(xhr){
+          removeTyping();
+          runBtn.disabled = false;
+          let msg = 'Sorry, I encountered an error while processing your request.';
+          try { 
+            if (xhr.responseJSON && xhr.responseJSON.message) {
+              msg = xhr.responseJSON.message;
+            }
+          } catch(e){}
+          appendMessage(msg, 'ai');
+        }
+      });
+    });
+  }
+})();
@@ -0,0 +1,147 @@
+function generateSchedule() {
+    // Show percentage progress instead of loading line
+    const btn = $('.btn-success');
+    const originalText = btn.html();
+    btn.prop('disabled', true);
+
+    // Create progress bar
+    btn.html(`
+        <div class="d-flex align-items-center">
+            <div class="progress flex-grow-1 me-2" style="height: 5px;">
+                <div class="progress-bar progress-bar-striped progress-bar-animated" role="progressbar" style="width: 0%"></div>
+            </div>
+            <span class="progress-text">0%</span>
+        </div>
+    `);
+
+    // Simulate progress
+    let progress = 0;
+    const interval = setInterval(() => {
+        progress += Math.floor(Math.random() * 10) + 5;
+        if (progress >= 100) {
+            progress = 100;
+            clearInterval(interval);
+        }
+
+        $('.progress-bar').css('width', progress + '%');
+        $('.progress-text').text(progress + '%');
+    }, 200);
+
+    $.ajax({
+        url: '/api/schedule',
+        method: 'POST',
+        contentType: 'application/json',
+        data: JSON.stringify({}),
+        success: function(response) {
+            clearInterval(interval);
+            btn.html(originalText);
+            btn.prop('disabled', false);
+            showNotification('Schedule generated successfully!', 'success');
+            setTimeout(() => {
+                window.location.href = '/schedule';
+            }, 1500);
+        },
+        error: function(xhr) {
+            clearInterval(interval);
+            btn.html(originalText);
+            btn.prop('disabled', false);
+
+            // Handle different error responses
+            if (xhr.responseJSON && xhr.responseJSON.error) {
+                if (xhr.responseJSON.error === "Profile incomplete") {
+                    showNotification('Please complete your profile first. Go to Profile section to add your wake up and sleep times.', 'error');
+                } else if (xhr.responseJSON.error === "No tasks") {
+                    showNotification('Please add some tasks first. Go to Tasks section to add your pending tasks.', 'error');
+                } else {
+                    showNotification(xhr.responseJSON.message || 'Error generating schedule', 'error');
+                }
+            } else {
+                showNotification('Error generating schedule', 'error');
+            }
+        }
+    });
+}
+
+function completeTask(index) {
+    // Show percentage progress for task completion
+    const btn = $('.complete-task-btn').eq(index);
+    const originalText = btn.html();
+    btn.prop('disabled', true);
+
+    // Create progress bar
+    btn.html(`
+        <div class="d-flex align-items-center">
+            <div class="progress flex-grow-1 me-2" style="height: 3px;">
+                <div class="progress-bar progress-bar-striped progress-bar-animated" role="progressbar" style="width: 0%"></div>
+            </div>
+        </div>
+    `);
+
+    // Simulate progress
+    let progress = 0;
+    const interval = setInterval(() => {
+        progress += Math.floor(Math.random() * 20) + 10;
+        if (progress >= 100) {
+            progress = 100;
+            clearInterval(interval);
+        }
+
+        $('.complete-task-btn .progress-bar').css('width', progress + '%');
+    }, 100);
+
+    const data = {
+        action: 'complete',
+        index: index
+    };
+
+    $.ajax({
+        url: '/api/tasks',
+        method: 'POST',
+        contentType: 'application/json',
+        data: JSON.stringify(data),
+        success: function(response) {
+            clearInterval(interval);
+            showNotification('Task completed successfully!', 'success');
+            setTimeout(() => {
+                location.reload();
+            }, 1500);
+        },
+        error: function() {
+            clearInterval(interval);
+            btn.html(originalText);
+            btn.prop('disabled', false);
+            showNotification('Error completing task', 'error');
+        }
+    });
+}
+
+function showNotification(message, type) {
+    // Create notification element
+    const notification = $(`
+        <div class="notification alert alert-${type === 'success' ? 'success' : 'danger'} position-fixed" style="top: 20px; right: 20px; z-index: 9999;">
+            ${message}
+        </div>
+    `);
+
+    // Add to body
+    $('body').append(notification);
+
+    // Remove after 3 seconds
+    setTimeout(() => {
+        notification.fadeOut(() => {
+            notification.remove();
+        });
+    }, 3000);
+}
+
+// Add hover effects to cards
+$(document).ready(function() {
+    $('.card').hover(
+        function() {
+            $(this).css('transform', 'translateY(-5px)');
+        },
+        function() {
+            $(this).css('transform', 'translateY(0)');
+        }
+    );
+});
@@ -0,0 +1,129 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Add schedule row
+    document.getElementById('addScheduleRow').addEventListener('click', function() {
+        const scheduleContainer = document.getElementById('weeklySchedule');
+        const newRow = document.createElement('div');
+        newRow.className = 'row schedule-row mb-2 animated fadeIn';
+        newRow.innerHTML = `
+            <div class="col-md-4">
+                <input type="text" class="form-control" name="schedule_day[]" placeholder="Day (e.g., Monday)">
+            </div>
+            <div class="col-md-4">
+                <input type="text" class="form-control" name="schedule_start[]" placeholder="Start Time">
+            </div>
+            <div class="col-md-4">
+                <div class="input-group">
+                    <input type="text" class="form-control" name="schedule_end[]" placeholder="End Time">
+                    <button class="btn btn-outline-danger remove-schedule" type="button"><i class="fas fa-trash"></i></button>
+                </div>
+            </div>
+        `;
+        scheduleContainer.appendChild(newRow);
+    });
+
+    // Remove schedule row with animation
+    document.getElementById('weeklySchedule').addEventListener('click', function(e) {
+        if (e.target.closest('.remove-schedule')) {
+            const row = e.target.closest('.schedule-row');
+            row.style.transition = 'all 0.3s ease';
+            row.style.transform = 'translateX(100px)';
+            row.style.opacity = '0';
+
+            setTimeout(() => {
+                row.remove();
+            }, 300);
+        }
+    });
+
+    // Form submission
+    document.getElementById('profileForm').addEventListener('submit', function(e) {
+        e.preventDefault();
+
+        // Show loading animation
+        const submitBtn = this.querySelector('button[type="submit"]');
+        const originalText = submitBtn.innerHTML;
+        submitBtn.innerHTML = '<span class="loading"></span> Saving...';
+        submitBtn.disabled = true;
+
+        // Collect form data
+        const formData = new FormData(this);
+        const data = {};
+
+        // Simple fields
+        for (let [key, value] of formData.entries()) {
+            if (!key.endsWith('[]')) {
+                data[key] = value;
+            }
+        }
+
+        // Handle sleep schedule
+        data.sleep_schedule = {
+            bedtime: formData.get('bedtime'),
+            wake_time: formData.get('wake_time')
+        };
+
+        // Handle weekly schedule
+        const days = formData.getAll('schedule_day[]');
+        const starts = formData.getAll('schedule_start[]');
+        const ends = formData.getAll('schedule_end[]');
+
+        data.weekly_schedule = {};
+        for (let i = 0; i < days.length; i++) {
+            if (days[i] && starts[i] && ends[i]) {
+                data.weekly_schedule[days[i]] = {
+                    start: starts[i],
+                    end: ends[i],
+                    type: "college/work"
+                };
+            }
+        }
+
+        // Send data to server
+        $.ajax({
+            url: '/api/profile',
+            method: 'POST',
+            contentType: 'application/json',
+            data: JSON.stringify(data),
+            success: function(response) {
+                showNotification('Profile saved successfully!', 'success');
+                setTimeout(() => {
+                    location.reload();
+                }, 1500);
+            },
+            error: function() {
+                showNotification('Error saving profile', 'error');
+                submitBtn.innerHTML = originalText;
+                submitBtn.disabled = false;
+            }
+        });
+    });
+
+    // Add focus effects to form elements
+    $('.form-control, .form-select').focus(function() {
+        $(this).css('box-shadow', '0 0 0 0.25rem rgba(106, 17, 203, 0.25)');
+        $(this).css('border-color', '#6a11cb');
+    });
+
+    $('.form-control, .form-select').blur(function() {
+        $(this).css('box-shadow', '');
+    });
+});
+
+function showNotification(message, type) {
+    // Create notification element
+    const notification = $(`
+        <div class="notification alert alert-${type === 'success' ? 'success' : 'danger'} position-fixed" style="top: 20px; right: 20px; z-index: 9999; animation: slideInRight 0.3s ease;">
+            ${message}
+        </div>
+    `);
+
+    // Add to body
+    $('body').append(notification);
+
+    // Remove after 3 seconds
+    setTimeout(() => {
+        notification.fadeOut(() => {
+            notification.remove();
+        });
+    }, 3000);
+}
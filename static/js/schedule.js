@@ -0,0 +1,77 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Generate schedule
+    document.getElementById('generateSchedule').addEventListener('click', function() {
+        const date = document.getElementById('scheduleDate').value || new Date().toISOString().split('T')[0];
+
+        // Show loading animation
+        const originalText = this.innerHTML;
+        this.innerHTML = '<span class="loading"></span> Generating...';
+        this.disabled = true;
+
+        $.ajax({
+            url: '/api/schedule',
+            method: 'POST',
+            contentType: 'application/json',
+            data: JSON.stringify({date: date}),
+            success: function(response) {
+                showNotification('Schedule generated successfully!', 'success');
+                setTimeout(() => {
+                    location.reload();
+                }, 1500);
+            },
+            error: function() {
+                showNotification('Error generating schedule', 'error');
+                document.getElementById('generateSchedule').innerHTML = originalText;
+                document.getElementById('generateSchedule').disabled = false;
+            }
+        });
+    });
+
+    // Generate first schedule
+    document.getElementById('generateFirstSchedule').addEventListener('click', function() {
+        document.getElementById('generateSchedule').click();
+    });
+
+    document.getElementById('aiOptimize').addEventListener('click', function() {
+        if (window.openAiPanel) { window.openAiPanel(); }
+    });
+
+    // View historical schedule
+    document.querySelectorAll('.view-schedule').forEach(button => {
+        button.addEventListener('click', function() {
+            const date = this.getAttribute('data-date');
+            document.getElementById('scheduleDate').value = date;
+            // In a full implementation, this would fetch and display the specific schedule
+            showNotification(`Displaying schedule for ${date}`, 'info');
+        });
+    });
+
+    // Add hover effects to schedule items
+    $('.schedule-item').hover(
+        function() {
+            $(this).css('transform', 'translateY(-5px)');
+        },
+        function() {
+            $(this).css('transform', 'translateY(0)');
+        }
+    );
+});
+
+function showNotification(message, type) {
+    // Create notification element
+    const notification = $(`
+        <div class="notification alert alert-${type === 'success' ? 'success' : type === 'error' ? 'danger' : 'info'} position-fixed" style="top: 20px; right: 20px; z-index: 9999; animation: slideInRight 0.3s ease;">
+            ${message}
+        </div>
+    `);
+
+    // Add to body
+    $('body').append(notification);
+
+    // Remove after 3 seconds
+    setTimeout(() => {
+        notification.fadeOut(() => {
+            notification.remove();
+        });
+    }, 3000);
+}
@@ -0,0 +1,226 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Add task form submission
+    document.getElementById('taskForm').addEventListener('submit', function(e) {
+        e.preventDefault();
+
+        // Show loading animation
+        const submitBtn = this.querySelector('button[type="submit"]');
+        const originalText = submitBtn.innerHTML;
+        submitBtn.innerHTML = '<span class="loading"></span> Adding...';
+        submitBtn.disabled = true;
+
+        const formData = new FormData(this);
+        const data = {
+            action: 'add',
+            description: formData.get('description'),
+            priority: formData.get('priority'),
+            duration: formData.get('duration'),
+            type: formData.get('type'),
+            preferences: formData.get('preferences')
+        };
+
+        $.ajax({
+            url: '/api/tasks',
+            method: 'POST',
+            contentType: 'application/json',
+            data: JSON.stringify(data),
+            success: function(response) {
+                showNotification('Task added successfully!', 'success');
+                document.getElementById('taskForm').reset();
+                setTimeout(() => {
+                    location.reload();
+                }, 1500);
+            },
+            error: function() {
+                showNotification('Error adding task', 'error');
+                submitBtn.innerHTML = originalText;
+                submitBtn.disabled = false;
+            }
+        });
+    });
+
+    // Complete task buttons
+    // Clicks in quick succession are sent as one batch request
+    const pendingCompletions = [];
+    let completionTimer = null;
+
+    function flushCompletions() {
+        const batch = pendingCompletions.splice(0);
+        completionTimer = null;
+
+        $.ajax({
+            url: '/api/tasks/batch',
+            method: 'POST',
+            contentType: 'application/json',
+            data: JSON.stringify({
+                operations: batch.map(item => ({ action: 'complete', id: item.id }))
+            }),
+            success: function(response) {
+                const failed = response.results.filter(result => result.status !== 'success');
+                if (failed.length) {
+                    showNotification(`Could not complete ${failed.length} task(s)`, 'error');
+                } else {
+                    showNotification(batch.length > 1 ? `${batch.length} tasks completed!` : 'Task completed successfully!', 'success');
+                }
+
+                setTimeout(() => {
+                    location.reload();
+                }, 500);
+            },
+            error: function() {
+                showNotification('Error completing task', 'error');
+                batch.forEach(item => {
+                    item.element.style.transform = '';
+                    item.element.style.opacity = '';
+                    item.button.innerHTML = item.originalText;
+                    item.button.disabled = false;
+                });
+            }
+        });
+    }
+
+    document.querySelectorAll('.complete-task').forEach(button => {
+        button.addEventListener('click', function() {
+            const taskId = this.getAttribute('data-id');
+            const taskElement = document.getElementById(`task-${taskId}`);
+
+            // Show loading animation
+            const originalText = this.innerHTML;
+            this.innerHTML = '<span class="loading"></span>';
+            this.disabled = true;
+
+            // Add animation effect
+            taskElement.style.transition = 'all 0.5s ease';
+            taskElement.style.transform = 'translateX(100%)';
+            taskElement.style.opacity = '0';
+
+            pendingCompletions.push({
+                id: parseInt(taskId),
+                element: taskElement,
+                button: button,
+                originalText: originalText
+            });
+            clearTimeout(completionTimer);
+            completionTimer = setTimeout(flushCompletions, 800);
+        });
+    });
+
+    // Delete task buttons
+    document.querySelectorAll('.delete-task').forEach(button => {
+        button.addEventListener('click', function() {
+            const taskId = this.getAttribute('data-id');
+
+            // Show confirmation dialog
+            showDeleteConfirmation(taskId);
+        });
+    });
+
+    // Add hover effects
+    $('.task-card').hover(
+        function() {
+            $(this).css('transform', 'translateX(5px)');
+        },
+        function() {
+            $(this).css('transform', 'translateX(0)');
+        }
+    );
+});
+
+function showDeleteConfirmation(taskId) {
+    // Create modal HTML
+    const modalHTML = `
+        <div class="modal fade" id="deleteModal" tabindex="-1" aria-labelledby="deleteModalLabel" aria-hidden="true">
+            <div class="modal-dialog modal-dialog-centered">
+                <div class="modal-content">
+                    <div class="modal-header">
+                        <h5 class="modal-title" id="deleteModalLabel">
+                            <i class="fas fa-exclamation-triangle text-warning me-2"></i>Confirm Delete
+                        </h5>
+                        <button type="button" class="btn-close" data-bs-dismiss="modal" aria-label="Close"></button>
+                    </div>
+                    <div class="modal-body">
+                        <p>Are you sure you want to delete this task? This action cannot be undone.</p>
+                    </div>
+                    <div class="modal-footer">
+                        <button type="button" class="btn btn-secondary" data-bs-dismiss="modal">
+                            <i class="fas fa-times me-1"></i>Cancel
+                        </button>
+                        <button type="button" class="btn btn-danger" id="confirmDelete">
+                            <i class="fas fa-trash me-1"></i>Delete
+                        </button>
+                    </div>
+                </div>
+            </div>
+        </div>
+    `;
+
+    // Remove existing modal if any
+    $('#deleteModal').remove();
+
+    // Add modal to body
+    $('body').append(modalHTML);
+
+    // Show modal
+    const modal = new bootstrap.Modal(document.getElementById('deleteModal'));
+    modal.show();
+
+    // Handle delete confirmation
+    document.getElementById('confirmDelete').addEventListener('click', function() {
+        const deleteBtn = this;
+        const originalText = deleteBtn.innerHTML;
+        deleteBtn.innerHTML = '<span class="loading"></span> Deleting...';
+        deleteBtn.disabled = true;
+
+        const data = {
+            action: 'delete',
+            id: parseInt(taskId)
+        };
+
+        $.ajax({
+            url: '/api/tasks',
+            method: 'POST',
+            contentType: 'application/json',
+            data: JSON.stringify(data),
+            success: function(response) {
+                modal.hide();
+                showNotification('Task deleted successfully!', 'success');
+
+                // Find and remove the task element
+                const taskElement = document.getElementById(`task-${taskId}`) || document.getElementById(`completed-task-${taskId}`);
+                if (taskElement) {
+                    taskElement.style.transition = 'all 0.5s ease';
+                    taskElement.style.transform = 'translateX(-100%)';
+                    taskElement.style.opacity = '0';
+
+                    setTimeout(() => {
+                        location.reload();
+                    }, 500);
+                }
+            },
+            error: function() {
+                showNotification('Error deleting task', 'error');
+                deleteBtn.innerHTML = originalText;
+                deleteBtn.disabled = false;
+            }
+        });
+    });
+}
+
+function showNotification(message, type) {
+    // Create notification element
+    const notification = $(`
+        <div class="notification alert alert-${type === 'success' ? 'success' : 'danger'} position-fixed" style="top: 20px; right: 20px; z-index: 9999; animation: slideInRight 0.3s ease;">
+            ${message}
+        </div>
+    `);
+
+    // Add to body
+    $('body').append(notification);
+
+    // Remove after 3 seconds
+    setTimeout(() => {
+        notification.fadeOut(() => {
+            notification.remove();
+        });
+    }, 3000);
+}
@@ -0,0 +1,761 @@
+#!/usr/bin/env python3
+"""
+Storage Backends for the tracker.py CLI
+AITaskOptimizer reads and writes its profile, tasks and schedules through
+one of these stores:
+
+- JsonFileStore keeps the original user_profile.json / tasks_data.json
+  files, rewriting a whole file on every change (atomically, via rename).
+- OpLogStore appends each change as one JSON line to oplog.ndjson and
+  periodically folds the log into snapshot.json. Completed tasks move to
+  the append-only completed.ndjson at compaction and are only read when
+  asked for, so saving and startup cost no longer grow with history.
+- SqlStore works on one web app user's User/Task/Schedule rows, so the
+  CLI and the web app share a single database.
+
+Select the backend with CLI_STORAGE_CONFIG['backend'] or TRACKER_STORAGE
+(and the web app account with TRACKER_USER for 'sql').
+
+Move existing JSON files into the database with:
+    python task_store.py import --username <user> [--profile user_profile.json] [--tasks tasks_data.json]
+"""
+
+import hashlib
+import json
+import os
+import secrets
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from llm_config import CLI_STORAGE_CONFIG, MODEL_CONFIG
+
+try:
+    import fcntl  # Optional: POSIX only; elsewhere a single writer is assumed
+except ImportError:
+    fcntl = None
+
+
+def _fsync_dir(directory: str):
+    """Persist a rename (no-op where directories cannot be opened)"""
+    try:
+        fd = os.open(directory or '.', os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def atomic_write_json(path: str, data, indent: Optional[int] = None):
+    """
+    Replace a JSON file so readers see either the old or the new content
+
+    Args:
+        path: Target file
+        data: JSON-serializable value
+        indent: Passed to json.dump
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=indent)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _fsync_dir(os.path.dirname(path))
+
+
+def _complete(tasks: Dict, task_id: str, date_str: str) -> Optional[Dict]:
+    """Move a pending task out of tasks['pending'] and mark it completed"""
+    for i, task in enumerate(tasks['pending']):
+        if str(task.get('id')) == str(task_id):
+            task = tasks['pending'].pop(i)
+            task['status'] = 'completed'
+            task['completed_date'] = date_str
+            return task
+    return None
+
+
+class TaskData(dict):
+    """
+    Task dict with the 'completed' list loaded on first access
+
+    Behaves like the {"pending", "completed", "schedules"} dict of
+    tasks_data.json, so existing callers keep working unchanged.
+    """
+
+    def __init__(self, data: Dict, load_completed=None):
+        super().__init__(data)
+        self._load_completed = load_completed
+
+    def __missing__(self, key):
+        if key == 'completed' and self._load_completed is not None:
+            value = self[key] = self._load_completed()
+            return value
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return super().__contains__(key) or (key == 'completed' and self._load_completed is not None)
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    @property
+    def completed_loaded(self) -> bool:
+        return super().__contains__('completed')
+
+
+class JsonFileStore:
+    """The original JSON files, rewritten atomically on every change"""
+
+    def __init__(self, profile_file: str = 'user_profile.json', tasks_file: str = 'tasks_data.json'):
+        self.profile_file = profile_file
+        self.tasks_file = tasks_file
+        self._profile = None
+        self._tasks = None
+
+    def load_profile(self) -> Dict:
+        """Load user profile from file or create new one"""
+        if self._profile is None:
+            self._profile = {}
+            if os.path.exists(self.profile_file):
+                with open(self.profile_file, 'r') as f:
+                    self._profile = json.load(f)
+        return self._profile
+
+    def load_tasks(self) -> Dict:
+        """Load tasks from file"""
+        if self._tasks is None:
+            data = {"pending": [], "completed": [], "schedules": {}}
+            if os.path.exists(self.tasks_file):
+                with open(self.tasks_file, 'r') as f:
+                    data = json.load(f)
+            self._tasks = TaskData(data)
+        return self._tasks
+
+    def save_profile(self, profile: Dict):
+        self._profile = profile
+        atomic_write_json(self.profile_file, profile, indent=2)
+
+    def save_tasks(self, tasks: Dict = None):
+        if tasks is not None:
+            self._tasks = tasks
+        atomic_write_json(self.tasks_file, dict(self.load_tasks()), indent=2)
+
+    def add_task(self, task: Dict):
+        self.add_tasks([task])
+
+    def add_tasks(self, tasks: List[Dict]):
+        """Add several tasks with a single rewrite of the file"""
+        if not tasks:
+            return
+        self.load_tasks()['pending'].extend(tasks)
+        self.save_tasks()
+
+    def complete_task(self, task_id: str, date_str: str) -> Optional[Dict]:
+        tasks = self.load_tasks()
+        task = _complete(tasks, task_id, date_str)
+        if task:
+            tasks.setdefault('completed', []).append(task)
+            self.save_tasks()
+        return task
+
+    def save_schedule(self, date_str: str, schedule: Dict):
+        self.load_tasks().setdefault('schedules', {})[date_str] = schedule
+        self.save_tasks()
+
+
+class OpLogStore:
+    """
+    Snapshot plus append-only operation log
+
+    Files in data_dir:
+        snapshot.json: {"seq", "history_bytes", "profile", "pending", "schedules"}
+        oplog.ndjson: One {"seq", "op", ...} line per change since the snapshot
+        completed.ndjson: Completed tasks, oldest first, one per line
+
+    A torn final log line (crash mid-append) is dropped on load. Operations
+    already folded into the snapshot are skipped by sequence number, and
+    completed.ndjson is cut back to the length the snapshot recorded, so a
+    crash at any point of a compaction replays cleanly.
+
+    Loads, appends and compactions hold an exclusive flock on oplog.lock.
+    Before writing, a store first replays whatever other processes appended
+    (or reloads after their compaction), so concurrent CLI runs never lose
+    or renumber each other's operations.
+    """
+
+    SNAPSHOT = 'snapshot.json'
+    LOG = 'oplog.ndjson'
+    HISTORY = 'completed.ndjson'
+    LOCK = 'oplog.lock'
+
+    def __init__(self, data_dir: str = None, compact_after_ops: int = None, fsync: bool = None,
+                 legacy_store: JsonFileStore = None):
+        """
+        Args:
+            data_dir: Directory for the store files (created on first use)
+            compact_after_ops: Logged operations that trigger a compaction
+            fsync: fsync after every append
+            legacy_store: JSON files to import when the directory is empty
+        """
+        self.data_dir = data_dir or CLI_STORAGE_CONFIG['data_dir']
+        self.compact_after_ops = compact_after_ops or CLI_STORAGE_CONFIG['compact_after_ops']
+        self.fsync = CLI_STORAGE_CONFIG['fsync'] if fsync is None else fsync
+        self.legacy_store = legacy_store
+        self._state = None
+        self._lock_depth = 0
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.data_dir, name)
+
+    @contextmanager
+    def _locked(self):
+        """Hold the store's inter-process lock (re-entrant within this store)"""
+        if fcntl is None or self._lock_depth:
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+            return
+        os.makedirs(self.data_dir, exist_ok=True)
+        with open(self._path(self.LOCK), 'a') as lock:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+    def _snapshot_id(self):
+        """Identity of the current snapshot file; compaction replaces it by rename"""
+        try:
+            stat = os.stat(self._path(self.SNAPSHOT))
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    # Loading ----------------------------------------------------------------
+
+    def _load(self) -> Dict:
+        if self._state is not None:
+            return self._state
+        with self._locked():
+            return self._load_locked()
+
+    def _load_locked(self) -> Dict:
+        snapshot = {'seq': 0, 'history_bytes': 0, 'profile': {}, 'pending': [], 'schedules': {}}
+        if os.path.exists(self._path(self.SNAPSHOT)):
+            with open(self._path(self.SNAPSHOT), 'r') as f:
+                snapshot.update(json.load(f))
+        elif not os.path.exists(self._path(self.LOG)) and self.legacy_store:
+            snapshot = self._import_legacy(snapshot)
+
+        self._state = {
+            'snapshot_id': self._snapshot_id(),
+            'seq': snapshot['seq'],
+            'snapshot_seq': snapshot['seq'],
+            'history_bytes': snapshot['history_bytes'],
+            'log_bytes': 0,
+            'logged_ops': 0,
+            'recent_completed': [],
+            'profile': snapshot['profile'],
+            'tasks': TaskData({'pending': snapshot['pending'], 'schedules': snapshot['schedules']},
+                              self._load_completed),
+        }
+        self._replay()
+        return self._state
+
+    def _import_legacy(self, snapshot: Dict) -> Dict:
+        """Seed an empty store from the JSON files"""
+        tasks = self.legacy_store.load_tasks()
+        profile = self.legacy_store.load_profile()
+        if not profile and not any(tasks.get(key) for key in ('pending', 'completed', 'schedules')):
+            return snapshot
+        os.makedirs(self.data_dir, exist_ok=True)
+        with open(self._path(self.HISTORY), 'w') as f:
+            for task in tasks.get('completed', []):
+                f.write(json.dumps(task) + '\n')
+            f.flush()
+            history_bytes = f.tell()
+            os.fsync(f.fileno())
+        snapshot = {'seq': 0, 'history_bytes': history_bytes, 'profile': profile,
+                    'pending': tasks.get('pending', []), 'schedules': tasks.get('schedules', {})}
+        atomic_write_json(self._path(self.SNAPSHOT), snapshot)
+        print(f"Imported {self.legacy_store.tasks_file} and {self.legacy_store.profile_file} into {self.data_dir}")
+        return snapshot
+
+    def _replay(self):
+        """Apply complete log lines past log_bytes (all of them on load)"""
+        state = self._state
+        try:
+            f = open(self._path(self.LOG), 'rb')
+        except FileNotFoundError:
+            return
+        with f:
+            f.seek(state['log_bytes'])
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # Torn write; _append truncates it away
+                try:
+                    op = json.loads(line)
+                except ValueError:
+                    break
+                state['log_bytes'] += len(line)
+                state['logged_ops'] += 1
+                if op['seq'] > state['seq']:
+                    self._apply(op)
+
+    def _catch_up(self) -> Dict:
+        """
+        Bring the state up to date with other writers (call with the lock held)
+
+        Reloads after another process compacted, otherwise replays the lines
+        it appended since this store last read the log.
+        """
+        state = self._load()
+        if self._snapshot_id() != state['snapshot_id']:
+            self._state = None
+            return self._load()
+        self._replay()
+        return state
+
+    def _load_completed(self) -> List[Dict]:
+        state = self._load()
+        completed = []
+        try:
+            with open(self._path(self.HISTORY), 'rb') as f:
+                data = f.read(state['history_bytes'])
+        except FileNotFoundError:
+            data = b''
+        for line in data.splitlines():
+            if line:
+                completed.append(json.loads(line))
+        return completed + state['recent_completed']
+
+    # Operations -------------------------------------------------------------
+
+    def _apply(self, op: Dict):
+        state = self._state
+        tasks = state['tasks']
+        state['seq'] = op['seq']
+        kind = op['op']
+        if kind == 'profile':
+            if op['profile'] is not state['profile']:
+                state['profile'].clear()
+                state['profile'].update(op['profile'])
+        elif kind == 'add':
+            tasks['pending'].append(op['task'])
+        elif kind == 'complete':
+            task = _complete(tasks, op['id'], op['date'])
+            if task:
+                state['recent_completed'].append(task)
+                if tasks.completed_loaded:
+                    tasks['completed'].append(task)
+        elif kind == 'schedule':
+            tasks['schedules'][op['date']] = op['schedule']
+
+    def _append(self, *ops: Dict):
+        """Log operations with one write and fsync, then apply them"""
+        with self._locked():
+            state = self._catch_up()
+            ops = [dict(op, seq=state['seq'] + i) for i, op in enumerate(ops, 1)]
+            os.makedirs(self.data_dir, exist_ok=True)
+            with open(self._path(self.LOG), 'ab') as f:
+                # Everything complete was replayed; anything left is a torn line
+                if f.tell() != state['log_bytes']:
+                    f.truncate(state['log_bytes'])
+                data = b''.join((json.dumps(op, separators=(',', ':')) + '\n').encode() for op in ops)
+                f.write(data)
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+            state['log_bytes'] += len(data)
+            state['logged_ops'] += len(ops)
+            for op in ops:
+                self._apply(op)
+            if state['logged_ops'] >= self.compact_after_ops:
+                self.compact()
+
+    def compact(self):
+        """Fold the log into a new snapshot and move completed tasks to history"""
+        with self._locked():
+            state = self._catch_up()
+            os.makedirs(self.data_dir, exist_ok=True)
+
+            # 1. Append completed tasks to history, first dropping anything an
+            #    interrupted compaction wrote past the snapshot's recorded length
+            history_bytes = state['history_bytes']
+            with open(self._path(self.HISTORY), 'ab') as f:
+                f.truncate(history_bytes)
+                f.seek(history_bytes)
+                for task in state['recent_completed']:
+                    f.write((json.dumps(task) + '\n').encode())
+                f.flush()
+                os.fsync(f.fileno())
+                history_bytes = f.tell()
+
+            # 2. Atomically publish the snapshot; ops up to seq are now in it
+            tasks = state['tasks']
+            atomic_write_json(self._path(self.SNAPSHOT), {
+                'seq': state['seq'],
+                'history_bytes': history_bytes,
+                'profile': state['profile'],
+                'pending': tasks['pending'],
+                'schedules': tasks['schedules'],
+            })
+
+            # 3. Start a new log (a crash before this just replays nothing new)
+            with open(self._path(self.LOG), 'wb') as f:
+                os.fsync(f.fileno())
+
+            state.update(snapshot_id=self._snapshot_id(), snapshot_seq=state['seq'], history_bytes=history_bytes,
+                         log_bytes=0, logged_ops=0, recent_completed=[])
+
+    # Store interface ----------------------------------------------------------
+
+    def load_profile(self) -> Dict:
+        return self._load()['profile']
+
+    def load_tasks(self) -> Dict:
+        return self._load()['tasks']
+
+    def save_profile(self, profile: Dict):
+        self._append({'op': 'profile', 'profile': profile})
+
+    def save_tasks(self, tasks: Dict = None):
+        """Persist everything in one go (the log already holds every change)"""
+        self.compact()
+
+    def add_task(self, task: Dict):
+        self._append({'op': 'add', 'task': task})
+
+    def add_tasks(self, tasks: List[Dict]):
+        if tasks:
+            self._append(*({'op': 'add', 'task': task} for task in tasks))
+
+    def complete_task(self, task_id: str, date_str: str) -> Optional[Dict]:
+        with self._locked():
+            tasks = self._catch_up()['tasks']
+            pending = [task for task in tasks['pending'] if str(task.get('id')) == str(task_id)]
+            if not pending:
+                return None
+            self._append({'op': 'complete', 'id': task_id, 'date': date_str})
+            return pending[0]
+
+    def save_schedule(self, date_str: str, schedule: Dict):
+        self._append({'op': 'schedule', 'date': date_str, 'schedule': schedule})
+
+
+class ScheduleCache:
+    """
+    Generated schedules on disk, keyed by a hash of everything that went into them
+
+    A repeat run for the same date with an unchanged profile, task list and
+    model is answered from here without contacting Ollama.
+    """
+
+    def __init__(self, directory: str = None, max_entries: int = None):
+        self.directory = directory or CLI_STORAGE_CONFIG['schedule_cache_dir']
+        self.max_entries = max_entries or CLI_STORAGE_CONFIG['schedule_cache_max_entries']
+
+    @staticmethod
+    def key(user_profile: Dict, tasks: List[Dict], date_str: str) -> str:
+        inputs = {'profile': user_profile, 'tasks': tasks, 'date': date_str, 'model': MODEL_CONFIG['model_name']}
+        return hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        try:
+            with open(os.path.join(self.directory, f"{key}.json"), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, schedule: Dict):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            atomic_write_json(os.path.join(self.directory, f"{key}.json"), schedule)
+            self._prune()
+        except OSError as e:
+            print(f"Could not cache schedule: {e}")
+
+    def _prune(self):
+        paths = [os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.endswith('.json')]
+        for path in sorted(paths, key=os.path.getmtime)[:max(0, len(paths) - self.max_entries)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+# Profile keys of user_profile.json, all stored as User columns
+PROFILE_FIELDS = ('name', 'role', 'schedule_days', 'weekly_schedule', 'peak_energy', 'study_preference',
+                  'sleep_schedule', 'family_time', 'workout_preference', 'workout_impact', 'main_goals')
+
+
+def _date_str(value) -> Optional[str]:
+    return value.strftime("%Y-%m-%d") if value else None
+
+
+def _parse_date(value: Optional[str]) -> Optional[datetime]:
+    try:
+        return datetime.strptime(value, "%Y-%m-%d") if value else None
+    except ValueError:
+        return None
+
+
+def _task_dict(task) -> Dict:
+    data = {
+        "id": str(task.id),
+        "description": task.description,
+        "priority": task.priority,
+        "duration": task.duration,
+        "type": task.type,
+        "preferences": task.preferences,
+        "status": task.status,
+        "added_date": _date_str(task.added_date),
+    }
+    if task.completed_date:
+        data["completed_date"] = _date_str(task.completed_date)
+    return data
+
+
+def _task_values(user_id: int, task: Dict, status: str = None) -> Dict:
+    """Task row values for a tasks_data.json task"""
+    return {
+        'user_id': user_id,
+        'description': task.get('description', '')[:200],
+        'priority': task.get('priority') or 'medium',
+        'duration': task.get('duration') or '1h',
+        'type': task.get('type') or 'personal',
+        'preferences': task.get('preferences'),
+        'status': status or task.get('status') or 'pending',
+        'added_date': _parse_date(task.get('added_date')) or datetime.utcnow(),
+        'completed_date': _parse_date(task.get('completed_date')),
+    }
+
+
+class SqlStore:
+    """
+    One web app user's data through the SQLAlchemy models
+
+    Pending and completed tasks are read with the (user_id, status) index
+    and schedules are decoded per date on lookup, so nothing scales with
+    the size of the whole history until it is actually shown.
+    """
+
+    def __init__(self, username: str, app=None):
+        """
+        Args:
+            username: Web app account the CLI acts as
+            app: Flask app (default: the web app from app.py)
+        """
+        if app is None:
+            from app import app
+        self.app = app
+        self.username = username
+        self._context = None
+        self._user = None
+        self._profile = None
+        self._tasks = None
+
+    def _get_user(self):
+        if self._user is None:
+            from models import User
+            self._context = self.app.app_context()
+            self._context.push()
+            self._user = User.query.filter_by(username=self.username).first()
+            if self._user is None:
+                raise ValueError(f"No web app user named {self.username!r}")
+        return self._user
+
+    def close(self):
+        if self._context is not None:
+            self._context.pop()
+            self._context = None
+            self._user = None
+
+    def load_profile(self) -> Dict:
+        if self._profile is None:
+            user = self._get_user()
+            self._profile = {key: getattr(user, key) for key in PROFILE_FIELDS if getattr(user, key) is not None}
+        return self._profile
+
+    def load_tasks(self) -> Dict:
+        if self._tasks is None:
+            from app import ScheduleHistory
+            from models import Task
+            user = self._get_user()
+
+            def load_completed():
+                return [_task_dict(task) for task in Task.query.filter_by(user_id=user.id, status='completed')
+                        .order_by(Task.completed_date)]
+
+            pending = Task.query.filter_by(user_id=user.id, status='pending').order_by(Task.id)
+            self._tasks = TaskData({'pending': [_task_dict(task) for task in pending],
+                                    'schedules': ScheduleHistory(user.id)}, load_completed)
+        return self._tasks
+
+    def save_profile(self, profile: Dict):
+        from models import db
+        user = self._get_user()
+        for key in PROFILE_FIELDS:
+            if key in profile:
+                setattr(user, key, profile[key])
+        db.session.commit()
+        self._profile = profile
+
+    def save_tasks(self, tasks: Dict = None):
+        """Every change is committed as it happens"""
+
+    def add_task(self, task: Dict):
+        self.add_tasks([task])
+
+    def add_tasks(self, tasks: List[Dict]):
+        """Insert tasks in one transaction; each task dict gets its row id"""
+        from models import db, Task, UserStats
+        if not tasks:
+            return
+        user = self._get_user()
+        rows = [Task(**_task_values(user.id, task, 'pending')) for task in tasks]
+        db.session.add_all(rows)
+        UserStats.record(user.id, pending_task_count=len(rows))
+        db.session.commit()
+        for task, row in zip(tasks, rows):
+            task['id'] = str(row.id)
+        if self._tasks is not None:
+            self._tasks['pending'].extend(tasks)
+
+    def complete_task(self, task_id: str, date_str: str) -> Optional[Dict]:
+        from models import db, Task, UserStats
+        user = self._get_user()
+        row = Task.query.filter_by(id=int(task_id), user_id=user.id, status='pending').first() \
+            if str(task_id).isdigit() else None
+        if row is None:
+            return None
+        row.status = 'completed'
+        row.completed_date = _parse_date(date_str) or datetime.now()
+        UserStats.record(user.id, pending_task_count=-1, completed_task_count=1)
+        db.session.commit()
+        if self._tasks is not None:
+            task = _complete(self._tasks, task_id, date_str)
+            if task and self._tasks.completed_loaded:
+                self._tasks['completed'].append(task)
+        return _task_dict(row)
+
+    def save_schedule(self, date_str: str, schedule: Dict, source: str = 'cli'):
+        from models import Schedule
+        user = self._get_user()
+        Schedule.upsert(user.id, datetime.strptime(date_str, "%Y-%m-%d").date(), schedule, source)
+        self._tasks = None  # Re-list schedule dates on next access
+
+
+def import_json_files(username: str, profile_file: str = 'user_profile.json', tasks_file: str = 'tasks_data.json',
+                      email: str = None) -> Dict:
+    """
+    Copy a CLI profile and its tasks and schedules into the web app database
+
+    Creates the user if needed (with a random password, returned in the
+    result). Tasks are inserted with one executemany in a single
+    transaction. Run inside an app context.
+
+    Args:
+        username: Target web app account
+        profile_file: user_profile.json to import
+        tasks_file: tasks_data.json to import
+        email: Email for a newly created account (default <username>@localhost)
+
+    Returns:
+        dict: Counts of imported rows, plus 'password' if the user was created
+    """
+    from models import db, Schedule, Task, User, UserStats
+
+    legacy = JsonFileStore(profile_file, tasks_file)
+    profile, tasks = legacy.load_profile(), legacy.load_tasks()
+    result = {'pending': 0, 'completed': 0, 'schedules': 0}
+
+    user = User.query.filter_by(username=username).first()
+    if user is None:
+        result['password'] = secrets.token_urlsafe(12)
+        user = User(username=username, email=email or f'{username}@localhost')
+        user.set_password(result['password'])
+        db.session.add(user)
+        db.session.flush()
+        UserStats.record(user.id, user_count=1)
+    elif Task.query.filter_by(user_id=user.id).first() is not None:
+        raise ValueError(f"User {username!r} already has tasks; refusing to import twice")
+
+    for key in PROFILE_FIELDS:
+        if profile.get(key) not in (None, ''):
+            setattr(user, key, profile[key])
+
+    rows = [_task_values(user.id, task, 'pending') for task in tasks.get('pending', [])]
+    rows += [_task_values(user.id, task, 'completed') for task in tasks.get('completed', [])]
+    if rows:
+        db.session.execute(db.insert(Task), rows)
+    result['pending'] = len(tasks.get('pending', []))
+    result['completed'] = len(tasks.get('completed', []))
+    UserStats.record(user.id, pending_task_count=result['pending'], completed_task_count=result['completed'])
+    db.session.commit()
+
+    for date_str, schedule in tasks.get('schedules', {}).items():
+        Schedule.upsert(user.id, datetime.strptime(date_str, "%Y-%m-%d").date(), schedule, 'cli')
+        result['schedules'] += 1
+    return result
+
+
+def get_task_store(backend: str = None, location: str = None):
+    """
+    Create the CLI store selected by TRACKER_STORAGE / CLI_STORAGE_CONFIG
+
+    Args:
+        backend: 'json', 'oplog' or 'sql' (default: configured backend)
+        location: Where the data lives - the directory holding the JSON
+            files ('json'), the data directory ('oplog') or the web app
+            username ('sql', default TRACKER_USER)
+
+    Returns:
+        JsonFileStore, OpLogStore or SqlStore
+    """
+    backend = backend or os.environ.get('TRACKER_STORAGE') or CLI_STORAGE_CONFIG['backend']
+    if backend == 'json':
+        directory = location or ''
+        return JsonFileStore(os.path.join(directory, 'user_profile.json'), os.path.join(directory, 'tasks_data.json'))
+    if backend == 'oplog':
+        return OpLogStore(location, legacy_store=None if location else JsonFileStore())
+    if backend == 'sql':
+        username = location or os.environ.get('TRACKER_USER')
+        if not username:
+            raise ValueError("The sql tracker storage needs a web app username (TRACKER_USER)")
+        return SqlStore(username)
+    raise ValueError(f"Unknown tracker storage backend: {backend}")
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='tracker.py storage utilities')
+    subcommands = parser.add_subparsers(dest='command', required=True)
+    import_parser = subcommands.add_parser('import', help='copy JSON files into the web app database')
+    import_parser.add_argument('--username', required=True, help='web app account to import into (created if missing)')
+    import_parser.add_argument('--email', help='email for a newly created account')
+    import_parser.add_argument('--profile', default='user_profile.json', help='profile file to import')
+    import_parser.add_argument('--tasks', default='tasks_data.json', help='tasks file to import')
+    args = parser.parse_args()
+
+    from app import app
+
+    with app.app_context():
+        try:
+            result = import_json_files(args.username, args.profile, args.tasks, args.email)
+        except ValueError as e:
+            parser.error(str(e))
+    print(f"Imported {result['pending']} pending and {result['completed']} completed tasks "
+          f"and {result['schedules']} schedules for {args.username}")
+    if 'password' in result:
+        print(f"Created user {args.username} with password: {result['password']}")
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Tests for the admin summary counters and the paginated user list
+"""
+
+import io
+import os
+import re
+import unittest
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+from unittest import mock
+
+os.environ['DATABASE_URL'] = 'sqlite://'  # throwaway database; must be set before app is imported
+
+from app import app
+from migrate_db import migrate_database
+from models import db, User, Task, UserStats, SiteStats
+
+PREFIX = 'adminstats_'
+
+
+class AdminStatsTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with redirect_stdout(io.StringIO()):
+            migrate_database()
+
+    def setUp(self):
+        self.cleanup()
+        with app.app_context():
+            users = [User(username=f'{PREFIX}{name}', email=f'{PREFIX}{name}@example.com', password_hash='x',
+                          is_admin=name == 'admin') for name in ('admin', 'a', 'b', 'c')]
+            db.session.add_all(users)
+            db.session.commit()
+            self.ids = {user.username[len(PREFIX):]: user.id for user in users}
+
+    def tearDown(self):
+        self.cleanup()
+
+    def cleanup(self):
+        with app.app_context():
+            ids = [user_id for (user_id,) in db.session.query(User.id).filter(User.username.startswith(PREFIX))]
+            Task.query.filter(Task.user_id.in_(ids)).delete()
+            UserStats.query.filter(UserStats.user_id.in_(ids)).delete()
+            User.query.filter(User.id.in_(ids)).delete()
+            db.session.commit()
+
+    def client(self, name):
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['_user_id'] = str(self.ids[name])
+            session['_fresh'] = True
+        return client
+
+
+class TestCounters(AdminStatsTestCase):
+    def stats(self):
+        with app.app_context():
+            user = db.session.get(UserStats, self.ids['a'])
+            site = SiteStats.get()
+            return ((user.pending_task_count, user.completed_task_count) if user else (0, 0),
+                    (site.pending_task_count, site.completed_task_count))
+
+    def test_task_writes_update_counters(self):
+        """Adding, completing and deleting tasks move the user and site counters"""
+        client = self.client('a')
+        _, site = self.stats()
+        client.post('/api/tasks', json={'action': 'add', 'description': 'Read', 'priority': 'high',
+                                        'duration': '1h', 'type': 'study'})
+        client.post('/api/tasks', json={'action': 'add', 'description': 'Run', 'priority': 'low',
+                                        'duration': '30m', 'type': 'health'})
+        self.assertEqual(self.stats(), ((2, 0), (site[0] + 2, site[1])))
+
+        with app.app_context():
+            first, second = [task.id for task in Task.query.filter_by(user_id=self.ids['a']).order_by(Task.id)]
+        client.post('/api/tasks', json={'action': 'complete', 'id': first})
+        client.post('/api/tasks', json={'action': 'complete', 'id': first})
+        self.assertEqual(self.stats(), ((1, 1), (site[0] + 1, site[1] + 1)))
+        client.post('/api/tasks', json={'action': 'delete', 'id': second})
+        self.assertEqual(self.stats(), ((0, 1), (site[0], site[1] + 1)))
+
+        # A rebuild from the source tables agrees with the running counters
+        with app.app_context():
+            UserStats.rebuild()
+            db.session.commit()
+        self.assertEqual(self.stats()[0], (0, 1))
+
+    def test_touch_only_stamps_stale_activity(self):
+        """Logins re-stamp last activity at most once per TOUCH_INTERVAL"""
+        with app.app_context():
+            stale = datetime.utcnow() - UserStats.TOUCH_INTERVAL - timedelta(minutes=1)
+            db.session.add(UserStats(user_id=self.ids['a'], pending_task_count=0, completed_task_count=0,
+                                     schedule_count=0, last_activity_at=stale))
+            db.session.commit()
+            UserStats.touch(self.ids['a'])
+            db.session.commit()
+            stamped = db.session.get(UserStats, self.ids['a']).last_activity_at
+            self.assertGreater(stamped, stale)
+
+            db.session.expire_all()
+            UserStats.touch(self.ids['a'])
+            db.session.commit()
+            self.assertEqual(db.session.get(UserStats, self.ids['a']).last_activity_at, stamped)
+
+    def test_migration_backfills_after_early_writes(self):
+        """Counter rows written before the first backfill do not stop it from running"""
+        with app.app_context():
+            db.session.add(Task(user_id=self.ids['b'], description='Imported', priority='low', duration='1h',
+                                type='work', status='pending'))
+            UserStats.record(self.ids['a'], pending_task_count=1, completed_task_count=0)
+            db.session.get(SiteStats, 1).rebuilt_at = None
+            db.session.commit()
+        with redirect_stdout(io.StringIO()):
+            migrate_database()
+        with app.app_context():
+            self.assertEqual(db.session.get(UserStats, self.ids['b']).pending_task_count, 1)
+            self.assertEqual(db.session.get(UserStats, self.ids['a']).pending_task_count, 0)
+            self.assertIsNotNone(SiteStats.get().rebuilt_at)
+
+
+class TestAdminList(AdminStatsTestCase):
+    def page(self, **params):
+        with mock.patch('app.ADMIN_PAGE_SIZE', 2):
+            response = self.client('admin').get('/admin', query_string=dict(q=PREFIX, **params))
+        self.assertEqual(response.status_code, 200)
+        html = response.get_data(as_text=True)
+        names = re.findall(rf'<td>{PREFIX}(\w+)</td>', html)
+        links = dict(re.findall(r'href="/admin\?q=\w+&amp;(after|before)=(\d+)"', html))
+        return names, links
+
+    def test_keyset_pages(self):
+        """Next and previous links continue from the last and first shown user"""
+        names, links = self.page()
+        self.assertEqual(names, ['admin', 'a'])
+        self.assertEqual(links, {'after': str(self.ids['a'])})
+
+        names, links = self.page(after=self.ids['a'])
+        self.assertEqual(names, ['b', 'c'])
+        self.assertEqual(links, {'before': str(self.ids['b'])})
+
+        names, links = self.page(before=self.ids['b'])
+        self.assertEqual(names, ['admin', 'a'])
+        self.assertEqual(links, {'after': str(self.ids['a'])})
+
+    def test_prefix_search(self):
+        """Search matches the start of the username, email or name, ignoring case"""
+        with app.app_context():
+            db.session.get(User, self.ids['c']).name = 'Zelda Quinn'
+            db.session.commit()
+        with mock.patch('app.ADMIN_PAGE_SIZE', 10):
+            client = self.client('admin')
+
+            def search(q):
+                html = client.get('/admin', query_string={'q': q}).get_data(as_text=True)
+                return re.findall(rf'<td>{PREFIX}(\w+)</td>', html)
+
+            self.assertEqual(search(f'{PREFIX}b'), ['b'])
+            self.assertEqual(search(f'{PREFIX.upper()}B@EXAMPLE'), ['b'])
+            self.assertEqual(search('zELDA'), ['c'])
+            self.assertEqual(search('quinn'), [])
+            self.assertEqual(search(PREFIX[:3] + '%'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
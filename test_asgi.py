@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Tests for the async LLM endpoints of the ASGI entry point
+"""
+
+import asyncio
+import io
+import json
+import os
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+os.environ['DATABASE_URL'] = 'sqlite://'  # throwaway database; must be set before app is imported
+
+import httpx
+
+import asgi
+import llm_service
+from app import app
+from llm_config import MODEL_CONFIG
+from llm_service import OllamaLLMService
+from migrate_db import migrate_database
+from models import db, User, Task, Schedule, UserStats
+
+USERNAME = 'asgi_test'
+SCHEDULE = {
+    'schedule': [{'time': '9:00 AM - 10:00 AM', 'task': 'Write report', 'reason': 'Peak focus', 'type': 'work'}],
+    'daily_summary': 'Focused morning',
+    'tips': ['Hydrate'],
+}
+
+
+def ollama_up(request):
+    """Fake Ollama: lists the model, streams a schedule and answers chat"""
+    if request.url.path == '/api/tags':
+        return httpx.Response(200, json={'models': [{'name': MODEL_CONFIG['model_name']}]})
+    body = json.loads(request.content)
+    if body.get('stream'):
+        text = json.dumps(SCHEDULE)
+        pieces = [text[i:i + 40] for i in range(0, len(text), 40)]
+        lines = [json.dumps({'response': piece, 'done': False}) for piece in pieces]
+        lines.append(json.dumps({'response': '', 'done': True, 'eval_count': len(pieces)}))
+        return httpx.Response(200, content='\n'.join(lines).encode())
+    return httpx.Response(200, json={'response': 'Recursion is a function calling itself.', 'done': True})
+
+
+def ollama_down(request):
+    raise httpx.ConnectError('connection refused', request=request)
+
+
+class TestAsgi(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls):
+        with redirect_stdout(io.StringIO()):
+            migrate_database()
+
+    def setUp(self):
+        self.cleanup()
+        with app.app_context():
+            user = User(username=USERNAME, email=f'{USERNAME}@example.com', password_hash='x', role='student')
+            db.session.add(user)
+            db.session.flush()
+            db.session.add(Task(user_id=user.id, description='Write report', priority='high', duration='1h',
+                                type='work', status='pending'))
+            db.session.commit()
+            self.user_id = user.id
+        session = app.session_interface.get_signing_serializer(app).dumps({'_user_id': str(self.user_id), '_fresh': True})
+        self.cookies = {app.config['SESSION_COOKIE_NAME']: session}
+
+    def tearDown(self):
+        self.cleanup()
+
+    def cleanup(self):
+        with app.app_context():
+            user = User.query.filter_by(username=USERNAME).first()
+            if user:
+                Schedule.query.filter_by(user_id=user.id).delete()
+                Task.query.filter_by(user_id=user.id).delete()
+                UserStats.query.filter_by(user_id=user.id).delete()
+                db.session.delete(user)
+                db.session.commit()
+
+    async def post(self, path, payload, ollama):
+        service = OllamaLLMService()
+        service._async_client = httpx.AsyncClient(transport=httpx.MockTransport(ollama))
+        service._async_loop = asyncio.get_running_loop()
+        transport = httpx.ASGITransport(app=asgi.application)
+        with mock.patch('asgi.get_llm_service', return_value=service), \
+                mock.patch('app.get_example_store') as example_store:
+            example_store.return_value.needs_rebuild.return_value = False
+            example_store.return_value.query.return_value = []
+            async with httpx.AsyncClient(transport=transport, base_url='http://testserver', cookies=self.cookies) as client:
+                response = await client.post(path, json=payload)
+        await service._async_client.aclose()
+        return response
+
+    def stored_source(self):
+        with app.app_context():
+            return Schedule.query.filter_by(user_id=self.user_id).one().source
+
+    async def test_optimize_with_llm(self):
+        """A streamed Ollama schedule is returned and saved"""
+        response = await self.post('/api/ai_optimize', {'date': '2025-03-03'}, ollama_up)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['source'], 'llm')
+        self.assertEqual(data['schedule']['schedule'][0]['task'], 'Write report')
+        self.assertEqual(self.stored_source(), 'llm')
+
+    async def test_optimize_falls_back_when_ollama_is_down(self):
+        """Without Ollama the rule-based schedule is returned"""
+        response = await self.post('/api/ai_optimize', {'date': '2025-03-03'}, ollama_down)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['source'], 'fallback')
+        self.assertEqual(self.stored_source(), 'fallback')
+
+    async def test_chat(self):
+        """Chat answers come from Ollama, or the fallback message when it is down"""
+        message = {'message': 'Explain recursion with an example in Python'}
+        data = (await self.post('/api/ai_chat', message, ollama_up)).json()
+        self.assertEqual((data['status'], data['source']), ('success', 'llm'))
+        self.assertIn('Recursion', data['response'])
+
+        data = (await self.post('/api/ai_chat', message, ollama_down)).json()
+        self.assertEqual(data['status'], 'fallback')
+
+    async def test_requires_login(self):
+        """Anonymous requests are redirected to the login page"""
+        self.cookies = {}
+        response = await self.post('/api/ai_chat', {'message': 'hello'}, ollama_up)
+        self.assertEqual(response.status_code, 302)
+        self.assertIn('/login', response.headers['location'])
+
+
+class TestAsyncClient(unittest.TestCase):
+    def test_loop_change_closes_previous_client(self):
+        """A client left behind by a finished event loop is closed, the current one on shutdown"""
+        service = OllamaLLMService()
+        clients = []
+
+        async def use_client():
+            clients.append(service._get_async_client())
+            self.assertIs(service._get_async_client(), clients[-1])
+            await asyncio.sleep(0)
+
+        asyncio.run(use_client())
+        asyncio.run(use_client())
+        self.assertTrue(clients[0].is_closed)
+        self.assertFalse(clients[1].is_closed)
+
+        asyncio.run(service.aclose())
+        self.assertTrue(clients[1].is_closed)
+        self.assertIsNone(service._async_client)
+
+    def test_lifespan_shutdown_closes_client(self):
+        """ASGI lifespan shutdown closes the service's async client"""
+        service = OllamaLLMService()
+        messages = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message['type'])
+
+        async def run():
+            client = service._get_async_client()
+            await asgi.application({'type': 'lifespan'}, receive, send)
+            return client
+
+        with mock.patch.object(llm_service, '_llm_service', service), \
+                mock.patch.object(asgi, 'DB_EXECUTOR'):
+            client = asyncio.run(run())
+        self.assertEqual(sent, ['lifespan.startup.complete', 'lifespan.shutdown.complete'])
+        self.assertTrue(client.is_closed)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
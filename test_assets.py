@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Tests for fingerprinted static assets
+"""
+
+import gzip
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+os.environ['DATABASE_URL'] = 'sqlite://'  # throwaway database; must be set before app is imported
+
+import assets
+from app import app
+
+
+class TestAssets(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        os.makedirs(os.path.join(self.tmp.name, 'css'))
+        with open(os.path.join(self.tmp.name, 'css', 'site.css'), 'w') as f:
+            f.write('body { color: #333; }\n' * 50)
+        patcher = mock.patch.object(assets, 'STATIC_DIR', self.tmp.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+        self.client = app.test_client()
+
+    def url(self, path):
+        with app.test_request_context():
+            return assets.asset_url(path)
+
+    def test_fingerprinted_urls(self):
+        """Fingerprinted URLs are immutable; vendor files fall back to the CDN until fetched"""
+        url = self.url('css/site.css')
+        self.assertRegex(url, r'^/assets/css/site\.[0-9a-f]{10}\.css$')
+        self.assertEqual(assets.split_fingerprint(url[len('/assets/'):]), ('css/site.css', url[-14:-4]))
+        self.assertEqual(assets.split_fingerprint('js/jquery.min.js'), ('js/jquery.min.js', None))
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('immutable', response.headers['Cache-Control'])
+        self.assertNotIn('immutable', self.client.get('/assets/css/site.css').headers['Cache-Control'])
+        self.assertEqual(self.client.get('/assets/../app.py').status_code, 404)
+
+        vendor_path = 'vendor/jquery-3.6.0/jquery.min.js'
+        self.assertEqual(self.url(vendor_path), assets.VENDOR[vendor_path])
+        os.makedirs(os.path.join(self.tmp.name, 'vendor', 'jquery-3.6.0'))
+        with open(os.path.join(self.tmp.name, *vendor_path.split('/')), 'w') as f:
+            f.write('/*! jQuery */')
+        self.assertTrue(self.url(vendor_path).startswith('/assets/vendor/jquery-3.6.0/jquery.min.'))
+
+    def test_precompressed_variant(self):
+        """Clients accepting gzip get the built .gz copy"""
+        self.assertGreaterEqual(assets.build(), 1)
+        url = self.url('css/site.css')
+        response = self.client.get(url, headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response.headers['Vary'])
+        self.assertTrue(gzip.decompress(response.data).startswith(b'body'))
+        self.assertNotIn('Content-Encoding', self.client.get(url).headers)
+
+    def test_accept_encoding_quality(self):
+        """q=0 refuses an encoding; '*' accepts it"""
+        assets.build()
+        url = self.url('css/site.css')
+        for header, expected in (('gzip;q=0', None), ('br, gzip;q=0', None), ('identity, *;q=0.5', 'gzip'),
+                                 ('*, gzip;q=0', None), ('deflate, GZIP;q=0.8', 'gzip')):
+            with self.subTest(header=header):
+                response = self.client.get(url, headers={'Accept-Encoding': header})
+                self.assertEqual(response.headers.get('Content-Encoding'), expected)
+
+    def test_build_requires_vendor_files(self):
+        """The deploy build fails while vendor files are missing, unless the CDN is allowed"""
+        with mock.patch('builtins.print'):
+            self.assertEqual(assets.main(['build']), 1)
+            self.assertEqual(assets.main(['build', '--allow-cdn']), 0)
+
+            for path in assets.VENDOR:
+                os.makedirs(os.path.dirname(os.path.join(self.tmp.name, *path.split('/'))), exist_ok=True)
+                with open(os.path.join(self.tmp.name, *path.split('/')), 'w') as f:
+                    f.write('@font-face { src: url("../webfonts/fa.woff2?v=6"); }' if path.endswith('all.min.css') else '')
+            self.assertEqual(assets.missing_vendor_files(), ['vendor/fontawesome-6.0.0/webfonts/fa.woff2'])
+            self.assertEqual(assets.main(['build']), 1)
+
+            os.makedirs(os.path.join(self.tmp.name, 'vendor', 'fontawesome-6.0.0', 'webfonts'))
+            open(os.path.join(self.tmp.name, 'vendor', 'fontawesome-6.0.0', 'webfonts', 'fa.woff2'), 'w').close()
+            self.assertEqual(assets.main(['build']), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Tests for the few-shot example store
+"""
+
+import math
+import os
+import tempfile
+import unittest
+from datetime import date
+from unittest import mock
+
+from flask import Flask
+
+import example_store
+from example_store import DIMENSIONS, ExampleStore, feature_vector, rebuild_from_database, rebuild_in_background
+from llm_config import EXAMPLE_STORE_CONFIG
+from models import db, User, Schedule, ScheduleFeedback
+
+
+def schedule(task_type, block='9:00 AM - 11:00 AM'):
+    return {'schedule': [{'time': block, 'task': f'{task_type} block', 'type': task_type, 'priority': 'high'}]}
+
+
+class ExampleStoreTestCase(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.config = dict(EXAMPLE_STORE_CONFIG, index_path=os.path.join(tmp.name, 'index.json'))
+
+
+class TestFeatureVector(unittest.TestCase):
+    def test_unit_length(self):
+        """Vectors are normalized and encode role, energy and the task mix"""
+        vector = feature_vector('Student', 'morning', ['study', 'study', 'health'], [60, 120])
+        self.assertEqual(len(vector), DIMENSIONS)
+        self.assertAlmostEqual(math.sqrt(sum(v * v for v in vector)), 1.0)
+        self.assertGreater(vector[0], 0)  # student
+        self.assertEqual(vector[2], 0)  # not 'other role'
+
+    def test_other_role(self):
+        """Unknown or missing roles fall in the 'other role' slot"""
+        self.assertEqual(feature_vector('retired', None, [], [])[2], 1.0)
+        self.assertEqual(feature_vector(None, None, [], [])[2], 1.0)
+
+
+class TestRanking(ExampleStoreTestCase):
+    def test_most_similar_first(self):
+        """Rated schedules closest to the request rank above other examples"""
+        store = ExampleStore(self.config)
+        store.add_schedule('working professional', 'night', schedule('work'), 5)
+        store.add_schedule('student', 'morning', schedule('study'), 4)
+        tasks = [{'type': 'study', 'duration': '2h'}]
+        top = store.query({'role': 'student', 'peak_energy': 'morning'}, tasks, k=2)
+        self.assertEqual(top[0]['role'], 'student')
+        self.assertEqual(top[0]['rating'], 4)
+        self.assertEqual(len(top), 2)
+
+    def test_pure_python_matches_numpy(self):
+        """Scoring without numpy returns the same ranking"""
+        if example_store.numpy is None:
+            self.skipTest('numpy is not installed')
+        store = ExampleStore(self.config)
+        store.add_schedule('student', 'evening', schedule('college'), 5)
+        profile, tasks = {'role': 'student', 'peak_energy': 'evening'}, [{'type': 'college'}]
+        vectorized = store.query(profile, tasks, k=3)
+        with mock.patch.object(example_store, 'numpy', None):
+            self.assertEqual(store.query(profile, tasks, k=3), vectorized)
+
+    def test_feedback_during_rebuild_keeps_store_stale(self):
+        """A rebuild of rows read before new feedback does not clear the stale mark"""
+        store = ExampleStore(self.config)
+        generation = store.generation
+        store.mark_stale()
+        store.rebuild([], generation)
+        self.assertTrue(store.needs_rebuild())
+        store.rebuild([], store.generation)
+        self.assertFalse(store.needs_rebuild())
+
+
+class TestRebuild(ExampleStoreTestCase):
+    def setUp(self):
+        super().setUp()
+        self.app = Flask(__name__)
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+        db.init_app(self.app)
+        with self.app.app_context():
+            db.create_all()
+            user = User(username='examples', email='examples@example.com', password_hash='x',
+                        role='student', peak_energy='morning')
+            db.session.add(user)
+            db.session.flush()
+            liked = Schedule(user_id=user.id, date=date(2025, 1, 1), schedule_data=schedule('study'))
+            disliked = Schedule(user_id=user.id, date=date(2025, 1, 2), schedule_data=schedule('work'))
+            rated = Schedule(user_id=user.id, date=date(2025, 1, 3), schedule_data=schedule('health'), user_rating=5)
+            db.session.add_all([liked, disliked, rated])
+            db.session.flush()
+            db.session.add_all([
+                ScheduleFeedback(schedule_id=liked.id, user_id=user.id, overall_rating=5),
+                ScheduleFeedback(schedule_id=liked.id, user_id=user.id, overall_rating=4),
+                ScheduleFeedback(schedule_id=disliked.id, user_id=user.id, overall_rating=2),
+            ])
+            db.session.commit()
+
+    def rated_types(self, store):
+        return sorted(example['items'][0]['type'] for example in store.examples if example['rating'])
+
+    def test_indexes_highly_rated_schedules(self):
+        """Schedules averaging min_rating or more are indexed and persisted"""
+        store = ExampleStore(self.config)
+        with self.app.app_context():
+            rebuild_from_database(store)
+        self.assertEqual(self.rated_types(store), ['health', 'study'])
+        self.assertFalse(store.needs_rebuild())
+
+        loaded = ExampleStore(self.config)
+        self.assertTrue(loaded.load())
+        self.assertEqual(self.rated_types(loaded), ['health', 'study'])
+
+    def test_background_rebuild(self):
+        """Queries are answered while the index is rebuilt on another thread"""
+        store = ExampleStore(self.config)
+        seeds = len(store)
+        self.assertTrue(rebuild_in_background(store, self.app))
+        self.assertGreaterEqual(len(store.query({}, [])), 1)
+        self.assertTrue(example_store._rebuild_lock.acquire(timeout=10))
+        example_store._rebuild_lock.release()
+        self.assertEqual(len(store), seeds + 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Tests for the running feedback aggregates
+"""
+
+import unittest
+from datetime import date
+
+from flask import Flask
+
+from models import db, User, Schedule, ScheduleFeedback, FeedbackRollup, UserStats
+
+
+class TestFeedbackRollup(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+        db.init_app(self.app)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        self.users = [User(username=f'rollup{i}', email=f'rollup{i}@example.com', password_hash='x') for i in range(2)]
+        db.session.add_all(self.users)
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def give(self, user, overall, accuracy=None, positive=(), negative=()):
+        schedule = Schedule(user_id=user.id, date=date(2025, 1, len(ScheduleFeedback.query.all()) + 1), schedule_data={})
+        db.session.add(schedule)
+        db.session.flush()
+        feedback = ScheduleFeedback(schedule_id=schedule.id, user_id=user.id, overall_rating=overall,
+                                    accuracy_rating=accuracy, positive_aspects=list(positive), negative_aspects=list(negative))
+        db.session.add(feedback)
+        FeedbackRollup.record(feedback)
+        db.session.commit()
+        return feedback
+
+    def test_totals_per_user_and_global(self):
+        """Each insert updates its user's and the global totals"""
+        first, second = self.users
+        self.give(first, 4, accuracy=5, positive=['breaks'])
+        self.give(first, 2, negative=['too packed'])
+        self.give(second, 5, positive=['breaks'])
+
+        user = FeedbackRollup.get(first.id)
+        self.assertEqual((user.feedback_count, user.average_rating), (2, 3.0))
+        self.assertEqual(user.means()['accuracy'], 5.0)
+        site = FeedbackRollup.get(FeedbackRollup.GLOBAL).summary(top_aspects=3)
+        self.assertEqual(site['feedback_count'], 3)
+        self.assertEqual(site['top_positive_aspects'], {'breaks': 2})
+        self.assertEqual(FeedbackRollup.for_user(second.id)['user']['mean_ratings']['overall'], 5.0)
+
+    def test_rebuild_keeps_archived_feedback(self):
+        """Feedback deleted by retention stays in the totals after a rebuild"""
+        first, second = self.users
+        old = self.give(first, 1, negative=['late'])
+        self.give(first, 5)
+        self.give(second, 3)
+        before = FeedbackRollup.get(FeedbackRollup.GLOBAL).summary(top_aspects=3)
+
+        FeedbackRollup.archive([old])
+        ScheduleFeedback.query.filter_by(id=old.id).delete()
+        db.session.commit()
+        self.assertEqual(FeedbackRollup.get(FeedbackRollup.GLOBAL).summary(top_aspects=3), before)
+
+        FeedbackRollup.rebuild()
+        db.session.commit()
+        self.assertEqual(FeedbackRollup.get(FeedbackRollup.GLOBAL).summary(top_aspects=3), before)
+        self.assertEqual(FeedbackRollup.get(first.id).feedback_count, 2)
+        self.assertEqual(FeedbackRollup.get(first.id).average_rating, 3.0)
+
+        UserStats.rebuild()
+        db.session.commit()
+        self.assertIsNotNone(db.session.get(UserStats, first.id).last_activity_at)
+
+
+if __name__ == '__main__':
+    unittest.main()
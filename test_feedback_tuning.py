@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Tests for feedback-driven sampling parameters
+"""
+
+import unittest
+
+from llm_service import OllamaLLMService
+
+
+def summary(count, accuracy=None, realism=None, overall=None, positive=0, negative=0):
+    return {
+        'feedback_count': count,
+        'mean_ratings': {'overall': overall, 'accuracy': accuracy, 'realism': realism, 'helpfulness': None},
+        'positive_count': positive,
+        'negative_count': negative,
+    }
+
+
+class TestFeedbackTuning(unittest.TestCase):
+    def setUp(self):
+        self.service = OllamaLLMService()
+        self.base = self.service._get_optimal_parameters('moderate', '')
+
+    def test_no_feedback_keeps_defaults(self):
+        """Without enough feedback the base parameters are used"""
+        stats = {'user': summary(2, accuracy=1), 'global': summary(3, accuracy=1)}
+        self.assertEqual(self.service._get_optimal_parameters('moderate', '', stats), self.base)
+
+    def test_low_ratings_lower_temperature(self):
+        """Poor accuracy and realism make generation more deterministic"""
+        stats = {'user': summary(10, accuracy=1, realism=2), 'global': summary(100, accuracy=5, realism=5)}
+        params = self.service._get_optimal_parameters('moderate', '', stats)
+        self.assertLess(params['temperature'], self.base['temperature'])
+
+    def test_global_stats_used_for_new_users(self):
+        """Users below min_feedback_count fall back to global aggregates"""
+        stats = {'user': summary(1, accuracy=5), 'global': summary(50, overall=1.5)}
+        params = self.service._get_optimal_parameters('moderate', '', stats)
+        self.assertLess(params['temperature'], self.base['temperature'])
+
+    def test_negative_aspects_narrow_top_p(self):
+        """A majority of negative aspect mentions lowers top_p"""
+        stats = {'user': summary(10, overall=4, positive=1, negative=9), 'global': summary(0)}
+        params = self.service._get_optimal_parameters('moderate', '', stats)
+        self.assertLess(params['top_p'], self.base['top_p'])
+        self.assertEqual(params['temperature'], self.base['temperature'])
+
+
+if __name__ == '__main__':
+    unittest.main()
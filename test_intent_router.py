@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Tests for the local chat intent router
+"""
+
+import unittest
+
+from intent_router import IntentRouter
+
+
+class TestIntentRouter(unittest.TestCase):
+    def setUp(self):
+        self.router = IntentRouter()
+
+    def test_greeting_is_answered_locally(self):
+        """Plain greetings get a templated response"""
+        result = self.router.respond("Hello!", {'name': 'Alex'})
+        self.assertEqual(result['intent'], 'greeting')
+        self.assertIn('Alex', result['response'])
+
+    def test_greeting_without_name(self):
+        """Missing template values fall back to defaults"""
+        result = self.router.respond("hey there", {'name': None})
+        self.assertIn('Hello there', result['response'])
+
+    def test_scheduling_keywords_match_word_prefixes(self):
+        """Scheduling keywords match inflected forms"""
+        self.assertEqual(self.router.classify("Can you help with planning my tasks?"), 'scheduling')
+        self.assertEqual(self.router.classify("Hi, please organize my week"), 'scheduling')
+
+    def test_general_questions_need_the_model(self):
+        """Messages without a local intent return None"""
+        self.assertIsNone(self.router.respond("Write a Python function to reverse a string"))
+        self.assertIsNone(self.router.respond(""))
+
+    def test_config_extension(self):
+        """New intents can be added through configuration"""
+        router = IntentRouter({
+            'intent_keywords': {'weather': ['weather', 'forecast']},
+            'intent_responses': {'weather': "I can't check the weather, {name}."},
+        })
+        result = router.respond("What's the forecast?")
+        self.assertEqual(result['response'], "I can't check the weather, there.")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Tests for tolerant schedule JSON extraction
+"""
+
+import unittest
+
+from json_extractor import StreamingJSONExtractor, extract_schedule, repair_json
+
+
+ITEM = '{"time": "7:00 AM - 7:30 AM", "task": "Morning routine", "reason": "Start", "type": "health"}'
+
+
+class TestJSONExtractor(unittest.TestCase):
+    def test_trailing_prose_is_ignored(self):
+        """Text after the top-level object does not break parsing"""
+        text = 'Here you go:\n{"schedule": [%s], "tips": ["Hydrate"]}\nHope this helps! {}' % ITEM
+        data = extract_schedule(text)
+        self.assertEqual(len(data['schedule']), 1)
+        self.assertEqual(data['tips'], ["Hydrate"])
+
+    def test_common_defects_are_repaired(self):
+        """Trailing commas, bare keys and Python literals are fixed"""
+        text = '{schedule: [{time: "9:00 AM - 10:00 AM", task: "Study, review", done: False,},],}'
+        data = extract_schedule(text)
+        self.assertEqual(data['schedule'][0]['task'], "Study, review")
+        self.assertEqual(data['schedule'][0]['type'], 'general')
+
+    def test_strings_are_left_untouched(self):
+        """Repairs never rewrite string contents"""
+        self.assertEqual(repair_json('{"a": "x,}", "b": "None"}'), '{"a": "x,}", "b": "None"}')
+
+    def test_truncated_schedule_is_recovered(self):
+        """A cut-off generation keeps its complete schedule items"""
+        text = '{"schedule": [%s, %s, {"time": "9:00 AM' % (ITEM, ITEM)
+        data = extract_schedule(text)
+        self.assertEqual(len(data['schedule']), 2)
+
+    def test_invalid_items_are_dropped(self):
+        """Items without required fields fail validation"""
+        text = '{"schedule": [{"task": "No time"}, %s, "junk"]}' % ITEM
+        data = extract_schedule(text)
+        self.assertEqual(len(data['schedule']), 1)
+        self.assertIsNone(extract_schedule('{"schedule": []}'))
+        self.assertIsNone(extract_schedule('no json here'))
+
+    def test_streaming_detects_object_close(self):
+        """The extractor reports completion as soon as the object closes"""
+        extractor = StreamingJSONExtractor()
+        chunks = ['{"sched', 'ule": [', ITEM, '], "note": "}"', '}', ' trailing']
+        results = [extractor.feed(chunk) for chunk in chunks]
+        self.assertEqual(results, [False, False, False, False, True, True])
+        self.assertEqual(len(extract_schedule('', extractor)['schedule']), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Tests for schedule generation budgets and streamed reads
+"""
+
+import json
+import threading
+import time
+import unittest
+from unittest import mock
+
+from json_extractor import extract_schedule
+from llm_config import MODEL_CONFIG
+from llm_service import OllamaLLMService
+
+BUDGET = MODEL_CONFIG['token_budget']
+
+
+class FakeResponse:
+    """Stands in for a requests response of the generate endpoint"""
+
+    def __init__(self, pieces, done_reason='stop'):
+        self.lines = [json.dumps({'response': piece, 'done': False}).encode() for piece in pieces]
+        self.lines.append(json.dumps({'response': '', 'done': True, 'done_reason': done_reason,
+                                      'eval_count': len(pieces)}).encode())
+        self.read = 0
+
+    def iter_lines(self):
+        for line in self.lines:
+            self.read += 1
+            yield line
+
+    def json(self):
+        return {'response': ''.join(json.loads(line)['response'] for line in self.lines), 'done': True}
+
+
+class TestTokenBudget(unittest.TestCase):
+    def setUp(self):
+        self.service = OllamaLLMService()
+
+    def test_scales_with_tasks(self):
+        """Each pending task adds one schedule item's worth of tokens"""
+        tasks = [{'description': f'Task {i}'} for i in range(10)]
+        expected = BUDGET['base_tokens'] + BUDGET['tokens_per_item'] * (10 + BUDGET['fixed_items'])
+        self.assertEqual(self.service._estimate_token_budget(tasks, 10000), expected)
+        self.assertGreater(self.service._estimate_token_budget(tasks * 2, 10000), expected)
+
+    def test_clamped(self):
+        """Budgets stay within the minimum and the complexity level's maximum"""
+        with mock.patch.dict(BUDGET, min_tokens=5000):
+            self.assertEqual(self.service._estimate_token_budget([], 10000), 5000)
+        self.assertEqual(self.service._estimate_token_budget([{}] * 100, 2048), 2048)
+
+
+class TestReadGeneration(unittest.TestCase):
+    ITEM = '{"time": "9:00 AM - 10:00 AM", "task": "Study", "reason": "Peak", "type": "study"}'
+
+    def setUp(self):
+        self.service = OllamaLLMService()
+
+    def read(self, response, stream=True, on_token=None):
+        return self.service._read_generation(response, stream, 'read-generation-test', time.perf_counter(), on_token)
+
+    def test_stops_when_object_closes(self):
+        """Reading ends at the closing brace; trailing prose is never fetched"""
+        pieces = ['{"schedule": [', self.ITEM, '], "tips": ["a"],\n', ' "energy_optimization": "eo"\n', '}',
+                  '\n\nHope this helps!', ' More text']
+        response = FakeResponse(pieces)
+        tokens = []
+        extractor = self.read(response, on_token=tokens.append)
+        self.assertTrue(extractor.complete)
+        self.assertEqual(response.read, 5)
+        self.assertEqual(''.join(tokens), ''.join(pieces[:5]))
+        self.assertEqual(extract_schedule('', extractor)['energy_optimization'], 'eo')
+
+    def test_truncated_stream(self):
+        """A generation cut off mid-object keeps its complete nested values"""
+        response = FakeResponse(['{"schedule": [', self.ITEM, ', {"time": "10:'], done_reason='length')
+        extractor = self.read(response)
+        self.assertFalse(extractor.complete)
+        self.assertEqual(len(extract_schedule('', extractor)['schedule']), 1)
+
+    def test_not_streamed(self):
+        """Non-streamed responses are parsed from the single JSON body"""
+        extractor = self.read(FakeResponse(['{"schedule": [', self.ITEM, ']}']), stream=False)
+        self.assertTrue(extractor.complete)
+
+    def test_stop_sequences_keep_closing_brace(self):
+        """Ollama strips stop text, so no stop sequence may swallow the object's end"""
+        for stop in MODEL_CONFIG['stop_sequences']:
+            self.assertNotIn('}', stop)
+
+
+class TestSession(unittest.TestCase):
+    def test_one_session_per_thread(self):
+        """Threads sharing the service each get their own HTTP session"""
+        service = OllamaLLMService()
+        self.assertIs(service.session, service.session)
+        sessions = []
+        thread = threading.Thread(target=lambda: sessions.append(service.session))
+        thread.start()
+        thread.join()
+        self.assertIsNot(sessions[0], service.session)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Tests for password hashing parameters and login throttling
+"""
+
+import os
+import threading
+import unittest
+from unittest import mock
+
+os.environ['DATABASE_URL'] = 'sqlite://'  # throwaway database; must be set before app is imported
+
+from werkzeug.security import generate_password_hash
+
+from login_security import LoginBusy, PasswordHasher, TokenBucket
+
+
+class TestLoginSecurity(unittest.TestCase):
+    def test_token_bucket(self):
+        """A key gets its burst, then waits for refills; other keys are unaffected"""
+        bucket = TokenBucket(burst=2, per_minute=60)
+        with mock.patch('login_security.time.monotonic', return_value=100.0):
+            self.assertEqual(bucket.consume('ip:a'), 0)
+            self.assertEqual(bucket.consume('ip:a'), 0)
+            self.assertAlmostEqual(bucket.consume('ip:a'), 1.0)
+            self.assertEqual(bucket.consume('ip:b'), 0)
+        with mock.patch('login_security.time.monotonic', return_value=101.0):
+            self.assertEqual(bucket.consume('ip:a'), 0)
+        bucket.reset('ip:a')
+        self.assertEqual(bucket.consume('ip:a'), 0)
+
+    def test_bucket_pruning(self):
+        """Idle keys are dropped once there are too many"""
+        bucket = TokenBucket(burst=1, per_minute=1, max_keys=10)
+        for i in range(25):
+            bucket.consume(f'ip:{i}')
+        self.assertLessEqual(len(bucket._buckets), 10)
+        self.assertIn('ip:24', bucket._buckets)
+
+    def test_rehash_detection(self):
+        """Hashes with other parameters or another method need upgrading"""
+        hasher = PasswordHasher('pbkdf2:sha256:1000')
+        current = hasher.hash('secret')
+        self.assertTrue(hasher.verify(current, 'secret'))
+        self.assertFalse(hasher.verify(current, 'wrong'))
+        self.assertFalse(hasher.needs_rehash(current))
+        self.assertTrue(hasher.needs_rehash(generate_password_hash('secret', 'pbkdf2:sha256:2000')))
+        self.assertTrue(hasher.needs_rehash(generate_password_hash('secret', 'scrypt:1024:8:1')))
+
+    def test_bounded_queue(self):
+        """Checks beyond the workers plus queue are turned away"""
+        hasher = PasswordHasher('pbkdf2:sha256:1000', workers=1, max_queue=0)
+        release = threading.Event()
+        hasher._executor.submit(release.wait)  # Occupy the worker without taking a slot
+        hasher._slots.acquire()
+        try:
+            with self.assertRaises(LoginBusy):
+                hasher.verify('pbkdf2:sha256:1000$x$y', 'secret')
+        finally:
+            hasher._slots.release()
+            release.set()
+        self.assertFalse(hasher.verify('pbkdf2:sha256:1000$x$y', 'secret'))
+
+
+class TestLoginRoute(unittest.TestCase):
+    def setUp(self):
+        from app import app, db
+        from models import User
+        self.app = app
+        app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+        self.hasher = app.extensions['password_hasher']
+        self.limits = app.extensions['login_limits']
+        with app.app_context():
+            db.create_all()
+            User.query.filter_by(username='login_test').delete()
+            user = User(username='login_test', email='login_test@example.com',
+                        password_hash=generate_password_hash('secret', 'pbkdf2:sha256:1000'))
+            db.session.add(user)
+            db.session.commit()
+        for bucket in self.limits.values():
+            bucket._buckets.clear()
+
+    def tearDown(self):
+        from app import db
+        from models import User
+        with self.app.app_context():
+            User.query.filter_by(username='login_test').delete()
+            db.session.commit()
+        self.app.config['WTF_CSRF_ENABLED'] = True
+
+    def test_login_upgrades_hash(self):
+        """Logging in rehashes a password stored with outdated parameters"""
+        from models import User
+        with mock.patch.object(self.hasher, 'method', 'pbkdf2:sha256:2000'):
+            response = self.app.test_client().post('/login', data={'username': 'login_test', 'password': 'secret'})
+            self.assertEqual(response.status_code, 302)
+            with self.app.app_context():
+                stored = User.query.filter_by(username='login_test').first().password_hash
+            self.assertTrue(stored.startswith('pbkdf2:sha256:2000$'))
+
+    def test_repeated_failures_throttled(self):
+        """A username is locked out after its burst of failed attempts"""
+        client = self.app.test_client()
+        statuses = [client.post('/login', data={'username': 'login_test', 'password': 'wrong'}).status_code
+                    for _ in range(self.limits['user'].burst + 1)]
+        self.assertEqual(statuses[:-1], [200] * self.limits['user'].burst)
+        self.assertEqual(statuses[-1], 429)
+
+    def test_unknown_user_still_hashes(self):
+        """A missing account costs a password check like a wrong password does"""
+        with mock.patch.object(self.hasher, 'method', 'pbkdf2:sha256:2000'), \
+                mock.patch.object(self.hasher, 'verify', wraps=self.hasher.verify) as verify:
+            response = self.app.test_client().post('/login', data={'username': 'login_missing', 'password': 'secret'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Invalid username or password', response.get_data(as_text=True))
+        verify.assert_called_once()
+        self.assertTrue(verify.call_args.args[0].startswith('pbkdf2:sha256:2000$'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Tests for the Prometheus exposition of in-process metrics
+"""
+
+import unittest
+from unittest import mock
+
+from flask import Flask
+from sqlalchemy import create_engine, exc, text
+
+import metrics
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        # Test metrics go in a private registry, not the app's /metrics output
+        self.registry = []
+
+    def test_counter_renders_labels(self):
+        """Counters render one escaped sample per label set"""
+        counter = metrics.Counter('test_events_total', 'Test events', ['kind'], registry=self.registry)
+        counter.inc(kind='a "quoted" kind')
+        counter.inc(2, kind='a "quoted" kind')
+        lines = counter.render()
+        self.assertEqual(lines[1], '# TYPE test_events_total counter')
+        self.assertIn('test_events_total{kind="a \\"quoted\\" kind"} 3', lines)
+        self.assertNotIn(counter, metrics.REGISTRY)
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Histogram buckets count every observation at or below the bound"""
+        histogram = metrics.Histogram('test_latency_seconds', 'Test latency', buckets=(0.1, 1.0), registry=self.registry)
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe(value)
+        lines = metrics.render(self.registry).splitlines()
+        self.assertIn('test_latency_seconds_bucket{le="0.1"} 1', lines)
+        self.assertIn('test_latency_seconds_bucket{le="1.0"} 2', lines)
+        self.assertIn('test_latency_seconds_bucket{le="+Inf"} 3', lines)
+        self.assertIn('test_latency_seconds_count 3', lines)
+        self.assertNotIn('test_latency_seconds', metrics.render())
+
+    def test_ollama_timings(self):
+        """Ollama nanosecond durations are recorded in seconds"""
+        metrics.observe_ollama({'model': 'test-model', 'eval_count': 42, 'eval_duration': 2e9,
+                                'prompt_eval_duration': 5e8, 'total_duration': 3e9})
+        text = metrics.render()
+        self.assertIn('ollama_eval_tokens_total{model="test-model"} 42', text)
+        self.assertIn('ollama_eval_duration_seconds_sum{model="test-model"} 2.0', text)
+        self.assertIn('ollama_overhead_duration_seconds_sum{model="test-model"} 0.5', text)
+
+    def test_failed_query_is_not_left_timing(self):
+        """A statement that raises does not leave its start time on the connection"""
+        engine = create_engine('sqlite://')
+        with engine.connect() as conn:
+            with self.assertRaises(exc.OperationalError):
+                conn.execute(text('SELECT * FROM no_such_table'))
+            self.assertEqual(conn.info.get('query_started'), [])
+            conn.execute(text('SELECT 1'))
+            self.assertEqual(conn.info['query_started'], [])
+        engine.dispose()
+
+
+
+class TestMetricsEndpoint(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        metrics.init_app(self.app)
+        self.client = self.app.test_client()
+
+    def scrape(self, remote_addr, **headers):
+        return self.client.get('/metrics', environ_base={'REMOTE_ADDR': remote_addr}, headers=headers).status_code
+
+    def test_loopback_only_without_token(self):
+        """Without METRICS_TOKEN only local clients may scrape"""
+        with mock.patch.dict('os.environ', {'METRICS_TOKEN': ''}):
+            self.assertEqual(self.scrape('127.0.0.1'), 200)
+            self.assertEqual(self.scrape('::1'), 200)
+            self.assertEqual(self.scrape('203.0.113.7'), 403)
+
+    def test_token_required_when_set(self):
+        """With METRICS_TOKEN every client needs the bearer token, local ones too"""
+        self.app.config['METRICS_TOKEN'] = 's3cret'
+        self.assertEqual(self.scrape('203.0.113.7', Authorization='Bearer s3cret'), 200)
+        self.assertEqual(self.scrape('203.0.113.7', Authorization='Bearer wrong'), 401)
+        self.assertEqual(self.scrape('127.0.0.1'), 401)
+
+
+if __name__ == '__main__':
+    unittest.main()
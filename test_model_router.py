@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Tests for routing schedule requests to models by task complexity
+"""
+
+import json
+import unittest
+from unittest import mock
+
+from llm_service import OllamaLLMService
+from model_router import ModelRouter
+
+ROUTES = {
+    'simple': ['phi3:mini', 'mistral'],
+    'moderate': ['mistral:latest'],
+    'complex': ['mixtral', 'mistral'],
+}
+SCHEDULE = json.dumps({'schedule': [{'time': '9:00 AM - 10:00 AM', 'task': 'Task 0', 'type': 'work'}]})
+
+
+def tasks(count, priority='low', duration='30m'):
+    return [{'description': f'Task {i}', 'priority': priority, 'duration': duration} for i in range(count)]
+
+
+class TestCandidates(unittest.TestCase):
+    def setUp(self):
+        self.router = ModelRouter(routes=ROUTES, default_model='mistral', model_list_ttl=300)
+
+    def test_unknown_model_list_tries_whole_route(self):
+        """Before Ollama is asked, every routed model is tried, default last"""
+        self.assertEqual(self.router.candidates('simple'), ['phi3:mini', 'mistral'])
+        self.assertEqual(self.router.candidates('moderate'), ['mistral'])
+        self.assertEqual(self.router.candidates('unknown'), ['mistral'])
+        self.assertTrue(self.router.needs_refresh())
+
+    def test_skips_unpulled_models(self):
+        """Only pulled models are tried once the model list is known"""
+        self.router.update_available_models(['mistral:latest', 'llama3'])
+        self.assertFalse(self.router.needs_refresh())
+        self.assertEqual(self.router.candidates('simple'), ['mistral'])
+        self.assertEqual(self.router.candidates('complex'), ['mistral'])
+
+    def test_default_when_nothing_pulled(self):
+        """The default model is still tried when no routed model is pulled"""
+        self.router.update_available_models([])
+        self.assertEqual(self.router.candidates('complex'), ['mistral'])
+
+    def test_mark_unavailable(self):
+        """A model Ollama reports as missing drops out of its route"""
+        self.router.mark_unavailable('phi3:mini')
+        self.assertEqual(self.router.candidates('simple'), ['mistral'])
+        self.assertEqual(self.router.candidates('complex'), ['mixtral', 'mistral'])
+
+    def test_model_list_expires(self):
+        """The pulled-model list is refreshed after the TTL"""
+        router = ModelRouter(routes=ROUTES, default_model='mistral', model_list_ttl=0)
+        router.update_available_models(['mistral'])
+        with mock.patch('model_router.time.monotonic', return_value=router._available_at + 1):
+            self.assertTrue(router.needs_refresh())
+
+
+class TestRecord(unittest.TestCase):
+    def test_stats_per_route_and_model(self):
+        """Latency and quality are averaged per route and model"""
+        router = ModelRouter(routes=ROUTES, default_model='mistral')
+        router.record('simple', 'phi3:mini', 1.0, quality=80)
+        router.record('simple', 'phi3:mini', 2.0, quality=60)
+        router.record('simple', 'phi3:mini', 3.0, success=False)
+        router.record('complex', 'mistral', 4.0)
+
+        stats = {(s['route'], s['model']): s for s in router.get_stats()}
+        self.assertEqual(stats[('simple', 'phi3:mini')], {
+            'route': 'simple', 'model': 'phi3:mini', 'requests': 3, 'failures': 1,
+            'avg_latency': 2.0, 'avg_quality': 70.0,
+        })
+        self.assertIsNone(stats[('complex', 'mistral')]['avg_quality'])
+
+
+class TestComplexity(unittest.TestCase):
+    def setUp(self):
+        self.service = OllamaLLMService()
+
+    def test_by_task_count(self):
+        """More than 4 tasks is moderate, more than 8 complex"""
+        complexity = self.service._calculate_task_complexity
+        self.assertEqual(complexity([]), 'simple')
+        self.assertEqual(complexity(tasks(4)), 'simple')
+        self.assertEqual(complexity(tasks(5)), 'moderate')
+        self.assertEqual(complexity(tasks(9)), 'complex')
+
+    def test_by_priority_and_hours(self):
+        """Many high-priority tasks or long days also raise the level"""
+        complexity = self.service._calculate_task_complexity
+        self.assertEqual(complexity(tasks(3, priority='high')), 'moderate')
+        self.assertEqual(complexity(tasks(2, duration='4h')), 'moderate')
+        self.assertEqual(complexity(tasks(3, duration='4h')), 'complex')
+
+
+class FakeSession:
+    """Answers Ollama calls; models in `missing` return 404"""
+
+    def __init__(self, pulled, missing=()):
+        self.pulled = pulled
+        self.missing = set(missing)
+        self.generated = []
+
+    def get(self, url, timeout=None):
+        return mock.Mock(status_code=200, json=lambda: {'models': [{'name': name} for name in self.pulled]})
+
+    def post(self, url, json=None, timeout=None, stream=False):
+        self.generated.append(json['model'])
+        response = mock.MagicMock(status_code=404 if json['model'] in self.missing else 200)
+        response.__enter__.return_value = response
+        response.json.return_value = {'response': SCHEDULE, 'done': True}
+        return response
+
+
+class TestRouting(unittest.TestCase):
+    def generate(self, session, task_list):
+        service = OllamaLLMService()
+        service.router = ModelRouter(routes=ROUTES, default_model='mistral')
+        service._local.session = session
+        with mock.patch.dict('llm_service.MODEL_CONFIG', stream_schedule=False):
+            schedule = service.generate_schedule({'name': 'Router'}, task_list)
+        return schedule, service.router
+
+    def test_routes_by_task_count(self):
+        """A short list goes to the small model and a long one to the large model"""
+        session = FakeSession(['phi3:mini', 'mistral', 'mixtral'])
+        self.generate(session, tasks(2))
+        self.generate(session, tasks(10))
+        self.assertEqual(session.generated, ['phi3:mini', 'mixtral'])
+
+    def test_falls_back_when_model_missing(self):
+        """A 404 from Ollama moves on to the next model in the route"""
+        session = FakeSession(['phi3:mini', 'mistral'], missing=['phi3:mini'])
+        schedule, router = self.generate(session, tasks(2))
+        self.assertEqual(session.generated, ['phi3:mini', 'mistral'])
+        self.assertEqual(schedule['schedule'][0]['task'], 'Task 0')
+        self.assertEqual([s['model'] for s in router.get_stats()], ['mistral'])
+        self.assertEqual(router.candidates('simple'), ['mistral'])
+
+
+if __name__ == '__main__':
+    unittest.main()
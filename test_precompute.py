@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Tests for the overnight schedule precomputation helpers
+"""
+
+import io
+import os
+import threading
+import time
+import unittest
+from contextlib import redirect_stdout
+from datetime import date
+from unittest import mock
+
+os.environ['DATABASE_URL'] = 'sqlite://'  # throwaway database; must be set before app is imported
+
+from app import app, _precomputed_schedule
+from migrate_db import migrate_database
+from models import db, User, Task, Schedule, UserStats
+from precompute import RateLimiter, run_precompute
+
+USERNAME = 'precompute_test'
+DAY = date(2031, 5, 6)
+SCHEDULE = {'schedule': [{'time': '9:00 AM - 10:00 AM', 'task': 'Essay', 'type': 'study'}], 'overall_quality': 80}
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_spaces_calls_across_threads(self):
+        """Concurrent callers are released one interval apart"""
+        limiter = RateLimiter(per_minute=60 / 0.05)
+        released = []
+
+        def call():
+            limiter.wait()
+            released.append(time.monotonic())
+
+        threads = [threading.Thread(target=call) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        released.sort()
+        gaps = [later - earlier for earlier, later in zip(released, released[1:])]
+        self.assertTrue(all(gap >= 0.04 for gap in gaps), gaps)
+
+    def test_unlimited(self):
+        """A rate of 0 never waits"""
+        limiter = RateLimiter(per_minute=0)
+        started = time.monotonic()
+        for _ in range(100):
+            limiter.wait()
+        self.assertLess(time.monotonic() - started, 0.05)
+
+
+class TestRunPrecompute(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with redirect_stdout(io.StringIO()):
+            migrate_database()
+
+    def setUp(self):
+        self.cleanup()
+        with app.app_context():
+            user = User(username=USERNAME, email=f'{USERNAME}@example.com', password_hash='x')
+            db.session.add(user)
+            db.session.flush()
+            db.session.add(Task(user_id=user.id, description='Essay', priority='high', duration='1h',
+                                type='study', status='pending'))
+            db.session.commit()
+            self.user_id = user.id
+        self.llm = mock.Mock()
+        self.llm.generate_schedule.return_value = dict(SCHEDULE)
+        patchers = [mock.patch('app.get_llm_service', return_value=self.llm),
+                    mock.patch('app._few_shot_examples', return_value=[]),
+                    mock.patch('precompute.pending_user_ids', return_value=[self.user_id])]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.cleanup()
+
+    def cleanup(self):
+        with app.app_context():
+            user = User.query.filter_by(username=USERNAME).first()
+            if user:
+                Schedule.query.filter_by(user_id=user.id).delete()
+                Task.query.filter_by(user_id=user.id).delete()
+                UserStats.query.filter_by(user_id=user.id).delete()
+                db.session.delete(user)
+                db.session.commit()
+
+    def run_precompute(self):
+        return run_precompute(app, DAY.isoformat(), workers=1, per_minute=0, stop_at='')
+
+    def stored(self):
+        with app.app_context():
+            return Schedule.query.filter_by(user_id=self.user_id, date=DAY).first()
+
+    def test_stores_llm_schedule(self):
+        """The task ids go in their own column and the schedule is served unchanged"""
+        self.assertEqual(self.run_precompute()['llm'], 1)
+        with app.app_context():
+            schedule = Schedule.query.filter_by(user_id=self.user_id, date=DAY).one()
+            pending = Task.query.filter_by(user_id=self.user_id).all()
+            self.assertEqual((schedule.source, schedule.task_ids), ('precomputed', [pending[0].id]))
+            served = _precomputed_schedule(self.user_id, DAY.isoformat(), '', pending)
+            self.assertEqual(served, SCHEDULE)
+
+            # A changed task list or a prompt means a fresh schedule
+            self.assertIsNone(_precomputed_schedule(self.user_id, DAY.isoformat(), '', []))
+            self.assertIsNone(_precomputed_schedule(self.user_id, DAY.isoformat(), 'busy day', pending))
+
+    def test_skips_users_while_ollama_is_down(self):
+        """No rule-based schedule is stored for the morning when Ollama is down"""
+        self.llm.check_ollama_status.return_value = False
+        result = self.run_precompute()
+        self.assertEqual((result['llm'], result['unavailable']), (0, 1))
+        self.assertIsNone(self.stored())
+
+        self.llm.check_ollama_status.return_value = True
+        self.llm.generate_schedule.return_value = None
+        self.assertEqual(self.run_precompute()['unavailable'], 1)
+        self.assertIsNone(self.stored())
+
+    def test_ignores_rows_from_older_runs(self):
+        """Precomputed rows without task_ids are regenerated"""
+        with app.app_context():
+            pending = Task.query.filter_by(user_id=self.user_id).all()
+            legacy = dict(SCHEDULE, task_ids=[pending[0].id], engine='rule')
+            Schedule.upsert(self.user_id, DAY, legacy, 'precomputed')
+            self.assertIsNone(_precomputed_schedule(self.user_id, DAY.isoformat(), '', pending))
+
+
+if __name__ == '__main__':
+    unittest.main()
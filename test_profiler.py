@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Tests for the opt-in request profiler
+"""
+
+import threading
+import time
+import unittest
+
+from profiler import StackSampler, sign_token, verify_token
+
+
+class TestProfiler(unittest.TestCase):
+    def test_signed_tokens(self):
+        """Only unexpired tokens signed with the secret are accepted"""
+        token = sign_token('secret', ttl=60)
+        self.assertTrue(verify_token('secret', token))
+        self.assertFalse(verify_token('other', token))
+        self.assertFalse(verify_token('', token))
+        self.assertFalse(verify_token('secret', sign_token('secret', ttl=-1)))
+        self.assertFalse(verify_token('secret', 'not-a-token'))
+
+    def test_sampler_collapses_stacks(self):
+        """Samples of a busy thread come out as folded stack lines"""
+        def busy_wait():
+            deadline = time.perf_counter() + 0.1
+            while time.perf_counter() < deadline:
+                pass
+
+        sampler = StackSampler(threading.get_ident(), 0.002).start()
+        busy_wait()
+        sampler.stop()
+
+        lines = sampler.collapsed().splitlines()
+        self.assertTrue(lines)
+        stack, count = lines[0].rsplit(' ', 1)
+        self.assertIn('busy_wait (test_profiler.py', stack)
+        self.assertGreater(int(count), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
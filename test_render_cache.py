@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Tests for template fragment caching and render timing
+"""
+
+import os
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+os.environ['DATABASE_URL'] = 'sqlite://'  # throwaway database; must be set before app is imported
+
+from flask import render_template_string
+
+import metrics
+from app import app
+from render_cache import FragmentCache, rows_version
+
+TEMPLATE = "{% call cached_fragment('items', version) %}{% for item in items %}{{ item }};{% endfor %}{% endcall %}"
+
+
+class TestRenderCache(unittest.TestCase):
+    def setUp(self):
+        cache = FragmentCache(max_entries=2)
+        patcher = mock.patch.dict(app.extensions, {'fragment_cache': cache})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = cache
+
+    def render(self, user_id, items, version):
+        user = SimpleNamespace(get_id=lambda: user_id)
+        with app.test_request_context(), mock.patch('render_cache.current_user', user):
+            return render_template_string(TEMPLATE, items=items, version=version)
+
+    def test_keyed_by_user_and_version(self):
+        """Cached output is reused only for the same user and version"""
+        self.assertEqual(self.render('1', ['<a>'], 1), '&lt;a&gt;;')
+        self.assertEqual(self.render('1', ['changed'], 1), '&lt;a&gt;;')
+        self.assertEqual(self.render('1', ['changed'], 2), 'changed;')
+        self.assertEqual(self.render('2', ['other'], 2), 'other;')
+        self.assertEqual(len(self.cache), 2)
+
+    def test_rows_version(self):
+        """Row versions change with any displayed field"""
+        task = SimpleNamespace(id=1, status='pending', description='Read', priority='high', duration='1h',
+                               type='study', preferences=None, added_date=None, completed_date=None)
+        before = rows_version([task])
+        task.status = 'completed'
+        self.assertNotEqual(rows_version([task]), before)
+
+    def test_render_time_recorded(self):
+        """Template render time is added to the route's timings"""
+        def rendered_count():
+            for line in metrics.render().splitlines():
+                if line.startswith('http_request_render_seconds_count{route="/login"}'):
+                    return int(line.rsplit(' ', 1)[1])
+            return 0
+
+        before = rendered_count()
+        app.test_client().get('/login')
+        self.assertEqual(rendered_count(), before + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
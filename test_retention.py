@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Tests for archiving old schedules and their feedback
+"""
+
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from flask import Flask
+
+from models import db, User, Schedule, ScheduleArchive, ScheduleFeedback, FeedbackRollup, UserStats
+from retention import run_retention
+
+
+class TestRetention(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+        db.init_app(self.app)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        patcher = mock.patch.dict('retention.RETENTION_CONFIG', batch_pause_seconds=0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        db.create_all()
+        user = User(username='retention', email='retention@example.com', password_hash='x')
+        db.session.add(user)
+        db.session.flush()
+        self.user_id = user.id
+        today = datetime.utcnow().date()
+        self.old = self.add_schedule(today - timedelta(days=200), 'Old plan', user_rating=4)
+        self.older = self.add_schedule(today - timedelta(days=300), 'Older plan')
+        self.recent = self.add_schedule(today - timedelta(days=5), 'Recent plan')
+        self.add_feedback(self.old, 4, accuracy=5, negative=['too packed'])
+        self.add_feedback(self.old, 2)
+        self.add_feedback(self.recent, 5)
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def add_schedule(self, day, task, **columns):
+        schedule = Schedule(user_id=self.user_id, date=day, source='llm', created_at=datetime.utcnow(),
+                            schedule_data={'schedule': [{'time': '9:00 AM - 10:00 AM', 'task': task}]}, **columns)
+        db.session.add(schedule)
+        db.session.flush()
+        return schedule.id
+
+    def add_feedback(self, schedule_id, overall, accuracy=None, negative=()):
+        feedback = ScheduleFeedback(schedule_id=schedule_id, user_id=self.user_id, overall_rating=overall,
+                                    accuracy_rating=accuracy, negative_aspects=list(negative))
+        db.session.add(feedback)
+        FeedbackRollup.record(feedback)
+
+    def test_archives_outside_hot_window(self):
+        """Old schedules move to the archive; their feedback is deleted but stays counted"""
+        self.assertEqual(run_retention(days=90, dry_run=True)['pending'], 2)
+        result = run_retention(days=90, batch_size=1)
+        self.assertEqual((result['archived'], result['batches']), (2, 2))
+
+        self.assertEqual([row.id for row in Schedule.query.all()], [self.recent])
+        self.assertEqual([row.schedule_id for row in ScheduleFeedback.query.all()], [self.recent])
+
+        archived = ScheduleArchive.query.filter_by(schedule_id=self.old).one()
+        self.assertEqual(archived.schedule_data['schedule'][0]['task'], 'Old plan')
+        self.assertEqual((archived.user_id, archived.source, archived.user_rating), (self.user_id, 'llm', 4))
+
+        rollup = db.session.get(FeedbackRollup, (self.user_id, FeedbackRollup.ARCHIVED))
+        self.assertEqual((rollup.feedback_count, rollup.overall_sum), (2, 6))
+        self.assertEqual((rollup.accuracy_sum, rollup.accuracy_count), (5, 1))
+        self.assertEqual(rollup.negative_count, 1)
+        total = FeedbackRollup.get(self.user_id)
+        self.assertEqual((total.feedback_count, total.overall_sum), (3, 11))
+
+        # Rebuilt summaries still count what was archived
+        UserStats.rebuild()
+        FeedbackRollup.rebuild()
+        db.session.commit()
+        self.assertEqual(db.session.get(UserStats, self.user_id).schedule_count, 3)
+        self.assertEqual(FeedbackRollup.get(self.user_id).overall_sum, 11)
+
+        self.assertEqual(run_retention(days=90)['archived'], 0)
+
+    def test_max_batches_resumes(self):
+        """A run stops after max_batches; the next one continues"""
+        self.assertEqual(run_retention(days=90, batch_size=1, max_batches=1)['archived'], 1)
+        self.assertEqual(run_retention(days=90, batch_size=1)['archived'], 1)
+        self.assertEqual(ScheduleArchive.query.count(), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
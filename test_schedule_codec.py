@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Tests for the compact schedule encoding
+"""
+
+import unittest
+
+from schedule_codec import MAGIC, decode_schedule, encode_schedule
+
+
+SCHEDULE = {
+    "schedule": [
+        {"time": "7:00 AM - 7:30 AM", "task": "Morning routine", "reason": "Start the day", "type": "health"},
+        {"time": "12:00 PM - 1:00 PM", "task": "Lunch", "reason": "Recharge", "type": "break",
+         "priority": "medium", "flexibility": "fixed"},
+        {"time": "11:30 PM - 12:15 AM", "task": "Reading", "reason": "Wind down", "type": "personal"},
+    ],
+    "daily_summary": "Balanced day",
+    "tips": ["Hydrate"],
+    "overall_quality": 82,
+}
+
+
+class TestScheduleCodec(unittest.TestCase):
+    def test_round_trip(self):
+        """Decoding returns exactly the encoded schedule"""
+        blob = encode_schedule(SCHEDULE)
+        self.assertTrue(blob.startswith(MAGIC))
+        self.assertEqual(decode_schedule(blob), SCHEDULE)
+
+    def test_irregular_values_are_preserved(self):
+        """Non-canonical times, non-string fields and extra keys survive"""
+        data = {"schedule": [
+            {"time": "07:00 AM - 7:30 AM", "task": "Run", "type": None, "done": True},
+            {"time": "Evening", "task": "Call family"},
+            {"task": "No time given", "duration_minutes": 30},
+        ]}
+        self.assertEqual(decode_schedule(encode_schedule(data)), data)
+
+    def test_unexpected_shapes_are_preserved(self):
+        """Schedules without an item list still round-trip"""
+        for data in ({}, {"schedule": "free day"}, {"schedule": [1, 2]}):
+            self.assertEqual(decode_schedule(encode_schedule(data)), data)
+
+    def test_smaller_than_json(self):
+        """Encoded schedules are smaller than their JSON text"""
+        import json
+        data = {"schedule": SCHEDULE["schedule"] * 10}
+        self.assertLess(len(encode_schedule(data)), len(json.dumps(data)) / 2)
+
+    def test_rejects_foreign_data(self):
+        """Blobs in another format raise ValueError"""
+        with self.assertRaises(ValueError):
+            decode_schedule(b'{"schedule": []}')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Tests for schedule overlap, gap and commitment checks
+"""
+
+import unittest
+
+from llm_service import OllamaLLMService
+from schedule_intervals import diagnose_schedule, find_overlaps, schedule_intervals
+
+PROFILE = {
+    'sleep_schedule': {'wake_time': '7:00 AM', 'bedtime': '11:00 PM'},
+    # 2024-01-01 is a Monday
+    'weekly_schedule': {'Monday': {'start': '9:00 AM', 'end': '1:00 PM', 'type': 'college/work'}},
+}
+
+
+def block(time, task, type='work'):
+    return {'time': time, 'task': task, 'type': type}
+
+
+class TestScheduleIntervals(unittest.TestCase):
+    def test_overlapping_pairs(self):
+        """Every double-booked pair is reported once, with the shared time"""
+        items = [
+            block('9:00 AM - 11:00 AM', 'A'),
+            block('10:00 AM - 10:30 AM', 'B'),
+            block('10:15 AM - 12:00 PM', 'C'),
+            block('12:00 PM - 1:00 PM', 'D'),  # Touching is not overlapping
+            block('later', 'E'),
+        ]
+        intervals, unparsed = schedule_intervals(items)
+        overlaps = find_overlaps(intervals)
+        self.assertEqual(unparsed, [4])
+        self.assertEqual(sorted(tuple(o['items']) for o in overlaps), [(0, 1), (0, 2), (1, 2)])
+        self.assertIn({'items': [1, 2], 'tasks': ['B', 'C'], 'time': '10:15 AM - 10:30 AM', 'minutes': 15}, overlaps)
+
+    def test_commitments_and_gaps(self):
+        """Blocks during class hours or sleep collide; the class block itself does not"""
+        items = [
+            block('7:00 AM - 8:00 AM', 'Morning routine', 'health'),
+            block('9:00 AM - 1:00 PM', 'College', 'college/work'),
+            block('12:00 PM - 2:00 PM', 'Gym', 'health'),
+            block('10:30 PM - 12:30 AM', 'Gaming', 'personal'),
+        ]
+        diagnostics = diagnose_schedule(items, PROFILE, '2024-01-01')
+        self.assertEqual(diagnostics['overlaps'][0]['items'], [1, 2])
+        self.assertEqual([(c['task'], c['commitment'], c['minutes']) for c in diagnostics['commitment_conflicts']],
+                         [('Gym', 'college/work', 60), ('Gaming', 'sleep', 90)])
+        self.assertEqual(diagnostics['gaps'], [{'time': '2:00 PM - 10:30 PM', 'minutes': 510}])
+
+        # Class hours only apply on their weekday
+        tuesday = diagnose_schedule(items, PROFILE, '2024-01-02')
+        self.assertEqual([c['task'] for c in tuesday['commitment_conflicts']], ['Gaming'])
+
+    def test_realism_penalized(self):
+        """Double-booked schedules score lower and say why"""
+        service = OllamaLLMService()
+        clean = {'schedule': [
+            block('9:00 AM - 10:00 AM', 'Study'),
+            block('10:00 AM - 10:30 AM', 'Coffee', 'break'),
+        ]}
+        clashing = {'schedule': clean['schedule'] + [block('9:30 AM - 10:30 AM', 'Email')]}
+
+        clean = service._validate_and_score_schedule(clean, {}, [])
+        clashing = service._validate_and_score_schedule(clashing, {}, [])
+        self.assertEqual(clean['diagnostics']['overlaps'], [])
+        self.assertEqual(len(clashing['diagnostics']['overlaps']), 2)
+        self.assertLess(clashing['productivity_score']['realism'], clean['productivity_score']['realism'])
+        self.assertTrue(any('overlap' in s for s in clashing['improvement_suggestions']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests for the one-row-per-date schedule upsert
+"""
+
+import unittest
+from datetime import date
+from unittest import mock
+
+from flask import Flask
+
+from models import db, User, Schedule, UserStats
+
+
+def make_app():
+    """Standalone app on an in-memory database with the current schema"""
+    app = Flask(__name__)
+    app.config.update(SQLALCHEMY_DATABASE_URI='sqlite://', SCHEDULE_COMPACT_STORAGE=True)
+    db.init_app(app)
+    return app
+
+
+class TestScheduleUpsert(unittest.TestCase):
+    def setUp(self):
+        self.app = make_app()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        user = User(username='upsert', email='upsert@example.com', password_hash='x')
+        db.session.add(user)
+        db.session.commit()
+        self.user_id = user.id
+        self.day = date(2025, 1, 6)
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def stored(self):
+        rows = Schedule.query.filter_by(user_id=self.user_id, date=self.day).all()
+        self.assertEqual(len(rows), 1)
+        return rows[0]
+
+    def check_upserts(self):
+        self.assertTrue(Schedule.upsert(self.user_id, self.day, {'schedule': ['a'], 'overall_quality': 70}, 'llm'))
+        row = self.stored()
+        self.assertEqual(row.schedule_data['schedule'], ['a'])
+        self.assertEqual(row.quality_score, 70)
+        created_at = row.created_at
+
+        self.assertTrue(Schedule.upsert(self.user_id, self.day, {'schedule': ['b']}, 'rule'))
+        db.session.expire_all()
+        row = self.stored()
+        self.assertEqual(row.schedule_data['schedule'], ['b'])
+        self.assertEqual(row.source, 'rule')
+        self.assertEqual(row.created_at, created_at)
+
+        self.assertFalse(Schedule.upsert(self.user_id, self.day, {'schedule': ['c']}, 'precomputed', overwrite=False))
+        db.session.expire_all()
+        self.assertEqual(self.stored().schedule_data['schedule'], ['b'])
+
+        # Only the insert counts as a new schedule
+        self.assertEqual(db.session.get(UserStats, self.user_id).schedule_count, 1)
+
+    def test_on_conflict(self):
+        """Insert, overwrite and overwrite=False with INSERT ... ON CONFLICT"""
+        self.check_upserts()
+
+    def test_generic_fallback(self):
+        """Same behaviour through the read-modify-write path"""
+        with mock.patch('models._upsert_insert', return_value=None):
+            self.check_upserts()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Tests for what importing the app loads and does
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+# Runs in a fresh interpreter so modules imported by other tests don't count
+SCRIPT = """
+import json, sys
+from sqlalchemy import inspect
+import app
+loaded = sorted(name for name in ('llm_service', 'tracker', 'requests') if name in sys.modules)
+with app.app.app_context():
+    before = inspect(app.db.engine).get_table_names()
+response = app.app.test_client().get('/login')
+with app.app.app_context():
+    after = inspect(app.db.engine).get_table_names()
+    admin = app.User.query.filter_by(username='admin').count() if 'user' in after else 0
+print(json.dumps({'loaded': loaded, 'before': before, 'after': after, 'admin': admin, 'status': response.status_code}))
+"""
+
+
+class TestStartup(unittest.TestCase):
+    def start(self, auto_init):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'startup.db')}", AUTO_INIT_DB=auto_init)
+            env.pop('VERCEL', None)
+            result = subprocess.run([sys.executable, '-c', SCRIPT], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                    env=env, capture_output=True, text=True, timeout=60)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+    def test_import_skips_llm_modules(self):
+        """Importing the app loads neither the LLM service, the CLI tracker nor requests"""
+        self.assertEqual(self.start('0')['loaded'], [])
+
+    def test_auto_init_on_first_request(self):
+        """With AUTO_INIT_DB the first request creates the tables and admin user"""
+        state = self.start('1')
+        self.assertEqual(state['before'], [])
+        self.assertIn('user', state['after'])
+        self.assertIn('task', state['after'])
+        self.assertEqual((state['admin'], state['status']), (1, 200))
+
+    def test_no_auto_init_by_default(self):
+        """Without AUTO_INIT_DB requests leave the database alone"""
+        self.assertEqual(self.start('0')['after'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Tests for completing and deleting tasks in batches
+"""
+
+import io
+import os
+import unittest
+from contextlib import redirect_stdout
+
+os.environ['DATABASE_URL'] = 'sqlite://'  # throwaway database; must be set before app is imported
+
+from app import app, TASK_BATCH_LIMIT
+from migrate_db import migrate_database
+from models import db, User, Task, UserStats
+
+PREFIX = 'taskbatch_'
+
+
+class TestTaskBatch(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with redirect_stdout(io.StringIO()):
+            migrate_database()
+
+    def setUp(self):
+        self.cleanup()
+        with app.app_context():
+            users = [User(username=f'{PREFIX}{name}', email=f'{PREFIX}{name}@example.com', password_hash='x')
+                     for name in ('owner', 'other')]
+            db.session.add_all(users)
+            db.session.flush()
+            self.owner, self.other = [user.id for user in users]
+            statuses = ['pending', 'pending', 'pending', 'completed']
+            tasks = [Task(user_id=self.owner, description=f'Task {i}', priority='medium', duration='1h',
+                          type='work', status=status) for i, status in enumerate(statuses)]
+            foreign = Task(user_id=self.other, description='Not yours', priority='low', duration='1h',
+                           type='work', status='pending')
+            db.session.add_all(tasks + [foreign])
+            db.session.flush()
+            db.session.add(UserStats(user_id=self.owner, pending_task_count=3, completed_task_count=1,
+                                     schedule_count=0))
+            db.session.commit()
+            self.tasks = [task.id for task in tasks]
+            self.foreign = foreign.id
+        self.client = app.test_client()
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(self.owner)
+            session['_fresh'] = True
+
+    def tearDown(self):
+        self.cleanup()
+
+    def cleanup(self):
+        with app.app_context():
+            ids = [user_id for (user_id,) in db.session.query(User.id).filter(User.username.startswith(PREFIX))]
+            Task.query.filter(Task.user_id.in_(ids)).delete()
+            UserStats.query.filter(UserStats.user_id.in_(ids)).delete()
+            User.query.filter(User.id.in_(ids)).delete()
+            db.session.commit()
+
+    def batch(self, operations):
+        return self.client.post('/api/tasks/batch', json={'operations': operations})
+
+    def statuses(self, user_id):
+        with app.app_context():
+            return dict(db.session.query(Task.id, Task.status).filter_by(user_id=user_id))
+
+    def counts(self):
+        with app.app_context():
+            stats = db.session.get(UserStats, self.owner)
+            return stats.pending_task_count, stats.completed_task_count
+
+    def test_mixed_complete_and_delete(self):
+        """Completes and deletes apply together and the user counters follow"""
+        pending, other, unchanged, completed = self.tasks
+        response = self.batch([
+            {'id': pending, 'action': 'complete'},
+            {'id': other, 'action': 'delete'},
+            {'id': completed, 'action': 'delete'},
+            {'id': other, 'action': 'complete'},
+            {'id': 'x', 'action': 'complete'},
+            {'id': unchanged, 'action': 'archive'},
+        ])
+        self.assertEqual(response.status_code, 200)
+        results = [(r['id'], r['status'], r['message']) for r in response.get_json()['results']]
+        self.assertEqual(results, [
+            (pending, 'success', 'Task completed'),
+            (other, 'success', 'Task deleted'),
+            (completed, 'success', 'Task deleted'),
+            (other, 'error', 'Task deleted in the same batch'),
+            ('x', 'error', 'Invalid task id'),
+            (unchanged, 'error', 'Unknown action'),
+        ])
+        self.assertEqual(self.statuses(self.owner), {pending: 'completed', unchanged: 'pending'})
+        # 3 pending / 1 completed -> one completed, one pending and one completed deleted
+        self.assertEqual(self.counts(), (1, 1))
+
+    def test_completing_twice_counts_once(self):
+        """Tasks that were already completed do not move the counters again"""
+        self.batch([{'id': task_id, 'action': 'complete'} for task_id in self.tasks])
+        self.assertEqual(self.counts(), (0, 4))
+        self.batch([{'id': self.tasks[0], 'action': 'complete'}])
+        self.assertEqual(self.counts(), (0, 4))
+
+    def test_other_users_task(self):
+        """Another user's task is reported as not found and left alone"""
+        response = self.batch([{'id': self.foreign, 'action': 'delete'},
+                               {'id': self.foreign, 'action': 'complete'}])
+        self.assertEqual([r['message'] for r in response.get_json()['results']], ['Task not found'] * 2)
+        self.assertEqual(self.statuses(self.other), {self.foreign: 'pending'})
+        self.assertEqual(self.counts(), (3, 1))
+
+    def test_rejects_oversized_and_empty_batches(self):
+        """More than TASK_BATCH_LIMIT operations, or none, are rejected outright"""
+        operations = [{'id': self.tasks[0], 'action': 'complete'}] * (TASK_BATCH_LIMIT + 1)
+        self.assertEqual(self.batch(operations).status_code, 400)
+        self.assertEqual(self.batch([]).status_code, 400)
+        self.assertEqual(self.statuses(self.owner)[self.tasks[0]], 'pending')
+        self.assertEqual(self.batch(operations[:TASK_BATCH_LIMIT]).status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
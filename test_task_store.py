@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Tests for the tracker.py storage backends
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from flask import Flask
+
+from models import db, Task, UserStats
+from task_store import JsonFileStore, OpLogStore, SqlStore, atomic_write_json, import_json_files
+
+
+def _task(task_id):
+    return {"id": task_id, "description": f"task {task_id}", "priority": "high", "duration": "1h",
+            "type": "study", "preferences": "", "status": "pending", "added_date": "2025-11-19"}
+
+
+class TestOpLogStore(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def _store(self, **kwargs):
+        return OpLogStore(self.data_dir, fsync=False, **kwargs)
+
+    def test_replays_log_and_drops_torn_tail(self):
+        """Appended changes survive a reload; a half-written last line is ignored"""
+        store = self._store()
+        store.save_profile({"name": "chinu"})
+        store.add_task(_task("1"))
+        store.add_task(_task("2"))
+        store.complete_task("1", "2025-11-20")
+        with open(os.path.join(self.data_dir, OpLogStore.LOG), 'ab') as f:
+            f.write(b'{"seq": 5, "op": "add", "task": {"id": "3"')
+
+        store = self._store()
+        self.assertEqual(store.load_profile(), {"name": "chinu"})
+        self.assertEqual([t["id"] for t in store.load_tasks()["pending"]], ["2"])
+        self.assertEqual(store.load_tasks()["completed"][0]["completed_date"], "2025-11-20")
+
+        store.add_task(_task("4"))
+        self.assertEqual([t["id"] for t in self._store().load_tasks()["pending"]], ["2", "4"])
+
+    def test_compaction_moves_completed_to_history(self):
+        """Compaction writes a snapshot without completed tasks and empties the log"""
+        store = self._store(compact_after_ops=3)
+        store.add_task(_task("1"))
+        store.add_task(_task("2"))
+        store.complete_task("1", "2025-11-20")
+
+        with open(os.path.join(self.data_dir, OpLogStore.SNAPSHOT)) as f:
+            snapshot = json.load(f)
+        self.assertEqual([t["id"] for t in snapshot["pending"]], ["2"])
+        self.assertNotIn("completed", snapshot)
+        self.assertEqual(os.path.getsize(os.path.join(self.data_dir, OpLogStore.LOG)), 0)
+
+        tasks = self._store().load_tasks()
+        self.assertFalse(tasks.completed_loaded)
+        self.assertEqual([t["id"] for t in tasks["completed"]], ["1"])
+
+    def test_interrupted_compaction_is_not_applied_twice(self):
+        """History written past the snapshot and already folded ops are skipped"""
+        store = self._store()
+        store.add_task(_task("1"))
+        store.compact()
+        store.complete_task("1", "2025-11-20")
+        log_path = os.path.join(self.data_dir, OpLogStore.LOG)
+        with open(log_path, 'rb') as f:
+            log = f.read()
+        store.compact()
+        # Crash after the history append and snapshot, before the log was reset
+        with open(log_path, 'wb') as f:
+            f.write(log)
+        with open(os.path.join(self.data_dir, OpLogStore.HISTORY), 'ab') as f:
+            f.write(b'{"id": "1", "status": "completed"}\n')
+
+        store = self._store()
+        self.assertEqual(store.load_tasks()["pending"], [])
+        self.assertEqual([t["id"] for t in store.load_tasks()["completed"]], ["1"])
+
+    def test_imports_legacy_json_files(self):
+        """An empty store is seeded from user_profile.json and tasks_data.json"""
+        legacy_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, legacy_dir)
+        legacy = JsonFileStore(os.path.join(legacy_dir, 'profile.json'), os.path.join(legacy_dir, 'tasks.json'))
+        legacy.save_profile({"name": "chinu"})
+        legacy.save_tasks({"pending": [_task("1")], "completed": [_task("2")], "schedules": {}})
+
+        store = self._store(legacy_store=legacy)
+        self.assertEqual(store.load_profile()["name"], "chinu")
+        self.assertEqual([t["id"] for t in store.load_tasks()["completed"]], ["2"])
+
+    def test_bulk_add_is_one_write(self):
+        """add_tasks logs every task with a single write and fsync"""
+        store = OpLogStore(self.data_dir, fsync=True)
+        with mock.patch('task_store.os.fsync') as fsync:
+            store.add_tasks([_task(str(i)) for i in range(50)])
+        self.assertEqual(fsync.call_count, 1)
+        self.assertEqual(len(self._store().load_tasks()["pending"]), 50)
+
+        legacy = JsonFileStore(os.path.join(self.data_dir, 'profile.json'), os.path.join(self.data_dir, 'tasks.json'))
+        with mock.patch('task_store.atomic_write_json', wraps=atomic_write_json) as write:
+            legacy.add_tasks([_task(str(i)) for i in range(50)])
+        self.assertEqual(write.call_count, 1)
+
+    def test_concurrent_writers_keep_each_others_ops(self):
+        """A store catches up on ops other processes appended before writing its own"""
+        first, second = self._store(), self._store()
+        first.load_tasks()
+        second.load_tasks()
+        first.add_task(_task("1"))
+        second.add_task(_task("2"))
+        first.complete_task("2", "2025-11-20")
+
+        with open(os.path.join(self.data_dir, OpLogStore.LOG)) as f:
+            seqs = [json.loads(line)["seq"] for line in f]
+        self.assertEqual(seqs, [1, 2, 3])
+        tasks = self._store().load_tasks()
+        self.assertEqual([t["id"] for t in tasks["pending"]], ["1"])
+        self.assertEqual([t["id"] for t in tasks["completed"]], ["2"])
+
+    def test_writer_reloads_after_another_compacts(self):
+        """Ops folded into another store's snapshot are neither lost nor replayed twice"""
+        first, second = self._store(), self._store()
+        first.load_tasks()
+        second.add_task(_task("1"))
+        second.compact()
+        first.add_task(_task("2"))
+        self.assertEqual([t["id"] for t in self._store().load_tasks()["pending"]], ["1", "2"])
+        second.add_task(_task("3"))
+        self.assertEqual([t["id"] for t in self._store().load_tasks()["pending"]], ["1", "2", "3"])
+
+
+class TestSqlStore(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+        db.init_app(self.app)
+        self.legacy_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.legacy_dir)
+        self.profile_file = os.path.join(self.legacy_dir, 'profile.json')
+        self.tasks_file = os.path.join(self.legacy_dir, 'tasks.json')
+        legacy = JsonFileStore(self.profile_file, self.tasks_file)
+        legacy.save_profile({"name": "chinu", "peak_energy": "night", "weekly_schedule": {"Friday": {}}})
+        legacy.save_tasks({"pending": [_task("a"), _task("b")],
+                           "completed": [dict(_task("c"), status="completed", completed_date="2025-11-21")],
+                           "schedules": {"2025-11-20": {"schedule": [{"time": "9:00 AM - 10:00 AM", "task": "x"}]}}})
+
+    def test_import_then_use_from_cli(self):
+        """Imported JSON data is served by SqlStore and CLI changes land in the tables"""
+        with self.app.app_context():
+            db.create_all()
+            result = import_json_files('chinu', self.profile_file, self.tasks_file)
+            self.assertEqual((result['pending'], result['completed'], result['schedules']), (2, 1, 1))
+            self.assertIn('password', result)
+            with self.assertRaises(ValueError):
+                import_json_files('chinu', self.profile_file, self.tasks_file)
+
+        store = SqlStore('chinu', app=self.app)
+        try:
+            self.assertEqual(store.load_profile()['peak_energy'], 'night')
+            tasks = store.load_tasks()
+            self.assertEqual(len(tasks['pending']), 2)
+            self.assertEqual(tasks['completed'][0]['completed_date'], '2025-11-21')
+            self.assertIn('2025-11-20', tasks['schedules'])
+
+            added = [_task("new"), _task("newer")]
+            store.add_tasks(added)
+            self.assertTrue(all(task['id'].isdigit() for task in added))
+            store.complete_task(tasks['pending'][0]['id'], '2025-11-22')
+            user_id = store._get_user().id
+            self.assertEqual(Task.query.filter_by(user_id=user_id, status='pending').count(), 3)
+            stats = db.session.get(UserStats, user_id)
+            self.assertEqual((stats.pending_task_count, stats.completed_task_count), (3, 2))
+        finally:
+            store.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
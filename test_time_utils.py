@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Tests for the clock time parsing and formatting helpers
+"""
+
+import unittest
+from datetime import datetime
+
+from time_utils import clock_datetime, format_clock, parse_clock, parse_range, range_minutes, shift_clock
+
+
+class TestTimeUtils(unittest.TestCase):
+    def test_parse_clock(self):
+        """12-hour and 24-hour times parse to minutes since midnight"""
+        self.assertEqual(parse_clock('7:00 AM'), 420)
+        self.assertEqual(parse_clock(' 12:30 pm '), 750)
+        self.assertEqual(parse_clock('12:00 AM'), 0)
+        self.assertEqual(parse_clock('19:05'), 1145)
+        for invalid in ('13:00 PM', '0:30 AM', '24:00', '7:60 AM', 'noon', '', None):
+            self.assertIsNone(parse_clock(invalid), invalid)
+
+    def test_parse_range(self):
+        """Blocks parse to (start, end); a bare start borrows the end's meridiem"""
+        self.assertEqual(parse_range('9:00 AM - 11:00 AM'), (540, 660))
+        self.assertEqual(parse_range('6:30 - 7:00 PM'), (1110, 1140))
+        self.assertEqual(parse_range('11:30 - 12:30 PM'), (690, 750))
+        self.assertIsNone(parse_range('Generated by AI'))
+        self.assertEqual(range_minutes('1:00 PM - 2:30 PM'), 90)
+        self.assertEqual(range_minutes('11:00 PM - 1:00 AM'), 60)
+
+    def test_format_and_shift_keep_style(self):
+        """Formatting wraps at midnight and keeps the 12/24-hour style of the input"""
+        self.assertEqual(format_clock(0), '12:00 AM')
+        self.assertEqual(format_clock(1440 + 65), '1:05 AM')
+        self.assertEqual(format_clock(425, twelve_hour=False), '07:05')
+        self.assertEqual(shift_clock('11:30 PM', 60), '12:30 AM')
+        self.assertEqual(shift_clock('08:00', -90), '06:30')
+        self.assertEqual(shift_clock('whenever', 30), 'whenever')
+        self.assertEqual(clock_datetime(450), datetime.strptime('7:30 AM', '%I:%M %p'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Tests for the scriptable tracker.py commands
+"""
+
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+import tracker
+from task_store import ScheduleCache
+
+
+class TestTrackerCli(unittest.TestCase):
+    def setUp(self):
+        self.profile_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.profile_dir)
+
+    def _run(self, argv, stdin=''):
+        out = io.StringIO()
+        original_stdin, sys.stdin = sys.stdin, io.StringIO(stdin)
+        try:
+            with redirect_stdout(out):
+                status = tracker.main(['--storage', 'json', '--profile', self.profile_dir] + argv)
+        finally:
+            sys.stdin = original_stdin
+        return status, [json.loads(line) for line in out.getvalue().splitlines()]
+
+    def test_add_reads_ndjson_from_stdin(self):
+        """Each input line becomes a stored pending task, echoed as NDJSON"""
+        status, added = self._run(['add'], '{"description": "read", "priority": "low"}\n\n{"description": "gym"}\n')
+        self.assertEqual(status, 0)
+        self.assertEqual([task['description'] for task in added], ['read', 'gym'])
+        status, listed = self._run(['tasks'])
+        self.assertEqual([task['id'] for task in listed], [task['id'] for task in added])
+        self.assertTrue(os.path.exists(os.path.join(self.profile_dir, 'tasks_data.json')))
+
+    def test_schedule_streams_one_record_per_date(self):
+        """Schedule results are one line per date; an incomplete profile is reported as an error"""
+        status, records = self._run(['schedule', '--start', '2025-11-20', '--days', '3'])
+        self.assertEqual(status, 1)
+        self.assertEqual([record['date'] for record in records], ['2025-11-20', '2025-11-21', '2025-11-22'])
+        self.assertEqual(records[0]['result']['error'], 'Profile incomplete')
+
+
+    def test_schedule_cache_keys_on_inputs(self):
+        """Cached schedules are found only for identical inputs and pruned to the limit"""
+        cache = ScheduleCache(os.path.join(self.profile_dir, 'cache'), max_entries=1)
+        profile, tasks = {"name": "chinu"}, [{"description": "read"}]
+        key = cache.key(profile, tasks, '2025-11-20')
+        self.assertNotEqual(key, cache.key(profile, tasks, '2025-11-21'))
+        cache.put(key, {"schedule": []})
+        self.assertEqual(cache.get(key), {"schedule": []})
+        cache.put(cache.key(profile, [], '2025-11-20'), {"schedule": []})
+        self.assertEqual(len(os.listdir(cache.directory)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
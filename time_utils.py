@@ -0,0 +1,134 @@
+"""
+Clock Time Parsing and Formatting
+Schedules describe times as strings like "7:00 AM" and blocks as
+"9:00 AM - 11:00 AM". This module turns them into minutes since midnight
+with a small hand-written parser instead of datetime.strptime (which is
+slow and locale-aware), memoizes the results - the same few dozen strings
+are parsed over and over by validation and the rule-based scheduler - and
+formats minutes back into the same styles.
+"""
+
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Optional, Tuple
+
+MINUTES_PER_DAY = 24 * 60
+
+_EPOCH = datetime(1900, 1, 1)
+
+
+@lru_cache(maxsize=2048)
+def parse_clock(value: str) -> Optional[int]:
+    """
+    Parse a clock time into minutes since midnight
+
+    Accepts 12-hour times with a meridiem ("7:00 AM", "12:30pm") and
+    24-hour times ("19:05").
+
+    Args:
+        value: Time string
+
+    Returns:
+        int: Minutes since midnight, or None if the string is not a time
+    """
+    if not isinstance(value, str):
+        return None
+    text = value.strip().upper()
+    meridiem = None
+    if text.endswith('AM') or text.endswith('PM'):
+        meridiem = text[-2:]
+        text = text[:-2].rstrip()
+    hour, sep, minute = text.partition(':')
+    if not sep or not hour.isdigit() or not minute.isdigit() or len(hour) > 2 or len(minute) > 2:
+        return None
+    h, m = int(hour), int(minute)
+    if m > 59:
+        return None
+    if meridiem:
+        if not 1 <= h <= 12:
+            return None
+        h = h % 12 + (12 if meridiem == 'PM' else 0)
+    elif h > 23:
+        return None
+    return h * 60 + m
+
+
+@lru_cache(maxsize=2048)
+def parse_range(value: str) -> Optional[Tuple[int, int]]:
+    """
+    Parse a block like "9:00 AM - 11:00 AM" into (start, end) minutes
+
+    A start without AM/PM takes the end's ("6:30 - 7:00 PM"). The end is
+    not adjusted for blocks that cross midnight; compare the two values
+    (or use range_minutes) to detect that.
+
+    Returns:
+        tuple: (start, end) minutes since midnight, or None if unparseable
+    """
+    if not isinstance(value, str):
+        return None
+    start, sep, end = value.partition('-')
+    if not sep:
+        return None
+    end_minutes = parse_clock(end)
+    if end_minutes is None:
+        return None
+    start = start.strip()
+    end_meridiem = end.strip()[-2:].upper()
+    if end_meridiem in ('AM', 'PM') and start[-2:].upper() not in ('AM', 'PM'):
+        start_minutes = parse_clock(f"{start} {end_meridiem}")
+        if start_minutes is not None and start_minutes > end_minutes:
+            # "11:30 - 12:30 PM" starts in the morning
+            start_minutes = parse_clock(f"{start} {'AM' if end_meridiem == 'PM' else 'PM'}")
+    else:
+        start_minutes = parse_clock(start)
+    if start_minutes is None:
+        return None
+    return start_minutes, end_minutes
+
+
+def range_minutes(value: str, default: int = 60) -> int:
+    """Length of a block in minutes (default if unparseable or not positive)"""
+    parsed = parse_range(value)
+    if parsed is None or parsed[1] <= parsed[0]:
+        return default
+    return parsed[1] - parsed[0]
+
+
+@lru_cache(maxsize=MINUTES_PER_DAY * 2)
+def format_clock(minutes: int, twelve_hour: bool = True) -> str:
+    """
+    Format minutes since midnight (wrapped to one day)
+
+    Returns:
+        str: "7:05 AM" style, or zero-padded "07:05" when twelve_hour is False
+    """
+    hour, minute = divmod(minutes % MINUTES_PER_DAY, 60)
+    if not twelve_hour:
+        return f"{hour:02d}:{minute:02d}"
+    return f"{(hour % 12) or 12}:{minute:02d} {'AM' if hour < 12 else 'PM'}"
+
+
+def format_range(start: int, end: int) -> str:
+    """(start, end) minutes -> "9:00 AM - 11:00 AM" """
+    return f"{format_clock(start)} - {format_clock(end)}"
+
+
+def shift_clock(value: str, minutes: int) -> str:
+    """
+    Move a clock time by a number of minutes, keeping its 12/24-hour style
+
+    Returns:
+        str: The shifted time, or the input unchanged if it is not a time
+    """
+    parsed = parse_clock(value)
+    if parsed is None:
+        return value
+    upper = value.upper()
+    return format_clock(parsed + minutes, 'AM' in upper or 'PM' in upper)
+
+
+@lru_cache(maxsize=MINUTES_PER_DAY)
+def clock_datetime(minutes: int) -> datetime:
+    """Minutes since midnight as a datetime on 1900-01-01 (what strptime returns)"""
+    return _EPOCH + timedelta(minutes=minutes)
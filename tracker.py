@@ -1,38 +1,66 @@
+import argparse
 import json
-import os
+import sys
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout
 from datetime import datetime, timedelta
-from typing import Dict, List, Any
+from typing import Dict, Iterable, Iterator, List, Any
+
+from task_store import ScheduleCache, get_task_store
+
+
+def make_task(description: str, priority: str = 'medium', duration: str = '1h', task_type: str = 'personal',
+              preferences: str = '') -> Dict:
+    """Build a pending task record"""
+    return {
+        "id": str(uuid.uuid4()),  # Add unique ID to each task
+        "description": description,
+        "priority": priority,
+        "duration": duration,
+        "type": task_type,
+        "preferences": preferences,
+        "status": "pending",
+        "added_date": datetime.now().strftime("%Y-%m-%d")
+    }
 
 class AITaskOptimizer:
-    def __init__(self):
-        self.profile_file = "user_profile.json"
-        self.tasks_file = "tasks_data.json"
-        self.user_profile = self.load_profile()
-        self.tasks = self.load_tasks()
+    def __init__(self, storage=None):
+        """
+        Args:
+            storage: Task store (default: backend selected by TRACKER_STORAGE,
+                see task_store.py). Nothing is read until first use.
+        """
+        self.storage = storage or get_task_store()
+        self.cache = ScheduleCache()
+    
+    @property
+    def user_profile(self) -> Dict:
+        return self.storage.load_profile()
+    
+    @property
+    def tasks(self) -> Dict:
+        return self.storage.load_tasks()
     
     def load_profile(self) -> Dict:
-        """Load user profile from file or create new one"""
-        if os.path.exists(self.profile_file):
-            with open(self.profile_file, 'r') as f:
-                return json.load(f)
-        return {}
+        """Load user profile from storage"""
+        return self.storage.load_profile()
     
     def save_profile(self):
-        """Save user profile to file"""
-        with open(self.profile_file, 'w') as f:
-            json.dump(self.user_profile, f, indent=2)
+        """Save user profile to storage"""
+        self.storage.save_profile(self.user_profile)
     
     def load_tasks(self) -> Dict:
-        """Load tasks from file"""
-        if os.path.exists(self.tasks_file):
-            with open(self.tasks_file, 'r') as f:
-                return json.load(f)
-        return {"pending": [], "completed": [], "schedules": {}}
+        """Load tasks from storage"""
+        return self.storage.load_tasks()
     
     def save_tasks(self):
-        """Save tasks to file"""
-        with open(self.tasks_file, 'w') as f:
-            json.dump(self.tasks, f, indent=2)
+        """Write all tasks out in one go (individual changes are saved as they happen)"""
+        self.storage.save_tasks(self.tasks)
+    
+    def complete_task(self, task_id: str, date_str: str = None):
+        """Mark a pending task as completed"""
+        return self.storage.complete_task(task_id, date_str or datetime.now().strftime("%Y-%m-%d"))
     
     def setup_profile(self):
         """Interactive profile setup"""
@@ -84,8 +112,6 @@ class AITaskOptimizer:
         print("\n=== ADD TASKS ===")
         print("Enter your tasks (type 'done' when finished)\n")
         
-        import uuid
-        
         tasks = []
         while True:
             task_desc = input("Task: ")
@@ -98,79 +124,35 @@ class AITaskOptimizer:
             task_type = input("  Type (study/work/personal/health/family): ")
             preferences = input("  Any preferences? (e.g., needs silence, outdoors, flexible): ")
             
-            task = {
-                "id": str(uuid.uuid4()),  # Add unique ID to each task
-                "description": task_desc,
-                "priority": priority,
-                "duration": duration,
-                "type": task_type,
-                "preferences": preferences,
-                "status": "pending",
-                "added_date": datetime.now().strftime("%Y-%m-%d")
-            }
+            task = make_task(task_desc, priority, duration, task_type, preferences)
             
             tasks.append(task)
-            # Fixed: Only add the current task, not all tasks in the list
-            self.tasks['pending'].append(task)
         
-        self.save_tasks()
+        # One write for the whole batch instead of one per task
+        self.storage.add_tasks(tasks)
         print(f"\n✓ Added {len(tasks)} tasks!\n")
     
-    def generate_ai_prompt(self, date_str: str) -> str:
-        """Generate prompt for AI optimization"""
-        prompt = f"""You are an intelligent task scheduler helping optimize someone's day.
-
-USER PROFILE:
-- Name: {self.user_profile.get('name', 'User')}
-- Role: {self.user_profile.get('role', 'Student')}
-- Peak Energy: {self.user_profile.get('peak_energy', 'Not specified')}
-- Study Preference: {self.user_profile.get('study_preference', 'Not specified')}
-- Sleep Schedule: {self.user_profile.get('sleep_schedule', {})}
-- Family Time: {self.user_profile.get('family_time', 'Not specified')}
-- Workout Preference: {self.user_profile.get('workout_preference', 'Not specified')}
-- Workout Impact: {self.user_profile.get('workout_impact', 'Not specified')}
-- Weekly Schedule: {json.dumps(self.user_profile.get('weekly_schedule', {}), indent=2)}
-- Main Goals: {self.user_profile.get('main_goals', 'Not specified')}
-
-TODAY'S PENDING TASKS:
-{json.dumps(self.tasks.get('pending', []), indent=2)}
-
-DATE: {date_str}
-
-Please create an optimized daily schedule considering:
-1. User's energy patterns (schedule demanding tasks during peak energy)
-2. Study preferences (silence requirements, environment)
-3. Workout timing (avoid scheduling after if it causes tiredness)
-4. Family time constraints
-5. Task priorities and deadlines
-6. Realistic time blocks with breaks
-7. College/work schedule if today is a college day
-
-Create a schedule with:
-- Specific time slots (e.g., 7:00 AM - 7:30 AM)
-- Clear, actionable tasks
-- Why each task is scheduled at that time
-- Breaks and buffer time
-- Balance between productivity and wellbeing
-
-Format as JSON:
-{{
-  "schedule": [
-    {{
-      "time": "7:00 AM - 7:30 AM",
-      "task": "Morning workout - Light cardio",
-      "reason": "Scheduled early to energize the day, not too intense to avoid tiredness",
-      "type": "health"
-    }}
-  ],
-  "daily_summary": "Brief overview of the day's plan",
-  "tips": ["Tip 1", "Tip 2"]
-}}
-"""
-        return prompt
+    def llm_inputs(self):
+        """Profile and pending tasks in the format the LLM service expects"""
+        profile_keys = ('name', 'role', 'main_goals', 'peak_energy', 'study_preference', 'workout_preference',
+                        'workout_impact', 'family_time', 'sleep_schedule', 'weekly_schedule')
+        user_profile = {key: self.user_profile.get(key) for key in profile_keys}
+        tasks = [{key: task.get(key) for key in ('description', 'priority', 'duration', 'type', 'preferences')}
+                 for task in self.tasks.get('pending', [])]
+        return user_profile, tasks
     
-    def optimize_schedule(self, date_str: str = None):
-        """Generate optimized schedule using AI logic"""
+    def optimize_schedule(self, date_str: str = None, stream: bool = False, use_cache: bool = True):
+        """
+        Generate an optimized schedule with the LLM and save it for the date
+        
+        Args:
+            date_str: Date to schedule (default: today)
+            stream: Echo the generated text to the console as it arrives
+            use_cache: Reuse the result of an earlier run with identical inputs
+            
+        Returns:
+            dict: The schedule, or {"error", "message"}
+        """
         if not date_str:
             date_str = datetime.now().strftime("%Y-%m-%d")
         
@@ -191,44 +173,35 @@ Format as JSON:
                 "message": "Please add some pending tasks before generating an optimized schedule."
             }
         
-        # Here you would call the AI API (Claude/OpenAI)
-        # For now, I'll show the prompt that would be sent
-        prompt = self.generate_ai_prompt(date_str)
-        
-        print("=" * 60)
-        print("AI OPTIMIZATION PROMPT (This would be sent to Claude API):")
-        print("=" * 60)
-        print(prompt)
-        print("=" * 60)
-        
-        # Simulated AI response (you'll replace this with actual API call)
-        print("\n📝 To use AI optimization:")
-        print("1. Get an Anthropic API key from console.anthropic.com")
-        print("2. Install: pip install anthropic")
-        print("3. The system will send the above prompt to Claude")
-        print("4. Claude will return an optimized schedule\n")
-        
-        # Example optimized schedule structure
-        example_schedule = {
-            "schedule": [
-                {
-                    "time": "7:00 AM - 7:30 AM",
-                    "task": "Morning routine & light stretching",
-                    "reason": "Gentle start, won't tire you out",
-                    "type": "health"
-                },
-                {
-                    "time": "9:00 AM - 1:00 PM",
-                    "task": "College classes",
-                    "reason": "Scheduled college day",
-                    "type": "college"
+        user_profile, tasks = self.llm_inputs()
+        cache_key = self.cache.key(user_profile, tasks, date_str)
+        schedule = self.cache.get(cache_key) if use_cache else None
+        if schedule is None:
+            # Same pooled service (model routing, parsing, scoring, metrics) as the web app
+            from llm_service import get_llm_service
+            llm_service = get_llm_service()
+            if not llm_service.check_ollama_status():
+                return {
+                    "error": "LLM unavailable",
+                    "message": "Ollama is not running or the model is not pulled (see OLLAMA_SETUP.md)."
                 }
-            ],
-            "daily_summary": "Balanced day with study, health, and family time",
-            "tips": ["Take 5-min breaks every hour", "Stay hydrated"]
-        }
+            on_token = (lambda text: print(text, end='', flush=True)) if stream else None
+            day = datetime.strptime(date_str, "%Y-%m-%d").strftime("%A")
+            schedule = llm_service.generate_schedule(user_profile, tasks, f"Plan my day for {day}, {date_str}.",
+                                                     on_token=on_token, date_str=date_str)
+            if stream:
+                print()
+            if not schedule:
+                return {
+                    "error": "Generation failed",
+                    "message": "The model did not return a schedule. Please try again."
+                }
+            # Only validated (scored) schedules are reused; unparsed output is not
+            if 'overall_quality' in schedule:
+                self.cache.put(cache_key, schedule)
         
-        return example_schedule
+        self.storage.save_schedule(date_str, schedule)
+        return schedule
     
     def view_schedule(self, date_str: str = None):
         """View optimized schedule for a date"""
@@ -242,9 +215,9 @@ Format as JSON:
             print(f"\n=== SCHEDULE FOR {date_str} ===\n")
             
             for item in schedule.get('schedule', []):
-                print(f"⏰ {item['time']}")
-                print(f"   📌 {item['task']}")
-                print(f"   💡 {item['reason']}\n")
+                print(f"⏰ {item.get('time', '')}")
+                print(f"   📌 {item.get('task', '')}")
+                print(f"   💡 {item.get('reason', '')}\n")
             
             print(f"📊 Summary: {schedule.get('daily_summary', 'N/A')}")
             print("\n✨ Tips:")
@@ -307,7 +280,12 @@ Format as JSON:
                 date = input("Enter date (YYYY-MM-DD) or press Enter for today: ")
                 if not date:
                     date = datetime.now().strftime("%Y-%m-%d")
-                self.optimize_schedule(date)
+                print("\n🤖 Generating schedule...\n")
+                result = self.optimize_schedule(date, stream=True)
+                if 'error' in result:
+                    print(f"\n⚠ {result['message']}\n")
+                else:
+                    self.view_schedule(date)
             elif choice == '4':
                 self.view_schedule()
             elif choice == '5':
@@ -320,7 +298,199 @@ Format as JSON:
             else:
                 print("\n⚠ Invalid option. Please try again.\n")
 
+# Batch mode ------------------------------------------------------------------
+
+def read_ndjson(paths: List[str]) -> Iterator[Dict]:
+    """
+    Yield one JSON object per non-empty line of the given files ('-' = stdin)
+
+    Raises:
+        ValueError: On a line that is not a JSON object (with file and line number)
+    """
+    for path in paths or ['-']:
+        f = sys.stdin if path == '-' else open(path, 'r')
+        try:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    raise ValueError(f"{path}:{line_number}: {e}")
+                if not isinstance(record, dict):
+                    raise ValueError(f"{path}:{line_number}: expected a JSON object")
+                yield record
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+
+def write_ndjson(records: Iterable[Dict], out=None):
+    """Write records as they arrive, one JSON line each, flushing per line"""
+    out = out or sys.stdout
+    for record in records:
+        out.write(json.dumps(record, default=str) + '\n')
+        out.flush()
+
+
+def parse_date(value: str) -> str:
+    """YYYY-MM-DD, 'today' or 'tomorrow' -> YYYY-MM-DD"""
+    if value in ('today', 'tomorrow'):
+        return (datetime.now() + timedelta(days=value == 'tomorrow')).strftime("%Y-%m-%d")
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date {value!r} (use YYYY-MM-DD, today or tomorrow)")
+
+
+def schedule_profile(backend: str, location: str, dates: List[str], use_cache: bool = True) -> List[Dict]:
+    """
+    Generate schedules for one profile (runs in a worker process)
+
+    Returns:
+        list: One {"profile", "date", "result"} record per date
+    """
+    records = []
+    # Keep the result stream on stdout clean of progress output
+    with redirect_stdout(sys.stderr):
+        try:
+            optimizer = AITaskOptimizer(get_task_store(backend, location))
+            for date_str in dates:
+                records.append({"profile": location, "date": date_str, "result": optimizer.optimize_schedule(date_str, use_cache=use_cache)})
+        except Exception as e:
+            records.append({"profile": location, "date": None,
+                            "result": {"error": "Profile failed", "message": str(e)}})
+    return records
+
+
+def _all_sql_users() -> List[str]:
+    from app import app
+    from models import db, User
+    with app.app_context():
+        usernames = [name for (name,) in db.session.query(User.username).order_by(User.id)]
+        # Worker processes open their own connections
+        db.engine.dispose()
+    return usernames
+
+
+def _batch_optimizer(args) -> AITaskOptimizer:
+    return AITaskOptimizer(get_task_store(args.storage, args.profile[0] if args.profile else None))
+
+
+def command_add(args) -> int:
+    """Add NDJSON tasks ({"description", "priority", "duration", "type", "preferences"})"""
+    optimizer = _batch_optimizer(args)
+    tasks = []
+    for record in read_ndjson(args.files):
+        if not record.get('description'):
+            raise ValueError(f"task without a description: {record}")
+        tasks.append(make_task(record['description'], record.get('priority', 'medium'), record.get('duration', '1h'),
+                               record.get('type', 'personal'), record.get('preferences', '')))
+    # Written in one go, so invalid input adds nothing
+    optimizer.storage.add_tasks(tasks)
+    write_ndjson(tasks)
+    return 0
+
+
+def command_complete(args) -> int:
+    """Mark tasks completed by id"""
+    optimizer = _batch_optimizer(args)
+    missing = 0
+    for task_id in args.task_ids:
+        task = optimizer.complete_task(task_id, args.date)
+        if task is None:
+            print(f"No pending task with id {task_id}", file=sys.stderr)
+            missing += 1
+        else:
+            write_ndjson([task])
+    return 1 if missing else 0
+
+
+def command_tasks(args) -> int:
+    """Print tasks as NDJSON"""
+    tasks = _batch_optimizer(args).tasks
+    statuses = ['pending', 'completed'] if args.status == 'all' else [args.status]
+    write_ndjson(task for status in statuses for task in tasks.get(status, []))
+    return 0
+
+
+def command_schedule(args) -> int:
+    """Generate schedules for every profile x date, streaming NDJSON results"""
+    dates = args.date or [
+        (datetime.strptime(args.start, "%Y-%m-%d") + timedelta(days=offset)).strftime("%Y-%m-%d")
+        for offset in range(args.days)
+    ]
+    profiles = list(args.profile or [])
+    if args.all_users:
+        profiles += _all_sql_users()
+    profiles = profiles or [None]
+
+    failures = 0
+    if args.workers > 1 and len(profiles) > 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            futures = [pool.submit(schedule_profile, args.storage, profile, dates, not args.no_cache) for profile in profiles]
+            for future in as_completed(futures):
+                records = future.result()
+                failures += sum('error' in record['result'] for record in records)
+                write_ndjson(records)
+    else:
+        for profile in profiles:
+            records = schedule_profile(args.storage, profile, dates, not args.no_cache)
+            failures += sum('error' in record['result'] for record in records)
+            write_ndjson(records)
+    return 1 if failures else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description='AI Daily Task Optimizer. Without a command, starts the interactive menu.')
+    parser.add_argument('--storage', choices=['json', 'oplog', 'sql'],
+                        help='storage backend (default: TRACKER_STORAGE or CLI_STORAGE_CONFIG)')
+    parser.add_argument('--profile', action='append',
+                        help='profile location: JSON file directory, oplog data directory or web app username '
+                             '(schedule accepts it repeatedly)')
+    subcommands = parser.add_subparsers(dest='command')
+
+    add_parser = subcommands.add_parser('add', help='add tasks from NDJSON files or stdin')
+    add_parser.add_argument('files', nargs='*', help="NDJSON files ('-' or none for stdin)")
+    add_parser.set_defaults(handler=command_add)
+
+    complete_parser = subcommands.add_parser('complete', help='mark tasks completed')
+    complete_parser.add_argument('task_ids', nargs='+')
+    complete_parser.add_argument('--date', type=parse_date, default='today', help='completion date')
+    complete_parser.set_defaults(handler=command_complete)
+
+    tasks_parser = subcommands.add_parser('tasks', help='print tasks as NDJSON')
+    tasks_parser.add_argument('--status', choices=['pending', 'completed', 'all'], default='pending')
+    tasks_parser.set_defaults(handler=command_tasks)
+
+    schedule_parser = subcommands.add_parser('schedule', help='generate schedules as NDJSON')
+    schedule_parser.add_argument('--date', type=parse_date, action='append',
+                                 help='date to schedule (repeatable; YYYY-MM-DD, today or tomorrow)')
+    schedule_parser.add_argument('--start', type=parse_date, default='today', help='first date when --date is not given')
+    schedule_parser.add_argument('--days', type=int, default=1, help='number of consecutive dates from --start')
+    schedule_parser.add_argument('--all-users', action='store_true', help='add every web app user (sql storage)')
+    schedule_parser.add_argument('--workers', type=int, default=1, help='processes to spread profiles over')
+    schedule_parser.add_argument('--no-cache', action='store_true', help='always call the LLM (e.g. for benchmarking)')
+    schedule_parser.set_defaults(handler=command_schedule)
+    return parser
+
+
+def main(argv: List[str] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command is None:
+        AITaskOptimizer(get_task_store(args.storage, args.profile[0] if args.profile else None)).run()
+        return 0
+    if args.command == 'schedule' and args.all_users and args.storage != 'sql':
+        parser.error('--all-users requires --storage sql')
+    try:
+        return args.handler(args)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+
 # Run the application
 if __name__ == "__main__":
-    app = AITaskOptimizer()
-    app.run()
\ No newline at end of file
+    sys.exit(main())